@@ -0,0 +1,186 @@
+import errno
+import os
+import shutil
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import atomic_io
+from custom_exceptions import ArchiveVerificationError
+from fingerprint import compute_fingerprint
+from instrumentation import format_bytes
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+COPY_CHUNK_SIZE = 64 * 1024 * 1024  # 64MB
+# Errors meaning "this copy method is not supported here", not a failed copy.
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+@dataclass(frozen=True)
+class ArchiveProgress:
+    copied_bytes: int
+    total_bytes: int
+
+    @property
+    def percent(self) -> float:
+        return 100.0 if not self.total_bytes else self.copied_bytes / self.total_bytes * 100
+
+    def describe(self) -> str:
+        return f"{self.percent:.1f}% ({format_bytes(self.copied_bytes)} of {format_bytes(self.total_bytes)})"
+
+
+class _ProgressTracker:
+    def __init__(self, total_bytes: int, on_progress: Callable[[ArchiveProgress], None] | None):
+        self.copied_bytes = 0
+        self.total_bytes = total_bytes
+        self.on_progress = on_progress
+
+    def advance(self, size: int) -> None:
+        self.copied_bytes += size
+        if self.on_progress:
+            self.on_progress(ArchiveProgress(self.copied_bytes, self.total_bytes))
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _pread_pwrite(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    data = os.pread(src_fd, count, offset)
+    view = memoryview(data)
+    written = 0
+    while written < len(data):
+        written += os.pwrite(dst_fd, view[written:], offset + written)
+    return len(data)
+
+
+def _copy_methods() -> list[Callable[[int, int, int, int], int]]:
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append(_copy_file_range)
+    if hasattr(os, "sendfile"):
+        methods.append(_sendfile)
+    methods.append(_pread_pwrite)
+    return methods
+
+
+def copy_file_contents(
+    src: Path, dst: Path, on_chunk: Callable[[int], None] | None = None,
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> None:
+    """Copies in kernel space where possible: copy_file_range, then sendfile, then pread/pwrite.
+
+    A method the filesystems do not support is dropped and the copy continues
+    from the same offset with the next one.
+    """
+    size = src.stat().st_size
+    methods = _copy_methods()
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            offset = 0
+            while offset < size:
+                try:
+                    copied = methods[0](src_fd, dst_fd, offset, min(chunk_size, size - offset))
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED_ERRNOS or len(methods) == 1:
+                        raise
+                    logger.debug(f"{methods[0].__name__} unsupported for {src} ({e}), falling back")
+                    methods.pop(0)
+                    continue
+                if copied == 0:
+                    raise OSError(f"Unexpected end of file copying {src} at {offset} of {size} bytes")
+                offset += copied
+                if on_chunk:
+                    on_chunk(copied)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def files_match(src: Path, dst: Path) -> bool:
+    """Same size and same sampled fingerprint."""
+    try:
+        if src.stat().st_size != dst.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    return compute_fingerprint(src) == compute_fingerprint(dst)
+
+
+def is_same_device(src: Path, dest_dir: Path) -> bool:
+    return src.stat().st_dev == dest_dir.stat().st_dev
+
+
+def _move_file(src: Path, dst: Path, progress: _ProgressTracker) -> None:
+    size = src.stat().st_size
+    dst.parent.mkdir(parents=True, exist_ok=True)
+
+    if is_same_device(src, dst.parent):
+        os.replace(src, dst)
+        progress.advance(size)
+        return
+
+    if files_match(src, dst):
+        # An interrupted attempt already copied and verified it but did not unlink.
+        logger.info(f"{dst} already archived, removing source")
+    else:
+        with atomic_io.atomic_output(dst) as tmp_path:
+            copy_file_contents(src, tmp_path, progress.advance)
+            # Keeping mtime lets cached fingerprints in the workspace stay valid.
+            shutil.copystat(src, tmp_path)
+            if not files_match(src, tmp_path):
+                raise ArchiveVerificationError(f"Copy of {src} does not match the source")
+        size = 0
+    src.unlink()
+    progress.advance(size)
+
+
+def _move_tree(src_dir: Path, dst_dir: Path, progress: _ProgressTracker) -> None:
+    dst_dir.parent.mkdir(parents=True, exist_ok=True)
+    if not dst_dir.exists() and is_same_device(src_dir, dst_dir.parent):
+        os.rename(src_dir, dst_dir)
+        progress.advance(tree_size(dst_dir))
+        return
+
+    # File by file, so a retry after an interruption only copies what is left.
+    for path in sorted(src_dir.rglob("*")):
+        if path.is_file() and not path.is_symlink():
+            _move_file(path, dst_dir / path.relative_to(src_dir), progress)
+    shutil.rmtree(src_dir)
+
+
+def tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file() and not p.is_symlink())
+
+
+def archive_paths(
+    moves: list[tuple[Path, Path]],
+    on_progress: Callable[[ArchiveProgress], None] | None = None,
+) -> None:
+    """Moves files and directories to their destinations, across filesystems if needed.
+
+    Same-device moves are renames. Otherwise every file is copied, verified
+    against its source and only then removed from the source.
+    """
+    sizes = {src: tree_size(src) for src, _ in moves if src.exists()}
+    progress = _ProgressTracker(sum(sizes.values()), on_progress)
+    for src, dst in moves:
+        if src not in sizes:
+            continue
+        logger.info(f"Archiving {src} -> {dst} ({format_bytes(sizes[src])})")
+        if src.is_dir():
+            _move_tree(src, dst, progress)
+        else:
+            _move_file(src, dst, progress)
@@ -0,0 +1,37 @@
+import functools
+from pathlib import Path
+
+from PIL import Image
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_logo(logo_path: Path, mtime_ns: int) -> Image.Image:
+    with Image.open(logo_path) as logo:
+        return logo.convert("RGBA")
+
+
+@functools.lru_cache(maxsize=32)
+def _resize_logo(logo_path: Path, mtime_ns: int, width: int) -> Image.Image:
+    logo = _load_logo(logo_path, mtime_ns)
+    height = int(width * (logo.height / logo.width))
+    return logo.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def load_logo(logo_path: Path) -> Image.Image:
+    """Returns the decoded RGBA logo; reloaded only when the file changes. Do not mutate."""
+    return _load_logo(logo_path, logo_path.stat().st_mtime_ns)
+
+
+def get_resized_logo(logo_path: Path, width: int) -> Image.Image:
+    """Returns the logo LANCZOS-resized to `width`, keeping aspect. Do not mutate."""
+    return _resize_logo(logo_path, logo_path.stat().st_mtime_ns, width)
+
+
+def write_resized_logo_png(logo_path: Path, width: int, output_path: Path) -> Path:
+    """Writes a pre-scaled logo so ffmpeg can overlay it without a scale filter."""
+    get_resized_logo(logo_path, width).save(output_path, format="PNG")
+    return output_path
@@ -0,0 +1,111 @@
+import json
+import os
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from logger import get_logger
+from sampled_checksum import compute_fingerprint
+
+logger = get_logger(__name__)
+
+SIDECAR_SUFFIX = ".integrity.json"
+
+
+@dataclass(frozen=True)
+class IntegrityRecord:
+    size: int
+    checksum: str
+
+
+def get_sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _temp_path_for(path: Path) -> Path:
+    # Keep the suffix so PIL, OpenCV and ffmpeg still infer the output format.
+    return path.with_name(f".{path.stem}.tmp-{uuid.uuid4().hex[:8]}{path.suffix}")
+
+
+def _fsync_file(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """Yields a temp path in the same directory; it replaces `path` only on success."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = _temp_path_for(path)
+    try:
+        yield tmp_path
+        _fsync_file(tmp_path)
+        os.replace(tmp_path, path)
+        _fsync_dir(path.parent)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+
+def atomic_write_json(path: Path, obj: Any) -> None:
+    data = json.dumps(obj, ensure_ascii=False, indent=4).encode("utf-8")
+    atomic_write_bytes(path, data)
+
+
+def compute_integrity(path: Path) -> IntegrityRecord:
+    return IntegrityRecord(size=path.stat().st_size, checksum=compute_fingerprint(path))
+
+
+def write_integrity_sidecar(path: Path) -> IntegrityRecord:
+    record = compute_integrity(path)
+    atomic_write_json(get_sidecar_path(path), asdict(record))
+    return record
+
+
+def verify_artifact(path: Path) -> bool:
+    """Artifacts without a sidecar predate integrity tracking and are trusted."""
+    if not path.exists():
+        return False
+
+    sidecar_path = get_sidecar_path(path)
+    if not sidecar_path.exists():
+        return True
+
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            expected = IntegrityRecord(**json.load(f))
+    except (json.JSONDecodeError, TypeError):
+        return False
+
+    if path.stat().st_size != expected.size:
+        return False
+    return compute_fingerprint(path) == expected.checksum
+
+
+def discard_artifact(path: Path) -> None:
+    path.unlink(missing_ok=True)
+    get_sidecar_path(path).unlink(missing_ok=True)
@@ -2,7 +2,6 @@ from pathlib import Path
 from typing import Any
 
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from logger import get_logger
 from schemas import ChannelInfo
@@ -37,6 +36,8 @@ def authenticate() -> None:
             "Please ensure client_secret.json exists in the project root."
         )
 
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_FILE, SCOPES)
     credentials = flow.run_local_server(open_browser=True)
 
@@ -0,0 +1,63 @@
+"""Compare sampled fingerprinting against full-file hashing on synthetic files.
+
+Usage: uv run python -m benchmarks.bench_fingerprint --size-mb 2048
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from fingerprint import compute_fingerprint, compute_full_hash, full_hash_algorithm
+
+WRITE_CHUNK_SIZE = 16 * 1024 * 1024  # 16MB
+
+
+def create_synthetic_file(path: Path, size_bytes: int) -> None:
+    with open(path, "wb") as f:
+        remaining = size_bytes
+        while remaining > 0:
+            chunk = os.urandom(min(WRITE_CHUNK_SIZE, remaining))
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def time_call(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def run(size_mb: int, repeats: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "synthetic.mov"
+        create_synthetic_file(path, size_mb * 1024 * 1024)
+
+        sampled = [time_call(compute_fingerprint, path) for _ in range(repeats)]
+        full = [time_call(compute_full_hash, path) for _ in range(repeats)]
+
+    best_sampled = min(sampled)
+    best_full = min(full)
+    return {
+        "size_mb": size_mb,
+        "repeats": repeats,
+        "sampled_seconds": best_sampled,
+        "full_seconds": best_full,
+        "full_algorithm": full_hash_algorithm(),
+        "speedup": best_full / best_sampled if best_sampled else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.size_mb, args.repeats), indent=4))
+
+
+if __name__ == "__main__":
+    main()
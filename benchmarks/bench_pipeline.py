@@ -0,0 +1,248 @@
+"""Benchmark the media pipeline stages on synthetic test videos, fully offline.
+
+Usage: uv run python -m benchmarks.bench_pipeline --resolutions 1080p 4k --durations 30 120 \
+    [--output benchmarks/results/latest.json] [--baseline benchmarks/results/main.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import atomic_io
+import config
+import utils
+from benchmarks.synthetic import (
+    RESOLUTIONS,
+    extract_candidate_frames,
+    ffmpeg_available,
+    generate_test_video,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+VIDEO_STEM = "ms_BenchvsSynthetic"
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    case: str
+    resolution: str
+    duration: float
+    repeats: int
+    cold_seconds: float
+    best_seconds: float
+    median_seconds: float
+    throughput: float
+    unit: str
+
+    @property
+    def key(self) -> tuple[str, str, float]:
+        return self.case, self.resolution, self.duration
+
+
+@contextmanager
+def isolated_workspace(root: Path) -> Iterator[Path]:
+    """Points INPUT_DIR and the state store at `root` so runs never touch real workspaces."""
+    saved = config.INPUT_DIR, config.STATE_DB_PATH
+    config.INPUT_DIR = root
+    config.STATE_DB_PATH = root / "state.db"
+    try:
+        yield root
+    finally:
+        config.INPUT_DIR, config.STATE_DB_PATH = saved
+
+
+def time_repeated(fn: Callable[[], object], reset: Callable[[], None], repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        reset()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(
+    case: str,
+    resolution: str,
+    duration: float,
+    timings: list[float],
+    work: float,
+    unit: str,
+) -> BenchmarkResult:
+    best = min(timings)
+    return BenchmarkResult(
+        case=case,
+        resolution=resolution,
+        duration=duration,
+        repeats=len(timings),
+        cold_seconds=timings[0],
+        best_seconds=best,
+        median_seconds=statistics.median(timings),
+        throughput=work / best if best else 0.0,
+        unit=unit,
+    )
+
+
+def bench_video(
+    video_path: Path, resolution: str, duration: float, repeats: int, candidate_count: int
+) -> tuple[list[BenchmarkResult], list[str]]:
+    from thumbnail_enhancement import render_thumbnail
+    from thumbnail_ranking.quality_filter import (
+        collect_image_metrics_from_folder,
+        remove_duplicate_images,
+    )
+    from video_overlay import add_video_overlays
+    from video_prep import auto_select_thumbnail, create_and_store_metadata
+
+    results = []
+    skipped = []
+    video = str(video_path)
+    create_and_store_metadata(video)
+
+    def discard(path: Path) -> Callable[[], None]:
+        return lambda: atomic_io.discard_artifact(path)
+
+    timings = time_repeated(
+        lambda: auto_select_thumbnail(video),
+        discard(utils.get_selected_candidate_path(video_path)),
+        repeats,
+    )
+    results.append(summarize("auto_select_thumbnail", resolution, duration, timings, duration, "x realtime"))
+
+    timings = time_repeated(
+        lambda: render_thumbnail(video),
+        discard(utils.get_thumbnail_path(video_path)),
+        repeats,
+    )
+    results.append(summarize("render_thumbnail", resolution, duration, timings, 1, "thumbnails/s"))
+
+    timings = time_repeated(
+        lambda: add_video_overlays(video),
+        discard(utils.get_processed_video_path(video_path)),
+        repeats,
+    )
+    results.append(summarize("add_video_overlays", resolution, duration, timings, duration, "x realtime"))
+
+    candidate_dir = utils.get_candidate_dir(video_path)
+    candidates = extract_candidate_frames(video_path, candidate_dir, candidate_count)
+
+    def dedup() -> None:
+        metrics = collect_image_metrics_from_folder(candidate_dir)
+        remove_duplicate_images(metrics, max_hash_distance=8)
+
+    timings = time_repeated(dedup, lambda: None, repeats)
+    results.append(summarize("dedup", resolution, duration, timings, len(candidates), "images/s"))
+
+    if importlib.util.find_spec("torch") and importlib.util.find_spec("clip"):
+        from thumbnail_ranking import rank_candidates
+
+        timings = time_repeated(lambda: rank_candidates(video), lambda: None, repeats)
+        results.append(summarize("rank_candidates", resolution, duration, timings, len(candidates), "images/s"))
+    else:
+        skipped.append("rank_candidates: torch/clip not installed")
+
+    return results, skipped
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(
+    resolutions: list[str], durations: list[float], repeats: int, candidate_count: int
+) -> dict:
+    report = {
+        "commit": get_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "results": [],
+        "skipped": [],
+    }
+    if not ffmpeg_available():
+        report["skipped"].append("all: ffmpeg/ffprobe not found on PATH")
+        return report
+
+    for resolution in resolutions:
+        for duration in durations:
+            with tempfile.TemporaryDirectory() as tmp_dir, isolated_workspace(Path(tmp_dir)) as root:
+                video_path = generate_test_video(
+                    root / f"{VIDEO_STEM}_{resolution}{int(duration)}s.mov", resolution, duration
+                )
+                results, skipped = bench_video(
+                    video_path, resolution, duration, repeats, candidate_count
+                )
+            report["results"] += [asdict(result) for result in results]
+            report["skipped"] += [f"{resolution}/{duration:g}s {reason}" for reason in skipped]
+    return report
+
+
+def compare_results(current: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """Lists cases whose best time got slower than the baseline by more than `threshold`."""
+    baseline_by_key = {BenchmarkResult(**result).key: result for result in baseline}
+    regressions = []
+    for result in current:
+        key = BenchmarkResult(**result).key
+        previous = baseline_by_key.get(key)
+        if not previous or not previous["best_seconds"]:
+            continue
+        change = result["best_seconds"] / previous["best_seconds"] - 1
+        if change > threshold:
+            regressions.append(
+                f"{key[0]} {key[1]}/{key[2]:g}s: {previous['best_seconds']:.3f}s -> "
+                f"{result['best_seconds']:.3f}s (+{change:.0%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolutions", nargs="+", choices=sorted(RESOLUTIONS), default=["1080p", "4k"])
+    parser.add_argument("--durations", nargs="+", type=float, default=[30.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=config.CANDIDATE_THUMBNAIL_NUM)
+    parser.add_argument("--output", type=Path, default=None, help="Default: benchmarks/results/<commit>.json")
+    parser.add_argument("--baseline", type=Path, default=None, help="Results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run(args.resolutions, args.durations, args.repeats, args.candidates)
+
+    output = args.output or RESULTS_DIR / f"{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=4))
+    print(json.dumps(report, indent=4))
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_results(report["results"], baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Synthetic media fixtures generated offline with ffmpeg's testsrc2 and sine sources."""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def generate_test_video(
+    path: Path, resolution: str, duration: float, fps: int = 30
+) -> Path:
+    """Encodes a moving test pattern with a stereo tone, like a phone recording."""
+    width, height = RESOLUTIONS[resolution]
+    subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-ac", "2",
+            "-shortest",
+            "-loglevel", "error",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def extract_candidate_frames(video_path: Path, output_dir: Path, count: int) -> list[Path]:
+    """Writes `count` evenly spaced JPEG frames, as the candidate extraction stage does."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    duration = float(
+        subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1", str(video_path),
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    )
+    subprocess.run(
+        [
+            "ffmpeg", "-y",
+            "-i", str(video_path),
+            "-vf", f"fps={count / duration}",
+            "-frames:v", str(count),
+            "-q:v", "2",
+            "-loglevel", "error",
+            str(output_dir / "candidate_%03d.jpg"),
+        ],
+        check=True,
+    )
+    return sorted(output_dir.glob("candidate_*.jpg"))
@@ -1,30 +1,57 @@
 import config
 import shutil
+from collections.abc import Callable
 from pathlib import Path
 
-from utils import get_workspace_dir, get_uploaded_record
+import atomic_io
+import state_store
+from archive import ArchiveProgress, archive_paths
+from fingerprint import get_fingerprint
+from utils import get_candidate_dir, get_processed_video_path, get_workspace_dir
 from logger import get_logger
 from custom_exceptions import NoUploadedRecordError
 
 logger = get_logger(__name__)
 
 
-def cleanup_video(video_path: str) -> str:
-    path = Path(video_path)
-    uploaded_record = get_uploaded_record(path)
+def drop_intermediates(video_path: Path) -> None:
+    """Deletes artifacts that are only needed until upload: the overlay encode and raw candidates."""
+    atomic_io.discard_artifact(get_processed_video_path(video_path))
+    shutil.rmtree(get_candidate_dir(video_path), ignore_errors=True)
 
-    if not uploaded_record or not uploaded_record.video_id:
-        raise NoUploadedRecordError
 
+def cleanup_video(
+    video_path: str,
+    progress_callback: Callable[[ArchiveProgress], None] | None = None,
+) -> str:
+    path = Path(video_path)
     workspace_dir = get_workspace_dir(path)
+    video_dest = config.COMPLETED_DIR / path.name
+    workspace_dest = config.COMPLETED_DIR / workspace_dir.name
 
-    if not workspace_dir.exists():
+    # A retried attempt may find the video already archived by the previous one.
+    resuming = not path.exists() and video_dest.exists()
+    if not resuming:
+        uploaded_record = state_store.load_upload_record(path)
+        if not uploaded_record or not uploaded_record.video_id:
+            raise NoUploadedRecordError
+
+    if not workspace_dir.exists() and not workspace_dest.exists():
         raise NoUploadedRecordError
 
-    video_dest = config.COMPLETED_DIR / path.name
-    workspace_dest = config.COMPLETED_DIR / workspace_dir.name
+    fingerprint = get_fingerprint(
+        video_dest if resuming else path,
+        workspace_dir if workspace_dir.exists() else workspace_dest,
+    )
+
+    if config.ARCHIVE_DROP_INTERMEDIATES:
+        drop_intermediates(path)
+
+    archive_paths([(path, video_dest), (workspace_dir, workspace_dest)], progress_callback)
 
-    shutil.move(str(path), str(video_dest))
-    shutil.move(str(workspace_dir), str(workspace_dest))
+    with state_store.open_store() as conn:
+        state_store.mark_stage_complete(
+            conn, fingerprint, path.name, state_store.STAGE_ARCHIVED, str(video_dest)
+        )
 
     return str(video_dest)
@@ -3,13 +3,17 @@ from pathlib import Path
 
 from dotenv import load_dotenv, find_dotenv
 
+from logger import get_logger
+
+logger = get_logger(__name__)
+
 env = os.getenv("APP_ENV", "dev")
 dotenv_path = find_dotenv(f".env.{env}")
 
 if not dotenv_path:
     dotenv_path = find_dotenv(".env")
     if dotenv_path:
-        print(f"Warning: .env.{env} not found, using .env instead")
+        logger.warning(f".env.{env} not found, using .env instead")
     else:
         raise FileNotFoundError(
             f"Environment file not found: .env.{env} or .env. "
@@ -17,7 +21,7 @@ if not dotenv_path:
         )
 
 load_dotenv(dotenv_path=dotenv_path, override=True)
-print(f"Loaded environment variables from {Path(dotenv_path).name}")
+logger.debug(f"Loaded environment variables from {Path(dotenv_path).name}")
 
 
 def get_env_path(var_name: str, create_if_missing: bool = False) -> Path:
@@ -50,4 +54,42 @@ TEMPORAL_SERVER_ADDRESS = os.environ["TEMPORAL_SERVER_ADDRESS"]
 
 THUMBNAIL_SELECTOR_PORT = int(os.getenv("THUMBNAIL_SELECTOR_PORT", 8765))
 
+MANUAL_THUMBNAIL_SELECTION = os.getenv("MANUAL_THUMBNAIL_SELECTION", "false").lower() == "true"
+
+SELECTOR_PROXY_ENABLED = os.getenv("SELECTOR_PROXY_ENABLED", "false").lower() == "true"
+
 LOGO_PATH = Path(os.getenv("LOGO_PATH", "assets/logo.png"))
+
+WATCH_SETTLE_SECONDS = float(os.getenv("WATCH_SETTLE_SECONDS", 10))
+
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 2))
+
+WORKFLOW_START_CONCURRENCY = int(os.getenv("WORKFLOW_START_CONCURRENCY", 16))
+
+FINGERPRINT_FULL_HASH = os.getenv("FINGERPRINT_FULL_HASH", "false").lower() == "true"
+
+STATE_DB_PATH = Path(os.getenv("STATE_DB_PATH", str(COMPLETED_DIR / "state.db")))
+
+RERENDER_WORKERS = int(os.getenv("RERENDER_WORKERS", 0)) or None
+
+THUMBNAIL_PUSH_RATE = float(os.getenv("THUMBNAIL_PUSH_RATE", 1.0))
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+
+TEMPORAL_METRICS_PORT = int(os.getenv("TEMPORAL_METRICS_PORT", 0))
+
+FFMPEG_STALL_TIMEOUT = float(os.getenv("FFMPEG_STALL_TIMEOUT", 90))
+
+ARCHIVE_DROP_INTERMEDIATES = os.getenv("ARCHIVE_DROP_INTERMEDIATES", "false").lower() == "true"
+
+RETENTION_PROCESSED_TTL_DAYS = float(os.getenv("RETENTION_PROCESSED_TTL_DAYS", 14))
+
+RETENTION_CANDIDATES_TTL_DAYS = float(os.getenv("RETENTION_CANDIDATES_TTL_DAYS", 30))
+
+RETENTION_MAX_BYTES = int(os.getenv("RETENTION_MAX_BYTES", 0))
+
+OVERLAY_OUTPUT_SIZE_FACTOR = float(os.getenv("OVERLAY_OUTPUT_SIZE_FACTOR", 1.5))
+
+DISK_SPACE_RESERVE_BYTES = int(os.getenv("DISK_SPACE_RESERVE_BYTES", 2 * 1024**3))
+
+DISK_SPACE_RETRY_DELAY = float(os.getenv("DISK_SPACE_RETRY_DELAY", 300))
@@ -11,6 +11,10 @@ CATEGORY_SPORTS = "17"
 DATE_FORMAT = "%d %b %Y"  # Example: 25 Dec 2024
 TEMPORAL_TASK_QUEUE = "badminton-video-processing"
 
+# Filename parts starting with this are scheduling tags, not part of the title,
+# e.g. ms_LeovsKhanh_Final_@p1.mov or ms_LeovsKhanh_@due20241220.mov
+SCHEDULING_TAG_PREFIX = "@"
+
 VISIBILITY_PUBLIC = "public"
 VISIBILITY_PRIVATE = "private"
 
@@ -19,6 +23,8 @@ WORKFLOW_STAGE_INITIALIZING = "INITIALIZING"
 WORKFLOW_STAGE_CREATING_METADATA = "CREATING_METADATA"
 WORKFLOW_STAGE_EXTRACTING_FRAMES = "EXTRACTING_FRAMES"
 WORKFLOW_STAGE_RANKING_CANDIDATES = "RANKING_CANDIDATES"
+WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION = "AWAITING_THUMBNAIL_SELECTION"
+WORKFLOW_STAGE_SAVING_SELECTED_THUMBNAIL = "SAVING_SELECTED_THUMBNAIL"
 WORKFLOW_STAGE_AUTO_SELECTING_THUMBNAIL = "AUTO_SELECTING_THUMBNAIL"
 WORKFLOW_STAGE_ENHANCING_THUMBNAIL = "ENHANCING_THUMBNAIL"
 WORKFLOW_STAGE_ADDING_VIDEO_OVERLAYS = "ADDING_VIDEO_OVERLAYS"
@@ -26,3 +32,12 @@ WORKFLOW_STAGE_UPLOADING = "UPLOADING"
 WORKFLOW_STAGE_UPDATING_VISIBILITY = "UPDATING_VISIBILITY"
 WORKFLOW_STAGE_SETTING_THUMBNAIL = "SETTING_THUMBNAIL"
 WORKFLOW_STAGE_COMPLETED = "COMPLETED"
+
+# Manual thumbnail selection
+SELECT_THUMBNAIL_SIGNAL = "select_thumbnail"
+THUMBNAIL_SELECTION_TIMEOUT_HOURS = 24
+
+# Thumbnail templates and themes
+THUMBNAIL_TEMPLATE_NAMES = ("template_a", "template_b")
+DEFAULT_THUMBNAIL_TEMPLATE = "template_b"
+THUMBNAIL_THEMES = ("blue", "purple", "white")
@@ -16,3 +16,15 @@ class MissingThumbnailDataError(Exception):
 
 class ThumbnailSelectionError(Exception):
     pass
+
+
+class ArchiveVerificationError(Exception):
+    pass
+
+
+class InsufficientDiskSpaceError(Exception):
+    pass
+
+
+class CorruptArtifactError(Exception):
+    pass
@@ -0,0 +1,154 @@
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from instrumentation import record_subprocess
+
+STDERR_TAIL_LINES = 200
+DEFAULT_STALL_TIMEOUT = 90.0
+
+
+class FfmpegStalledError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class FfmpegProgress:
+    out_time: float
+    frame: int
+    fps: float
+    speed: float
+    percent: float | None
+    eta_seconds: float | None
+    done: bool
+
+    def describe(self) -> str:
+        parts = [f"{self.out_time:.1f}s", f"{self.fps:.1f} fps", f"{self.speed:.2f}x"]
+        if self.percent is not None:
+            parts.insert(0, f"{self.percent:.1f}%")
+        if self.eta_seconds is not None:
+            parts.append(f"ETA {self.eta_seconds:.0f}s")
+        return ", ".join(parts)
+
+
+def _parse_float(value: str | None) -> float:
+    try:
+        return float((value or "").rstrip("x"))
+    except ValueError:
+        return 0.0
+
+
+def build_progress(fields: dict[str, str], duration: float | None) -> FfmpegProgress:
+    """Converts one `-progress` block (key=value lines up to `progress=`) to FfmpegProgress."""
+    # out_time_ms is in microseconds too; it is kept for older ffmpeg builds.
+    out_time_us = fields.get("out_time_us") or fields.get("out_time_ms")
+    out_time = max(0.0, _parse_float(out_time_us) / 1_000_000)
+    speed = _parse_float(fields.get("speed"))
+    done = fields.get("progress") == "end"
+
+    percent = eta = None
+    if duration:
+        percent = 100.0 if done else min(100.0, out_time / duration * 100)
+        if done:
+            eta = 0.0
+        elif speed > 0:
+            eta = max(0.0, duration - out_time) / speed
+
+    return FfmpegProgress(
+        out_time=out_time,
+        frame=int(_parse_float(fields.get("frame"))),
+        fps=_parse_float(fields.get("fps")),
+        speed=speed,
+        percent=percent,
+        eta_seconds=eta,
+        done=done,
+    )
+
+
+def with_progress_output(cmd: list[str]) -> list[str]:
+    """Adds `-progress pipe:1 -nostats` right after the ffmpeg executable."""
+    return [cmd[0], "-progress", "pipe:1", "-nostats"] + cmd[1:]
+
+
+def _read_progress(stream, duration: float | None, updates: queue.Queue) -> None:
+    fields: dict[str, str] = {}
+    for raw_line in stream:
+        key, _, value = raw_line.decode(errors="replace").strip().partition("=")
+        if not key:
+            continue
+        fields[key] = value
+        if key == "progress":
+            updates.put(build_progress(fields, duration))
+            fields = {}
+    updates.put(None)
+
+
+def _read_stderr(stream, tail: deque) -> None:
+    for raw_line in stream:
+        tail.append(raw_line.decode(errors="replace"))
+
+
+def run_ffmpeg_with_progress(
+    cmd: list[str],
+    duration: float | None = None,
+    on_progress: Callable[[FfmpegProgress], None] | None = None,
+    stall_timeout: float = DEFAULT_STALL_TIMEOUT,
+) -> subprocess.CompletedProcess:
+    """Runs ffmpeg, streaming `-progress` updates to `on_progress` as they arrive.
+
+    Only the last STDERR_TAIL_LINES lines of stderr are kept. When the output
+    position does not advance for `stall_timeout` seconds, ffmpeg is killed and
+    FfmpegStalledError is raised.
+    """
+    full_cmd = with_progress_output(cmd)
+    updates: queue.Queue[FfmpegProgress | None] = queue.Queue()
+    stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(full_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    readers = [
+        threading.Thread(target=_read_progress, args=(process.stdout, duration, updates), daemon=True),
+        threading.Thread(target=_read_stderr, args=(process.stderr, stderr_tail), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        last_out_time = -1.0
+        last_advance = time.monotonic()
+        while True:
+            remaining = stall_timeout - (time.monotonic() - last_advance)
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                update = updates.get(timeout=remaining)
+            except queue.Empty:
+                process.kill()
+                raise FfmpegStalledError(
+                    f"ffmpeg made no progress for {stall_timeout:.0f}s, killed it:\n"
+                    + "".join(stderr_tail)
+                )
+            if update is None:
+                break
+            if update.out_time > last_out_time or update.done:
+                last_out_time = update.out_time
+                last_advance = time.monotonic()
+            if on_progress:
+                on_progress(update)
+
+        returncode = process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        for reader in readers:
+            reader.join(timeout=5)
+        record_subprocess(full_cmd, time.perf_counter() - start, process.returncode)
+
+    return subprocess.CompletedProcess(
+        full_cmd, returncode, stdout=None, stderr="".join(stderr_tail).encode()
+    )
@@ -0,0 +1,148 @@
+import functools
+import hashlib
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Callable
+
+import atomic_io
+import utils
+from logger import get_logger
+from sampled_checksum import FINGERPRINT_VERSION, compute_fingerprint
+
+logger = get_logger(__name__)
+
+FULL_HASH_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+
+
+@dataclass(frozen=True)
+class FingerprintRecord:
+    version: int
+    size: int
+    mtime_ns: int
+    sampled: str
+    full: str | None = None
+    full_algorithm: str | None = None
+
+
+def _full_hasher_factory() -> tuple[str, Callable[[], Any]]:
+    try:
+        import blake3
+
+        return "blake3", blake3.blake3
+    except ImportError:
+        pass
+    try:
+        import xxhash
+
+        return "xxh3_128", xxhash.xxh3_128
+    except ImportError:
+        pass
+    return "blake2b", hashlib.blake2b
+
+
+def full_hash_algorithm() -> str:
+    return _full_hasher_factory()[0]
+
+
+def compute_full_hash(
+    video_path: Path, chunk_size: int = FULL_HASH_CHUNK_SIZE
+) -> tuple[str, str]:
+    algorithm, hasher_factory = _full_hasher_factory()
+    digest = hasher_factory()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    with open(video_path, "rb", buffering=0) as f:
+        while read := f.readinto(buffer):
+            digest.update(view[:read])
+
+    return algorithm, digest.hexdigest()
+
+
+def get_fingerprint_cache_path(
+    video_path: Path, workspace_dir: Path | None = None
+) -> Path:
+    workspace_dir = workspace_dir or utils.get_workspace_dir(video_path)
+    return workspace_dir / utils.FINGERPRINT_FILE
+
+
+def load_cached_record(
+    video_path: Path, workspace_dir: Path | None = None
+) -> FingerprintRecord | None:
+    cache_path = get_fingerprint_cache_path(video_path, workspace_dir)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            record = FingerprintRecord(**json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        return None
+
+    st = video_path.stat()
+    if (
+        record.version != FINGERPRINT_VERSION
+        or record.size != st.st_size
+        or record.mtime_ns != st.st_mtime_ns
+    ):
+        return None
+    return record
+
+
+def store_record(
+    video_path: Path,
+    record: FingerprintRecord,
+    workspace_dir: Path | None = None,
+    create_workspace: bool = True,
+) -> bool:
+    """Returns False, without writing, when the workspace is gone and `create_workspace` is off."""
+    cache_path = get_fingerprint_cache_path(video_path, workspace_dir)
+    if not create_workspace and not cache_path.parent.is_dir():
+        return False
+    atomic_io.atomic_write_json(cache_path, asdict(record))
+    return True
+
+
+def get_fingerprint_record(
+    video_path: Path, workspace_dir: Path | None = None
+) -> FingerprintRecord:
+    cached = load_cached_record(video_path, workspace_dir)
+    if cached:
+        return cached
+
+    st = video_path.stat()
+    record = FingerprintRecord(
+        version=FINGERPRINT_VERSION,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        sampled=compute_fingerprint(video_path),
+    )
+    store_record(video_path, record, workspace_dir)
+    return record
+
+
+def get_fingerprint(video_path: Path, workspace_dir: Path | None = None) -> str:
+    return get_fingerprint_record(video_path, workspace_dir).sampled
+
+
+def upgrade_to_full_hash(video_path: Path) -> FingerprintRecord:
+    record = get_fingerprint_record(video_path)
+    if record.full:
+        return record
+
+    algorithm, full = compute_full_hash(video_path)
+    upgraded = replace(record, full=full, full_algorithm=algorithm)
+    # Runs in the background, so the workflow may have archived the workspace by now.
+    if store_record(video_path, upgraded, create_workspace=False):
+        logger.info(f"Full {algorithm} hash computed for {video_path.name}")
+    else:
+        logger.info(f"Workspace of {video_path.name} is gone, not caching its full hash")
+    return upgraded
+
+
+@functools.cache
+def _background_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="full-hash")
+
+
+def schedule_full_hash(video_path: Path) -> Future:
+    return _background_executor().submit(upgrade_to_full_hash, video_path)
@@ -0,0 +1,248 @@
+import functools
+import inspect
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from logger import get_logger, log_context
+from metrics import ACTIVITY_CPU, ACTIVITY_DURATION, ACTIVITY_SUBPROCESS
+
+logger = get_logger(__name__)
+
+RSS_SAMPLE_INTERVAL = 0.25
+THREAD_IO_PATH = Path("/proc/thread-self/io")
+STATM_PATH = Path("/proc/self/statm")
+
+_local = threading.local()
+_subprocess_listeners: list[Callable[[list[str], float, int | None], None]] = []
+_stage_listeners: list[Callable[[str, tuple, "StageStats", str], None]] = []
+
+
+@dataclass(frozen=True)
+class StageStats:
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_bytes: int
+    read_bytes: int
+    write_bytes: int
+    subprocess_seconds: float
+    subprocess_count: int
+
+
+@dataclass(frozen=True)
+class InstrumentedResult:
+    value: Any
+    stats: StageStats
+
+
+def unwrap_result(decoded: Any) -> tuple[Any, StageStats | None]:
+    """Splits an activity result decoded without a type hint into value and stats.
+
+    Results recorded before activities were instrumented are the bare value; they
+    are still replayed by workflows started on older workers.
+    """
+    if isinstance(decoded, dict) and decoded.keys() == {"value", "stats"}:
+        return decoded["value"], StageStats(**decoded["stats"])
+    return decoded, None
+
+
+@dataclass
+class _Collector:
+    subprocess_seconds: float = 0.0
+    subprocess_count: int = 0
+
+
+def _read_thread_io() -> tuple[int, int]:
+    """Bytes read/written by the calling thread (Linux only; zeros elsewhere)."""
+    try:
+        fields = dict(
+            line.split(": ") for line in THREAD_IO_PATH.read_text().splitlines()
+        )
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def get_rss_bytes() -> int:
+    try:
+        return int(STATM_PATH.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        # ru_maxrss is the lifetime peak: kilobytes on Linux, bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _RssSampler:
+    """Samples the worker process RSS in a background thread while a stage runs."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = get_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, get_rss_bytes())
+
+    def __enter__(self) -> "_RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, get_rss_bytes())
+
+
+def record_subprocess(args: Any, seconds: float, returncode: int | None = None) -> None:
+    """Attributes a finished subprocess to the stage running in this thread."""
+    collector = getattr(_local, "collector", None)
+    if collector is not None:
+        collector.subprocess_seconds += seconds
+        collector.subprocess_count += 1
+
+    argv = [str(arg) for arg in args] if isinstance(args, (list, tuple)) else [str(args)]
+    for listener in list(_subprocess_listeners):
+        listener(argv, seconds, returncode)
+
+
+def run_subprocess(*popenargs, **kwargs) -> subprocess.CompletedProcess:
+    """`subprocess.run` that attributes its time to the running stage and listeners.
+
+    Used for the pipeline's own ffmpeg/ffprobe calls; long encodes that need
+    streaming progress go through `ffmpeg_progress.run_ffmpeg_with_progress`.
+    """
+    args = popenargs[0] if popenargs else kwargs.get("args")
+    start = time.perf_counter()
+    returncode = None
+    try:
+        result = subprocess.run(*popenargs, **kwargs)
+        returncode = result.returncode
+        return result
+    finally:
+        record_subprocess(args, time.perf_counter() - start, returncode)
+
+
+def add_subprocess_listener(
+    listener: Callable[[list[str], float, int | None], None],
+) -> None:
+    _subprocess_listeners.append(listener)
+
+
+def remove_subprocess_listener(
+    listener: Callable[[list[str], float, int | None], None],
+) -> None:
+    _subprocess_listeners.remove(listener)
+
+
+@contextmanager
+def measure_stage() -> Iterator[Callable[[], StageStats]]:
+    """Measures the enclosed block; call the yielded function after it to get the stats.
+
+    CPU time and I/O bytes are per-thread, so concurrent activities in the worker's
+    thread pool do not inflate each other. Peak RSS is of the whole worker process.
+    """
+    collector = _Collector()
+    previous = getattr(_local, "collector", None)
+    _local.collector = collector
+
+    stats: StageStats | None = None
+    read_start, write_start = _read_thread_io()
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    try:
+        with _RssSampler() as sampler:
+            yield lambda: stats
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        read_end, write_end = _read_thread_io()
+        _local.collector = previous
+        stats = StageStats(
+            wall_seconds=wall,
+            cpu_seconds=cpu,
+            peak_rss_bytes=sampler.peak,
+            read_bytes=read_end - read_start,
+            write_bytes=write_end - write_start,
+            subprocess_seconds=collector.subprocess_seconds,
+            subprocess_count=collector.subprocess_count,
+        )
+
+
+def add_stage_listener(listener: Callable[[str, tuple, StageStats, str], None]) -> None:
+    """Calls `listener(activity_name, args, stats, status)` after every instrumented call."""
+    _stage_listeners.append(listener)
+
+
+def remove_stage_listener(listener: Callable[[str, tuple, StageStats, str], None]) -> None:
+    _stage_listeners.remove(listener)
+
+
+def _export_stats(activity_name: str, args: tuple, stats: StageStats, status: str) -> None:
+    ACTIVITY_DURATION.observe(stats.wall_seconds, activity=activity_name, status=status)
+    ACTIVITY_CPU.inc(stats.cpu_seconds, activity=activity_name)
+    ACTIVITY_SUBPROCESS.inc(stats.subprocess_seconds, activity=activity_name)
+    for listener in list(_stage_listeners):
+        try:
+            listener(activity_name, args, stats, status)
+        except Exception as e:
+            logger.warning(f"Stage listener failed for {activity_name}: {e}")
+
+
+def _current_workflow_id() -> str | None:
+    # Imported here so CLI paths that only need the timers skip loading temporalio.
+    from temporalio import activity
+
+    return activity.info().workflow_id if activity.in_activity() else None
+
+
+def instrumented(fn: Callable) -> Callable[..., InstrumentedResult]:
+    """Wraps an activity so it returns its value together with the stage's StageStats.
+
+    Apply below `@activity.defn`; the wrapper advertises InstrumentedResult as its
+    return type. Workflows decode it with `unwrap_result`, which also accepts the
+    bare values of activities that completed before they were instrumented.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> InstrumentedResult:
+        status = "error"
+        video = Path(args[0]).stem if args and isinstance(args[0], str) else None
+        with log_context(workflow_id=_current_workflow_id(), video=video, stage=fn.__name__):
+            try:
+                with measure_stage() as get_stats:
+                    value = fn(*args, **kwargs)
+                status = "ok"
+            finally:
+                _export_stats(fn.__name__, args, get_stats(), status)
+            stats = get_stats()
+            logger.info(
+                f"{fn.__name__} took {stats.wall_seconds:.2f}s "
+                f"(cpu {stats.cpu_seconds:.2f}s, subprocess {stats.subprocess_seconds:.2f}s)"
+            )
+        return InstrumentedResult(value=value, stats=stats)
+
+    wrapper.__annotations__ = {**fn.__annotations__, "return": InstrumentedResult}
+    wrapper.__signature__ = inspect.signature(fn).replace(
+        return_annotation=InstrumentedResult
+    )
+    return wrapper
+
+
+def format_bytes(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GB"
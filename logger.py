@@ -1,24 +1,190 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+CONTEXT_FIELDS = ("workflow_id", "video", "stage")
+DEFAULT_RATE_LIMIT_SECONDS = 10.0
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(context_text)s%(message)s"
+
+_log_context: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar(
+    "log_context", default={}
+)
+_listener: logging.handlers.QueueListener | None = None
+_settings: dict[str, Any] = {}
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Adds fields such as workflow_id, video and stage to every record logged in the block.
+
+    Context is a contextvar, so it follows the current thread or asyncio task only.
+    """
+    merged = {**_log_context.get(), **{k: str(v) for k, v in fields.items() if v is not None}}
+    token = _log_context.set(merged)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> dict[str, str]:
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the caller's log context on the record before it crosses the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = get_log_context()
+        if "workflow_id" not in context:
+            # Records from Temporal's workflow/activity loggers carry their own info.
+            temporal = getattr(record, "temporal_workflow", None) or getattr(
+                record, "temporal_activity", None
+            )
+            if isinstance(temporal, dict) and temporal.get("workflow_id"):
+                context["workflow_id"] = temporal["workflow_id"]
+        record.context = context
+        record.context_text = (
+            "[" + " ".join(f"{key}={context[key]}" for key in CONTEXT_FIELDS if key in context) + "] "
+            if context
+            else ""
+        )
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the log context as top-level fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolves the message and traceback in the caller's thread, keeping them separate."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RateLimitedLogger(logging.LoggerAdapter):
+    """Logs at most once per `interval` seconds for each log context (e.g. per video).
+
+    Meant for hot loops such as upload progress or per-frame warnings; the next
+    message that gets through reports how many were suppressed in between.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = DEFAULT_RATE_LIMIT_SECONDS):
+        super().__init__(logger, {})
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_emit: dict[tuple, float] = {}
+        self._suppressed: dict[tuple, int] = {}
+
+    def log(self, level: int, msg: object, *args, **kwargs) -> None:
+        if not self.isEnabledFor(level):
+            return
+        key = tuple(sorted(get_log_context().items()))
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_emit.get(key, float("-inf")) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            self._last_emit[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            msg = f"{msg} ({suppressed} similar messages suppressed)"
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+def get_rate_limited_logger(
+    name: str, interval: float = DEFAULT_RATE_LIMIT_SECONDS
+) -> RateLimitedLogger:
+    return RateLimitedLogger(logging.getLogger(name), interval)
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # The listener thread does not survive fork(); without a new one the child's
+    # records would sit in the inherited queue forever.
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging(**_settings)
 
 
 def setup_logging(
     level: int = logging.INFO,
     format_string: Optional[str] = None,
     enable_temporal_integration: bool = True,
+    json_output: bool = False,
 ) -> None:
-    if format_string is None:
-        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    """Routes all records through a queue so callers never block on stdout.
 
-    logging.basicConfig(
+    A QueueListener thread formats and writes them, as JSON lines when
+    `json_output` is set.
+    """
+    global _listener
+    stop_logging()
+    _settings.update(
         level=level,
-        format=format_string,
-        handlers=[logging.StreamHandler(sys.stdout)],
-        force=True,
+        format_string=format_string,
+        enable_temporal_integration=enable_temporal_integration,
+        json_output=json_output,
     )
 
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if json_output:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(format_string or TEXT_FORMAT))
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+
     if enable_temporal_integration:
         logging.getLogger("temporalio").setLevel(logging.WARNING)
         logging.getLogger("temporalio.workflow").setLevel(logging.INFO)
@@ -35,4 +201,6 @@ _log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
 if hasattr(logging, _log_level_str):
     _log_level = getattr(logging, _log_level_str)
 
-setup_logging(level=_log_level)
+setup_logging(level=_log_level, json_output=os.getenv("LOG_FORMAT", "text").lower() == "json")
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
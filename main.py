@@ -1,41 +1,39 @@
 import argparse
 import asyncio
 import sys
+import threading
 from pathlib import Path
 
 import config
-import utils
-from temporal.client import (
-    VideoWorkflowOptions,
-    get_client,
-    start_video_workflow,
-)
+from constants import DEFAULT_THUMBNAIL_TEMPLATE, THUMBNAIL_TEMPLATE_NAMES, THUMBNAIL_THEMES
 from logger import get_logger
-from auth_service import authenticate, validate_auth
-from temporal.worker import main as worker_main
-from temporal.activities import (
-    create_metadata_activity,
-    render_thumbnail_activity,
-    upload_video_activity,
-    auto_select_thumbnail_activity,
-    set_thumbnail_activity,
-    update_video_visibility_activity,
-    cleanup_activity,
-)
-from video_overlay import add_video_overlays, render_cafe_game_overlay, render_thanks_overlay, get_video_dimensions
 
+# Subcommands import their dependencies lazily: the pipeline pulls in Temporal's
+# worker, Google API clients, OpenCV, PIL and Flask, which only some commands need.
 
 logger = get_logger(__name__)
 
 
-async def cmd_start(args):
+def _ensure_auth() -> None:
+    from auth_service import validate_auth
+
     try:
         validate_auth()
     except Exception as e:
         logger.error(f"YouTube authentication failed: {e}. Run 'uv run main.py auth' to re-authenticate.")
         sys.exit(1)
 
-    videos = list(utils.scan_videos(config.INPUT_DIR))
+
+async def cmd_start(args):
+    from temporalio.exceptions import WorkflowAlreadyStartedError
+
+    import utils
+    from scheduling import format_plan, plan_batch
+    from temporal.client import VideoWorkflowOptions, get_client, start_video_workflows
+
+    _ensure_auth()
+
+    videos = sorted(utils.scan_videos(config.INPUT_DIR))
 
     if not videos:
         logger.warning("No videos found in input directory")
@@ -43,19 +41,128 @@ async def cmd_start(args):
 
     logger.info(f"Found {len(videos)} video(s)")
 
+    plan = await asyncio.to_thread(plan_batch, videos, args.order)
+    logger.info(f"Submission order ({args.order}):\n{format_plan(plan)}")
+    videos = [scheduled.video_path for scheduled in plan]
+
     client = await get_client()
 
-    for video_path in videos:
+    options_list = [
+        VideoWorkflowOptions(
+            video_path=str(scheduled.video_path),
+            top_n=config.TOP_RANKED_CANDIDATES_NUM,
+            manual_selection=args.manual_selection,
+            priority=scheduled.priority,
+        )
+        for scheduled in plan
+    ]
+    results = await start_video_workflows(
+        client, options_list, config.WORKFLOW_START_CONCURRENCY
+    )
+
+    for video_path, result in zip(videos, results):
+        if isinstance(result, WorkflowAlreadyStartedError):
+            logger.info(f"Workflow for {video_path.name} already exists, skipping")
+        elif isinstance(result, BaseException):
+            logger.error(f"Failed to start workflow for {video_path.name}: {result}")
+
+
+async def cmd_watch(args):
+    from temporalio.exceptions import WorkflowAlreadyStartedError
+
+    from fingerprint import get_fingerprint
+    from temporal.client import VideoWorkflowOptions, get_client, start_video_workflow
+    from watcher import watch_videos
+
+    _ensure_auth()
+
+    client = await get_client()
+    loop = asyncio.get_running_loop()
+    stop_event = threading.Event()
+    seen_fingerprints: set[str] = set()
+
+    async def start_for_video(video_path: Path) -> bool:
+        fingerprint = await asyncio.to_thread(get_fingerprint, video_path)
+        if fingerprint in seen_fingerprints:
+            logger.info(f"Skipping {video_path.name}: same content already started")
+            return True
+
+        options = VideoWorkflowOptions(
+            video_path=str(video_path), top_n=config.TOP_RANKED_CANDIDATES_NUM
+        )
         try:
-            options = VideoWorkflowOptions(
-                video_path=str(video_path), top_n=config.TOP_RANKED_CANDIDATES_NUM
-            )
-            await start_video_workflow(client, options)
+            await start_video_workflow(client, options, fingerprint=fingerprint)
+        except WorkflowAlreadyStartedError:
+            logger.info(f"Workflow for {video_path.name} already exists, skipping")
         except Exception as e:
             logger.error(f"Failed to start workflow for {video_path.name}: {e}")
+            return False
+        seen_fingerprints.add(fingerprint)
+        return True
+
+    def on_ready(video_path: Path) -> bool:
+        # Waits for the start so the watcher can retry the video when it fails.
+        return asyncio.run_coroutine_threadsafe(start_for_video(video_path), loop).result()
+
+    try:
+        await asyncio.to_thread(
+            watch_videos,
+            config.INPUT_DIR,
+            on_ready,
+            stop_event,
+            config.WATCH_SETTLE_SECONDS,
+            config.WATCH_POLL_INTERVAL,
+        )
+    finally:
+        stop_event.set()
+
+
+async def cmd_select(args):
+    from temporal.client import get_client
+    from web_selector.queue_service import run_selection_service
+
+    client = await get_client()
+    await run_selection_service(client, args.port, args.refresh_interval)
+
+
+def _get_store_table() -> str | None:
+    import state_store
+    import utils
+    from temporal.status import format_store_table
+    from uploader import get_videos_ready_for_upload
+
+    input_videos = sorted(utils.scan_videos(config.INPUT_DIR)) if config.INPUT_DIR.is_dir() else []
+    ready = get_videos_ready_for_upload(input_videos)
+    with state_store.open_store() as conn:
+        videos = [
+            video
+            for video in state_store.list_videos(conn)
+            if state_store.STAGE_ARCHIVED not in video.completed_stages
+        ]
+    if not videos:
+        return None
+    return format_store_table(videos, {path.name for path in ready})
+
+
+async def cmd_status(args):
+    from temporal.client import get_client
+    from temporal.status import format_status_table, get_running_statuses
+
+    client = await get_client()
+    statuses = await get_running_statuses(client)
+    if statuses:
+        logger.info(f"Running workflows:\n{format_status_table(statuses)}")
+    else:
+        logger.info("No running workflows")
+
+    store_table = await asyncio.to_thread(_get_store_table)
+    if store_table:
+        logger.info(f"Videos not archived yet:\n{store_table}")
 
 
 def cmd_auth(args):
+    from auth_service import authenticate
+
     try:
         authenticate()
         logger.info("Authentication completed successfully")
@@ -65,6 +172,8 @@ def cmd_auth(args):
 
 
 async def cmd_worker(args):
+    from temporal.worker import main as worker_main
+
     logger.info("Starting Temporal worker...")
     try:
         await worker_main()
@@ -76,6 +185,16 @@ async def cmd_worker(args):
 
 
 def cmd_debug(args):
+    from temporal.activities import (
+        auto_select_thumbnail_activity,
+        cleanup_activity,
+        create_metadata_activity,
+        render_thumbnail_activity,
+        set_thumbnail_activity,
+        update_video_visibility_activity,
+        upload_video_activity,
+    )
+
     step = args.step
     video_path = args.video_path
 
@@ -98,9 +217,24 @@ def cmd_debug(args):
     logger.info(f"Running step '{step}' for {video_path}")
 
     try:
-        result = activities[step](video_path)
-        logger.info(f"Success: {result}")
-        return result
+        if args.profile or args.trace_subprocess or args.mem:
+            import utils
+            from profiling import profile_step
+
+            report_dir = utils.get_workspace_dir(Path(video_path)) / "debug"
+            with profile_step(
+                report_dir,
+                step,
+                profile=args.profile,
+                trace_subprocess=args.trace_subprocess,
+                mem=args.mem,
+            ):
+                result = activities[step](video_path)
+        else:
+            result = activities[step](video_path)
+        logger.info(f"Success: {result.value}")
+        logger.info(f"Stats: {result.stats}")
+        return result.value
     except Exception as e:
         logger.error(f"Error: {e}")
         import traceback
@@ -109,7 +243,109 @@ def cmd_debug(args):
         sys.exit(1)
 
 
+def cmd_import_state(args):
+    import state_store
+
+    with state_store.open_store() as conn:
+        in_progress = state_store.import_directory(conn, config.INPUT_DIR, archived=False)
+        archived = state_store.import_directory(conn, config.COMPLETED_DIR, archived=True)
+    logger.info(
+        f"Imported {in_progress} in-progress and {archived} archived workspace(s) "
+        f"into {config.STATE_DB_PATH}"
+    )
+
+
+def cmd_prune(args):
+    from retention import apply_retention
+
+    apply_retention(dry_run=args.dry_run)
+
+
+def cmd_rerender(args):
+    from thumbnail_enhancement.batch import (
+        RateLimiter,
+        ThumbnailPushQueue,
+        find_rerender_workspaces,
+        load_archived_upload_record,
+        make_version,
+        rerender_workspaces,
+    )
+
+    workspaces = find_rerender_workspaces(config.COMPLETED_DIR)
+    if not workspaces:
+        logger.warning("No archived workspaces with metadata and selected thumbnail found")
+        return
+
+    version = args.version or make_version()
+    logger.info(
+        f"Re-rendering {len(workspaces)} thumbnail(s) with {args.template} as version {version}"
+    )
+
+    push_queue = None
+    if args.push or args.force_push:
+        from auth_service import get_client as get_youtube_client
+        from uploader import set_thumbnail
+
+        _ensure_auth()
+        youtube_client = get_youtube_client()
+        push_queue = ThumbnailPushQueue(
+            lambda video_id, path: set_thumbnail(youtube_client, video_id, path),
+            RateLimiter(args.push_rate),
+        )
+
+    rendered = skipped = failed = 0
+    try:
+        for result in rerender_workspaces(workspaces, args.template, version, args.workers):
+            if result.error or not result.output_path:
+                failed += 1
+                logger.error(f"Failed to re-render {result.workspace_dir.name}: {result.error}")
+                continue
+
+            if result.skipped:
+                skipped += 1
+            else:
+                rendered += 1
+            # A skipped thumbnail is unchanged since the run that rendered it.
+            if push_queue and (not result.skipped or args.force_push):
+                record = load_archived_upload_record(result.workspace_dir)
+                if record and record.video_id:
+                    push_queue.submit(record.video_id, result.output_path)
+                else:
+                    logger.warning(f"No upload record for {result.workspace_dir.name}, not pushing")
+    finally:
+        if push_queue:
+            push_queue.close()
+
+    logger.info(
+        f"Re-rendered {rendered} thumbnail(s), {skipped} already rendered, {failed} failed"
+    )
+    if push_queue:
+        logger.info(f"Pushed {push_queue.pushed} thumbnail(s), {push_queue.failed} failed")
+
+
+def cmd_render_variants(args):
+    from custom_exceptions import MissingThumbnailDataError
+    from thumbnail_enhancement.variants import ThumbnailVariant, render_variants_for_video
+
+    video_path = Path(args.video_path)
+    variants = [
+        ThumbnailVariant(template_name, theme)
+        for template_name in args.templates
+        for theme in (args.themes or [None])
+    ]
+    try:
+        rendered = render_variants_for_video(video_path, variants)
+    except MissingThumbnailDataError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    for variant in rendered:
+        logger.info(f"{variant.name}: {variant.path} ({variant.size_bytes / 1024:.0f} KB)")
+
+
 def cmd_test_overlay(args):
+    from video_overlay import add_video_overlays
+
     input_path = args.input_video
     p = Path(input_path)
     output_path = args.output or str(p.parent / f"{p.stem}_overlay.mov")
@@ -153,8 +389,60 @@ def main():
         help="Start workflows for all videos in input directory",
         description="Scan input directory and start a workflow for each video",
     )
+    parser_start.add_argument(
+        "--manual-selection",
+        action="store_true",
+        default=config.MANUAL_THUMBNAIL_SELECTION,
+        help="Wait for a thumbnail to be picked with the 'select' command before falling back "
+        "to automatic selection",
+    )
+    parser_start.add_argument(
+        "--order",
+        choices=["sjf", "deadline", "fifo"],
+        default="sjf",
+        help="Submission order and Temporal priority: shortest estimated job first (default), "
+        "earliest @dueYYYYMMDD filename tag first, or filename order. @p1..@p5 filename tags "
+        "always take precedence.",
+    )
     parser_start.set_defaults(func=lambda args: asyncio.run(cmd_start(args)))
 
+    parser_watch = subparsers.add_parser(
+        "watch",
+        help="Watch input directory and start workflows for new videos",
+        description="Watch the input directory (inotify with polling fallback) and start a workflow "
+        "for each new video once its size and mtime are stable. Runs until interrupted (Ctrl+C).",
+    )
+    parser_watch.set_defaults(func=lambda args: asyncio.run(cmd_watch(args)))
+
+    parser_select = subparsers.add_parser(
+        "select",
+        help="Pick thumbnails for every workflow awaiting a manual selection",
+        description="Serve one web selector for all running workflows that wait for a thumbnail "
+        "selection. Each pick signals its workflow and moves on to the next video. "
+        "Runs until interrupted (Ctrl+C).",
+    )
+    parser_select.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port of the selector web server (default: 8765)",
+    )
+    parser_select.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between checks for newly waiting workflows (default: 10)",
+    )
+    parser_select.set_defaults(func=lambda args: asyncio.run(cmd_select(args)))
+
+    parser_status = subparsers.add_parser(
+        "status",
+        help="Show stage timings and resource usage of running workflows",
+        description="Query every running workflow and tabulate wall time, CPU time, "
+        "subprocess (ffmpeg) time, peak worker RSS and disk I/O of each finished stage.",
+    )
+    parser_status.set_defaults(func=lambda args: asyncio.run(cmd_status(args)))
+
     parser_worker = subparsers.add_parser(
         "worker",
         help="Start Temporal worker (long-running process)",
@@ -185,8 +473,117 @@ def main():
         "video_path",
         help="Path to the video file",
     )
+    parser_debug.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=["cprofile", "sample"],
+        default=None,
+        help="Profile the step with cProfile (default) or a low-overhead stack sampler",
+    )
+    parser_debug.add_argument(
+        "--trace-subprocess",
+        action="store_true",
+        help="Log every ffmpeg/ffprobe invocation with its argv, duration and exit code",
+    )
+    parser_debug.add_argument(
+        "--mem",
+        action="store_true",
+        help="Trace Python allocations and report the peak and top allocating lines",
+    )
     parser_debug.set_defaults(func=cmd_debug)
 
+    parser_import_state = subparsers.add_parser(
+        "import-state",
+        help="Import existing workspace JSON files into the state store",
+        description="Scan the input and completed directories and import metadata.json, upload.json "
+        "and rendered artifacts of every workspace into the SQLite state store.",
+    )
+    parser_import_state.set_defaults(func=cmd_import_state)
+
+    parser_prune = subparsers.add_parser(
+        "prune",
+        help="Delete expired regenerable artifacts of archived videos",
+        description="Apply the retention policy to workspaces in the completed directory: delete "
+        "processed.mov and candidate frames past their TTL, then the least recently used ones "
+        "while the total is above RETENTION_MAX_BYTES.",
+    )
+    parser_prune.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list what would be deleted",
+    )
+    parser_prune.set_defaults(func=cmd_prune)
+
+    parser_rerender = subparsers.add_parser(
+        "rerender",
+        help="Re-render thumbnails of every archived video",
+        description="Re-render the thumbnail of every workspace in the completed directory in a "
+        "process pool. Outputs are written next to the original as thumbnail.<version>.jpg.",
+    )
+    parser_rerender.add_argument(
+        "--template",
+        choices=THUMBNAIL_TEMPLATE_NAMES,
+        default=DEFAULT_THUMBNAIL_TEMPLATE,
+        help=f"Thumbnail template to render with (default: {DEFAULT_THUMBNAIL_TEMPLATE})",
+    )
+    parser_rerender.add_argument(
+        "--version",
+        default=None,
+        help="Version label for the outputs (default: current timestamp). "
+        "Re-running with the same version skips thumbnails that are already rendered.",
+    )
+    parser_rerender.add_argument(
+        "--workers",
+        type=int,
+        default=config.RERENDER_WORKERS,
+        help="Number of render processes (default: CPU count)",
+    )
+    parser_rerender.add_argument(
+        "--push",
+        action="store_true",
+        help="Set the re-rendered thumbnails on the uploaded YouTube videos",
+    )
+    parser_rerender.add_argument(
+        "--force-push",
+        action="store_true",
+        help="Like --push, but also push thumbnails skipped because this version was already rendered",
+    )
+    parser_rerender.add_argument(
+        "--push-rate",
+        type=float,
+        default=config.THUMBNAIL_PUSH_RATE,
+        help=f"Maximum thumbnail pushes per second, 0 for unlimited (default: {config.THUMBNAIL_PUSH_RATE})",
+    )
+    parser_rerender.set_defaults(func=cmd_rerender)
+
+    parser_render_variants = subparsers.add_parser(
+        "render-variants",
+        help="Render thumbnail variants of a video for A/B testing",
+        description="Render every combination of the given templates and themes from a single "
+        "decoded and enhanced selected frame. Variants are written to the workspace 'variants' "
+        "directory and listed in variants.json.",
+    )
+    parser_render_variants.add_argument(
+        "video_path",
+        help="Path to the video file",
+    )
+    parser_render_variants.add_argument(
+        "--templates",
+        nargs="+",
+        choices=THUMBNAIL_TEMPLATE_NAMES,
+        default=list(THUMBNAIL_TEMPLATE_NAMES),
+        help="Templates to render (default: all)",
+    )
+    parser_render_variants.add_argument(
+        "--themes",
+        nargs="+",
+        choices=THUMBNAIL_THEMES,
+        default=None,
+        help="Themes to render (default: the theme derived from the tournament name)",
+    )
+    parser_render_variants.set_defaults(func=cmd_render_variants)
+
     parser_test_overlay = subparsers.add_parser(
         "test-overlay",
         help="Apply video text overlays to a video file for visual testing",
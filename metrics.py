@@ -0,0 +1,294 @@
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# (metric name suffix, label pairs, value)
+Sample = tuple[str, tuple[tuple[str, str], ...], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", key, value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Evaluates `function` at scrape time instead of storing a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            values[key] = function()
+        for key, value in values.items():
+            yield "", key, value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in items:
+            for bound, count in zip(self.buckets, counts):
+                yield "_bucket", key + (("le", _format_value(bound)),), count
+            yield "_count", key, counts[-1]
+            yield "_sum", key, total
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                for suffix, labels, value in metric.samples():
+                    lines.append(
+                        f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                    )
+            except Exception as e:
+                logger.warning(f"Could not collect metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+ACTIVITY_DURATION = REGISTRY.histogram(
+    "activity_duration_seconds", "Wall time of activity executions.", ("activity", "status")
+)
+ACTIVITY_CPU = REGISTRY.counter(
+    "activity_cpu_seconds_total", "CPU time of activity threads.", ("activity",)
+)
+ACTIVITY_SUBPROCESS = REGISTRY.counter(
+    "activity_subprocess_seconds_total", "Time activities spent waiting on subprocesses.", ("activity",)
+)
+UPLOAD_BYTES = REGISTRY.counter("upload_bytes_total", "Video bytes uploaded to YouTube.")
+FFMPEG_ENCODE_DURATION = REGISTRY.histogram(
+    "ffmpeg_encode_seconds", "Wall time of overlay encodes.", ("encoder",)
+)
+FFMPEG_ENCODE_SPEED = REGISTRY.gauge(
+    "ffmpeg_encode_speed", "Media seconds encoded per wall second in the last encode.", ("encoder",)
+)
+FFMPEG_ENCODE_FPS = REGISTRY.gauge(
+    "ffmpeg_encode_fps", "Frames per second reported by the running overlay encode.", ("encoder",)
+)
+CLIP_BATCH_DURATION = REGISTRY.histogram(
+    "clip_batch_seconds", "Latency of one CLIP scoring batch.", (), (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+
+def register_lru_cache(name: str, cached_function, registry: Registry = REGISTRY) -> None:
+    """Exports hits, misses and hit ratio of a functools.lru_cache at scrape time."""
+    hits = registry.gauge("cache_hits", "Hits of in-process caches.", ("cache",))
+    misses = registry.gauge("cache_misses", "Misses of in-process caches.", ("cache",))
+    ratio = registry.gauge("cache_hit_ratio", "Hit ratio of in-process caches.", ("cache",))
+
+    def hit_ratio() -> float:
+        info = cached_function.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    hits.set_function(lambda: cached_function.cache_info().hits, cache=name)
+    misses.set_function(lambda: cached_function.cache_info().misses, cache=name)
+    ratio.set_function(hit_ratio, cache=name)
+
+
+class MeteredThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor exporting its queue depth, busy threads and utilization."""
+
+    def __init__(self, max_workers: int, name: str, registry: Registry = REGISTRY, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        self.max_workers = max_workers
+        self.queued = 0
+        self.active = 0
+        self._counter_lock = threading.Lock()
+
+        labels = {"executor": name}
+        registry.gauge(
+            "executor_queue_depth", "Tasks waiting for an executor thread.", ("executor",)
+        ).set_function(lambda: self.queued, **labels)
+        registry.gauge(
+            "executor_active_threads", "Executor threads running a task.", ("executor",)
+        ).set_function(lambda: self.active, **labels)
+        registry.gauge(
+            "executor_utilization", "Fraction of executor threads busy.", ("executor",)
+        ).set_function(lambda: self.active / self.max_workers, **labels)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._counter_lock:
+            self.queued += 1
+
+        def run():
+            with self._counter_lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._counter_lock:
+                    self.active -= 1
+
+        return super().submit(run)
+
+
+def start_metrics_server(
+    port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY
+) -> ThreadingHTTPServer:
+    """Serves `registry` at /metrics from a daemon thread; port 0 picks a free port."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{server.server_address[1]}/metrics")
+    return server
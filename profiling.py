@@ -0,0 +1,232 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from instrumentation import add_subprocess_listener, format_bytes, remove_subprocess_listener
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+MEMORY_SNAPSHOT_INTERVAL = 0.1
+# A new snapshot walks every trace, so one is only taken once memory is 10% above the last.
+MEMORY_SNAPSHOT_GROWTH = 1.1
+
+
+@contextmanager
+def cprofile_report(prefix: Path) -> Iterator[None]:
+    """Profiles the calling thread; writes `<prefix>.prof` and a cumulative-time summary."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{prefix}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        Path(f"{prefix}.profile.txt").write_text(summary.getvalue())
+        logger.info(f"cProfile report written to {prefix}.profile.txt (raw stats: {prefix}.prof)")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval, like a sampling profiler.
+
+    Unlike cProfile it adds almost no overhead to the profiled code, so timings
+    of hot loops stay realistic.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> str:
+        total = sum(self.stacks.values())
+        if not total:
+            return "No samples collected; the step finished too quickly.\n"
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g}ms", "", "Top functions by own time:"]
+        lines += [f"{count / total:7.1%}  {label}" for label, count in own.most_common(TOP_FUNCTIONS)]
+        lines += ["", "Top functions by total time:"]
+        lines += [f"{count / total:7.1%}  {label}" for label, count in inclusive.most_common(TOP_FUNCTIONS)]
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def sampling_report(prefix: Path) -> Iterator[None]:
+    """Samples the calling thread; writes a summary and `<prefix>.folded` for flame graphs."""
+    sampler = StackSampler(threading.get_ident())
+    try:
+        with sampler:
+            yield
+    finally:
+        Path(f"{prefix}.folded").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in sampler.stacks.items())
+        )
+        Path(f"{prefix}.samples.txt").write_text(sampler.summary())
+        logger.info(f"Sampling report written to {prefix}.samples.txt (flame graph input: {prefix}.folded)")
+
+
+@contextmanager
+def subprocess_trace_report(prefix: Path) -> Iterator[None]:
+    """Logs every subprocess with its argv, duration and exit code; writes `<prefix>.subprocess.txt`."""
+    started = time.perf_counter()
+    calls: list[tuple[float, float, int | None, list[str]]] = []
+
+    def on_subprocess(argv: list[str], seconds: float, returncode: int | None) -> None:
+        offset = time.perf_counter() - started - seconds
+        calls.append((offset, seconds, returncode, argv))
+        logger.info(f"subprocess {seconds:.3f}s rc={returncode}: {' '.join(argv)}")
+
+    add_subprocess_listener(on_subprocess)
+    try:
+        yield
+    finally:
+        remove_subprocess_listener(on_subprocess)
+        total = sum(seconds for _, seconds, _, _ in calls)
+        lines = [f"{len(calls)} subprocesses, {total:.3f}s total", "", "start_s\tseconds\trc\targv"]
+        lines += [
+            f"{offset:.3f}\t{seconds:.3f}\t{returncode}\t{' '.join(argv)}"
+            for offset, seconds, returncode, argv in sorted(calls)
+        ]
+        Path(f"{prefix}.subprocess.txt").write_text("\n".join(lines) + "\n")
+        logger.info(f"Subprocess trace written to {prefix}.subprocess.txt")
+
+
+class _PeakSnapshotter:
+    """Keeps the tracemalloc snapshot taken when traced memory was highest.
+
+    A snapshot at exit only shows what is still alive, which misses short-lived
+    frame buffers; polling keeps the allocation sites close to the peak. While
+    memory keeps growing, snapshots are spaced by `growth` so they do not skew
+    the profiled stage.
+    """
+
+    def __init__(
+        self, interval: float = MEMORY_SNAPSHOT_INTERVAL, growth: float = MEMORY_SNAPSHOT_GROWTH
+    ):
+        self.interval = interval
+        self.growth = growth
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.snapshot_size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def poll(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot is None or current >= self.snapshot_size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def __enter__(self) -> "_PeakSnapshotter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.poll()
+
+
+@contextmanager
+def memory_report(prefix: Path) -> Iterator[None]:
+    """Traces Python allocations; writes the peak and top allocating lines to `<prefix>.memory.txt`."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    snapshotter = _PeakSnapshotter()
+    try:
+        with snapshotter:
+            yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        if not already_tracing:
+            tracemalloc.stop()
+
+        ignore_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        snapshot = snapshotter.snapshot.filter_traces(ignore_tracemalloc)
+        lines = [
+            f"Peak traced memory: {format_bytes(peak)}",
+            f"Still allocated at exit: {format_bytes(current)}",
+            "",
+            f"Top allocations by line at {format_bytes(snapshotter.snapshot_size)} traced:",
+        ]
+        lines += [str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+        Path(f"{prefix}.memory.txt").write_text("\n".join(lines) + "\n")
+        logger.info(f"Memory report written to {prefix}.memory.txt (peak {format_bytes(peak)})")
+
+
+@contextmanager
+def profile_step(
+    report_dir: Path,
+    name: str,
+    profile: str | None = None,
+    trace_subprocess: bool = False,
+    mem: bool = False,
+) -> Iterator[Path]:
+    """Runs the enclosed block under the requested profilers and yields the report prefix.
+
+    Reports are named `<report_dir>/<name>-<timestamp>.*` and are written even when
+    the block raises, so failing stages can be diagnosed too.
+    """
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = report_dir / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}"
+    with ExitStack() as stack:
+        if trace_subprocess:
+            stack.enter_context(subprocess_trace_report(prefix))
+        if mem:
+            stack.enter_context(memory_report(prefix))
+        if profile == "cprofile":
+            stack.enter_context(cprofile_report(prefix))
+        elif profile == "sample":
+            stack.enter_context(sampling_report(prefix))
+        yield prefix
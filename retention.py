@@ -0,0 +1,231 @@
+import shutil
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import atomic_io
+import config
+import utils
+from archive import tree_size
+from custom_exceptions import InsufficientDiskSpaceError
+from instrumentation import format_bytes
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+_reservation_lock = threading.Lock()
+_eviction_lock = threading.Lock()
+_reserved_bytes: dict[int, int] = {}
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    """A regenerable artifact, by its file or directory name inside a workspace."""
+
+    name: str
+    ttl_days: float | None = None
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    rules: tuple[RetentionRule, ...]
+    max_total_bytes: int | None = None
+
+
+@dataclass(frozen=True)
+class Artifact:
+    path: Path
+    rule: RetentionRule
+    size_bytes: int
+    last_used: float
+
+
+def _ttl(days: float) -> float | None:
+    return days if days > 0 else None
+
+
+def default_policy() -> RetentionPolicy:
+    # Only artifacts that can be rebuilt from the archived video are managed;
+    # metadata, upload records and the selected/rendered thumbnails are never touched.
+    return RetentionPolicy(
+        rules=(
+            RetentionRule(utils.PROCESSED_VIDEO_NAME, _ttl(config.RETENTION_PROCESSED_TTL_DAYS)),
+            RetentionRule(utils.CANDIDATES_DIR, _ttl(config.RETENTION_CANDIDATES_TTL_DAYS)),
+            RetentionRule(utils.TOP_RANKED_CANDIDATES_DIR, _ttl(config.RETENTION_CANDIDATES_TTL_DAYS)),
+        ),
+        max_total_bytes=config.RETENTION_MAX_BYTES or None,
+    )
+
+
+def _last_used(path: Path) -> float:
+    paths = [path] + (list(path.rglob("*")) if path.is_dir() else [])
+    return max(max(st.st_atime, st.st_mtime) for st in (p.stat() for p in paths))
+
+
+def find_artifacts(roots: list[Path], rules: tuple[RetentionRule, ...]) -> list[Artifact]:
+    artifacts = []
+    for root in roots:
+        if not root.is_dir():
+            continue
+        for workspace_dir in sorted(root.iterdir()):
+            if not (workspace_dir / utils.METADATA_FILE).exists():
+                continue
+            for rule in rules:
+                path = workspace_dir / rule.name
+                if path.exists():
+                    artifacts.append(Artifact(path, rule, tree_size(path), _last_used(path)))
+    return artifacts
+
+
+def plan_evictions(
+    artifacts: list[Artifact], policy: RetentionPolicy, now: float
+) -> list[Artifact]:
+    """Expired artifacts first, then least recently used ones until under max_total_bytes."""
+    expired = [
+        artifact
+        for artifact in artifacts
+        if artifact.rule.ttl_days is not None
+        and now - artifact.last_used > artifact.rule.ttl_days * SECONDS_PER_DAY
+    ]
+    if policy.max_total_bytes is None:
+        return expired
+
+    remaining = sorted(
+        (artifact for artifact in artifacts if artifact not in expired),
+        key=lambda artifact: artifact.last_used,
+    )
+    total = sum(artifact.size_bytes for artifact in remaining)
+    for artifact in remaining:
+        if total <= policy.max_total_bytes:
+            break
+        expired.append(artifact)
+        total -= artifact.size_bytes
+    return expired
+
+
+def evict(
+    artifacts: list[Artifact],
+    dry_run: bool = False,
+    on_evict: Callable[[Artifact], None] | None = None,
+) -> int:
+    freed = 0
+    for artifact in artifacts:
+        logger.info(
+            f"{'Would evict' if dry_run else 'Evicting'} {artifact.path} "
+            f"({format_bytes(artifact.size_bytes)})"
+        )
+        if not dry_run:
+            if artifact.path.is_dir():
+                shutil.rmtree(artifact.path, ignore_errors=True)
+            else:
+                atomic_io.discard_artifact(artifact.path)
+        freed += artifact.size_bytes
+        if on_evict:
+            on_evict(artifact)
+    return freed
+
+
+def apply_retention(
+    policy: RetentionPolicy | None = None,
+    roots: list[Path] | None = None,
+    dry_run: bool = False,
+    now: float | None = None,
+) -> list[Artifact]:
+    """Prunes regenerable artifacts of archived workspaces according to the policy."""
+    policy = policy or default_policy()
+    artifacts = find_artifacts(roots or [config.COMPLETED_DIR], policy.rules)
+    evictions = plan_evictions(artifacts, policy, time.time() if now is None else now)
+    freed = evict(evictions, dry_run)
+    logger.info(
+        f"Retention: {len(evictions)} of {len(artifacts)} artifact(s), "
+        f"{format_bytes(freed)} {'reclaimable' if dry_run else 'freed'}"
+    )
+    return evictions
+
+
+def estimate_overlay_output_bytes(video_path: Path) -> int:
+    """The overlay pass re-encodes the whole video; its size tracks the source's."""
+    return int(video_path.stat().st_size * config.OVERLAY_OUTPUT_SIZE_FACTOR)
+
+
+def _free_for_lru_eviction(
+    device: int,
+    shortfall: int,
+    roots: list[Path],
+    on_evict: Callable[[Artifact], None] | None = None,
+) -> int:
+    artifacts = sorted(
+        (
+            artifact
+            for artifact in find_artifacts(roots, default_policy().rules)
+            if artifact.path.stat().st_dev == device
+        ),
+        key=lambda artifact: artifact.last_used,
+    )
+    evictions = []
+    for artifact in artifacts:
+        if shortfall <= 0:
+            break
+        evictions.append(artifact)
+        shortfall -= artifact.size_bytes
+    if shortfall > 0:
+        # Evicting would not free enough anyway; keep the artifacts.
+        return 0
+    return evict(evictions, on_evict=on_evict)
+
+
+def _try_reserve(directory: Path, device: int, needed_bytes: int, required: int) -> int:
+    """Reserves `needed_bytes` when `required` bytes are free; returns the bytes that were free."""
+    with _reservation_lock:
+        available = shutil.disk_usage(directory).free - _reserved_bytes.get(device, 0)
+        if available >= required:
+            _reserved_bytes[device] = _reserved_bytes.get(device, 0) + needed_bytes
+        return available
+
+
+@contextmanager
+def disk_space_reservation(
+    directory: Path,
+    needed_bytes: int,
+    roots: list[Path] | None = None,
+    on_evict: Callable[[Artifact], None] | None = None,
+) -> Iterator[None]:
+    """Reserves `needed_bytes` on the filesystem of `directory` while the block runs.
+
+    Reservations of concurrent activities count as used, so parallel encodes do not
+    all pass the check against the same free space. Under pressure, least recently
+    used regenerable artifacts on the same filesystem are evicted first, calling
+    `on_evict` after each; if that is not enough, InsufficientDiskSpaceError is
+    raised before any work starts. Evicting does not block reservations that fit.
+    """
+    device = directory.stat().st_dev
+    required = needed_bytes + config.DISK_SPACE_RESERVE_BYTES
+    available = _try_reserve(directory, device, needed_bytes, required)
+    if available < required:
+        with _eviction_lock:
+            # Another encode may have evicted enough while this one waited.
+            available = _try_reserve(directory, device, needed_bytes, required)
+            if available < required:
+                logger.warning(
+                    f"Only {format_bytes(max(available, 0))} free for {directory}, "
+                    f"need {format_bytes(required)}; evicting regenerable artifacts"
+                )
+                _free_for_lru_eviction(
+                    device, required - available, roots or [config.COMPLETED_DIR], on_evict
+                )
+                available = _try_reserve(directory, device, needed_bytes, required)
+        if available < required:
+            raise InsufficientDiskSpaceError(
+                f"{format_bytes(max(available, 0))} free for {directory}, "
+                f"need {format_bytes(required)}"
+            )
+    try:
+        yield
+    finally:
+        with _reservation_lock:
+            _reserved_bytes[device] -= needed_bytes
@@ -0,0 +1,42 @@
+import hashlib
+import os
+from pathlib import Path
+
+FINGERPRINT_VERSION = 1
+SAMPLE_BLOCK_SIZE = 1024 * 1024  # 1MB
+SAMPLE_BLOCK_COUNT = 8
+
+
+def sample_ranges(
+    file_size: int, block_size: int, block_count: int
+) -> list[tuple[int, int]]:
+    """Head, tail and `block_count` evenly spaced blocks; small files are read whole."""
+    if file_size <= block_size * (block_count + 2):
+        return [(0, file_size)]
+
+    last_offset = file_size - block_size
+    step = last_offset / (block_count + 1)
+    offsets = [0] + [int(step * i) for i in range(1, block_count + 1)] + [last_offset]
+    return [(offset, block_size) for offset in offsets]
+
+
+def compute_fingerprint(
+    video_path: Path,
+    block_size: int = SAMPLE_BLOCK_SIZE,
+    block_count: int = SAMPLE_BLOCK_COUNT,
+) -> str:
+    file_size = video_path.stat().st_size
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(FINGERPRINT_VERSION.to_bytes(2, "little"))
+    digest.update(file_size.to_bytes(8, "little"))
+
+    # pread keeps reads positional and thread-safe without mapping a
+    # multi-GB file into the address space.
+    fd = os.open(video_path, os.O_RDONLY)
+    try:
+        for offset, length in sample_ranges(file_size, block_size, block_count):
+            digest.update(os.pread(fd, length, offset))
+    finally:
+        os.close(fd)
+
+    return digest.hexdigest()
@@ -0,0 +1,258 @@
+import json
+import math
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import atomic_io
+import config
+import state_store
+import utils
+from constants import SCHEDULING_TAG_PREFIX
+from instrumentation import StageStats, run_subprocess
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEDULING_POLICIES = ("sjf", "deadline", "fifo")
+DEFAULT_PRIORITY = 3
+HIGHEST_PRIORITY = 1
+LOWEST_PRIORITY = 5
+# Used when ffprobe cannot read the file: roughly a 4K phone recording.
+ASSUMED_BYTES_PER_SECOND = 50_000_000 / 8
+PROBE_WORKERS = 8
+# (upper bound of estimated processing seconds, priority) for automatic SJF priorities.
+SJF_PRIORITY_BUCKETS = ((15 * 60, 2), (60 * 60, 3))
+
+
+@dataclass(frozen=True)
+class VideoProbe:
+    size: int
+    mtime_ns: int
+    duration: float | None
+
+
+@dataclass(frozen=True)
+class StageCost:
+    fixed_seconds: float
+    seconds_per_media_second: float
+
+    def estimate(self, media_seconds: float) -> float:
+        return self.fixed_seconds + self.seconds_per_media_second * media_seconds
+
+
+# Rough starting points, replaced per activity once the worker has recorded timings.
+DEFAULT_STAGE_COSTS = {
+    "create_metadata_activity": StageCost(2, 0),
+    "auto_select_thumbnail_activity": StageCost(5, 0.01),
+    "render_thumbnail_activity": StageCost(3, 0),
+    "add_video_overlays_activity": StageCost(10, 0.5),
+    "upload_video_activity": StageCost(10, 0.3),
+    "update_video_visibility_activity": StageCost(2, 0),
+    "set_thumbnail_activity": StageCost(2, 0),
+    "cleanup_activity": StageCost(2, 0.02),
+}
+
+
+@dataclass(frozen=True)
+class ScheduleTags:
+    priority: int | None = None
+    deadline: datetime | None = None
+
+
+@dataclass(frozen=True)
+class ScheduledVideo:
+    video_path: Path
+    media_seconds: float
+    estimated_seconds: float
+    tags: ScheduleTags
+    priority: int | None
+
+
+def parse_schedule_tags(video_stem: str) -> ScheduleTags:
+    """Reads `@p1`..`@p5` (1 is most urgent) and `@dueYYYYMMDD` parts of a filename."""
+    priority = deadline = None
+    for part in video_stem.split("_"):
+        if not part.startswith(SCHEDULING_TAG_PREFIX):
+            continue
+        tag = part[len(SCHEDULING_TAG_PREFIX):].lower()
+        if tag[:1] == "p" and tag[1:].isdigit() and HIGHEST_PRIORITY <= int(tag[1:]) <= LOWEST_PRIORITY:
+            priority = int(tag[1:])
+        elif tag.startswith("due"):
+            try:
+                # Due by the end of that day.
+                deadline = datetime.strptime(tag[3:], "%Y%m%d") + timedelta(days=1)
+            except ValueError:
+                logger.warning(f"Ignoring invalid deadline tag '{part}' in {video_stem}")
+        else:
+            logger.warning(f"Ignoring unknown scheduling tag '{part}' in {video_stem}")
+    return ScheduleTags(priority=priority, deadline=deadline)
+
+
+def _probe_duration(video_path: Path) -> float | None:
+    try:
+        result = run_subprocess(
+            [
+                "ffprobe",
+                "-v", "quiet",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                str(video_path),
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return float(result.stdout)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def _probe_locations(video_path: Path) -> list[tuple[Path, Path]]:
+    # Archived videos and workspaces live in COMPLETED_DIR after cleanup.
+    archived = config.COMPLETED_DIR / video_path.name
+    return [
+        (video_path, utils.get_workspace_dir(video_path)),
+        (archived, config.COMPLETED_DIR / video_path.stem),
+    ]
+
+
+def load_cached_probe(video_path: Path) -> VideoProbe | None:
+    """The cached probe if it still matches the file's size and mtime; never runs ffprobe."""
+    for video, workspace_dir in _probe_locations(video_path):
+        try:
+            probe = VideoProbe(**json.loads((workspace_dir / utils.PROBE_FILE).read_text()))
+            st = video.stat()
+        except (OSError, json.JSONDecodeError, TypeError):
+            continue
+        if probe.size == st.st_size and probe.mtime_ns == st.st_mtime_ns:
+            return probe
+    return None
+
+
+def probe_video(video_path: Path) -> VideoProbe:
+    cached = load_cached_probe(video_path)
+    if cached:
+        return cached
+
+    st = video_path.stat()
+    probe = VideoProbe(size=st.st_size, mtime_ns=st.st_mtime_ns, duration=_probe_duration(video_path))
+    atomic_io.atomic_write_json(utils.get_workspace_dir(video_path) / utils.PROBE_FILE, asdict(probe))
+    return probe
+
+
+def media_seconds(probe: VideoProbe) -> float:
+    if probe.duration is not None:
+        return probe.duration
+    return probe.size / ASSUMED_BYTES_PER_SECOND
+
+
+def fit_stage_cost(samples: list[tuple[float, float]]) -> StageCost | None:
+    """Least-squares fit of wall time against media duration, clamped to be non-negative."""
+    if not samples:
+        return None
+    durations = [duration for duration, _ in samples]
+    walls = [wall for _, wall in samples]
+    if len(samples) >= 3 and len(set(durations)) > 1:
+        slope, intercept = statistics.linear_regression(durations, walls)
+        if slope >= 0 and intercept >= 0:
+            return StageCost(intercept, slope)
+    if sum(durations) > 0:
+        return StageCost(0, sum(walls) / sum(durations))
+    return StageCost(statistics.median(walls), 0)
+
+
+def load_cost_model() -> dict[str, StageCost]:
+    with state_store.open_store() as conn:
+        timings = state_store.get_stage_timings(conn)
+    fitted = {activity: fit_stage_cost(samples) for activity, samples in timings.items()}
+    return {**DEFAULT_STAGE_COSTS, **{k: v for k, v in fitted.items() if v is not None}}
+
+
+def estimate_processing_seconds(media_duration: float, cost_model: dict[str, StageCost]) -> float:
+    return sum(cost.estimate(media_duration) for cost in cost_model.values())
+
+
+def sjf_priority(estimated_seconds: float) -> int:
+    for upper_bound, priority in SJF_PRIORITY_BUCKETS:
+        if estimated_seconds <= upper_bound:
+            return priority
+    return 4
+
+
+def deadline_priority(deadline: datetime | None, estimated_seconds: float, now: datetime) -> int:
+    if deadline is None:
+        return 4
+    slack = (deadline - now).total_seconds() - estimated_seconds
+    if slack <= 0:
+        return 1
+    return 2 if slack <= 24 * 60 * 60 else 3
+
+
+def order_videos(videos: list[ScheduledVideo], policy: str) -> list[ScheduledVideo]:
+    """Submission order matching the priority keys: shortest or earliest-due first within each.
+
+    Shortest-first minimizes the average time until a video is published.
+    """
+    if policy == "fifo":
+        return list(videos)
+
+    def key(video: ScheduledVideo):
+        priority = DEFAULT_PRIORITY if video.priority is None else video.priority
+        if policy == "deadline":
+            deadline = video.tags.deadline.timestamp() if video.tags.deadline else math.inf
+            return priority, deadline, video.estimated_seconds
+        return priority, video.estimated_seconds
+
+    return sorted(videos, key=key)
+
+
+def plan_batch(
+    video_paths: list[Path], policy: str = "sjf", now: datetime | None = None
+) -> list[ScheduledVideo]:
+    """Probes (cached) and orders a batch; each video gets a Temporal priority key (1 = first)."""
+    now = now or datetime.now()
+    cost_model = load_cost_model()
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        probes = list(executor.map(probe_video, video_paths))
+
+    videos = []
+    for video_path, probe in zip(video_paths, probes):
+        duration = media_seconds(probe)
+        estimated = estimate_processing_seconds(duration, cost_model)
+        tags = parse_schedule_tags(video_path.stem)
+        if tags.priority is not None:
+            priority = tags.priority
+        elif policy == "sjf":
+            priority = sjf_priority(estimated)
+        elif policy == "deadline":
+            priority = deadline_priority(tags.deadline, estimated, now)
+        else:
+            priority = None
+        videos.append(ScheduledVideo(video_path, duration, estimated, tags, priority))
+    return order_videos(videos, policy)
+
+
+def record_stage_timing(activity_name: str, args: tuple, stats: StageStats, status: str) -> None:
+    """Stage listener for the worker: keeps the timing history the cost model is fitted on."""
+    if status != "ok" or not args or not isinstance(args[0], str):
+        return
+    probe = load_cached_probe(Path(args[0]))
+    if probe is None or probe.duration is None:
+        return
+    with state_store.open_store() as conn:
+        state_store.add_stage_timing(conn, activity_name, probe.duration, stats.wall_seconds)
+
+
+def format_plan(videos: list[ScheduledVideo]) -> str:
+    lines = [f"{'#':>3}  {'priority':>8}  {'duration':>9}  {'estimate':>9}  video"]
+    for index, video in enumerate(videos, 1):
+        priority = "-" if video.priority is None else str(video.priority)
+        lines.append(
+            f"{index:>3}  {priority:>8}  {video.media_seconds / 60:>8.1f}m  "
+            f"{video.estimated_seconds / 60:>8.1f}m  {video.video_path.name}"
+        )
+    return "\n".join(lines)
@@ -25,3 +25,12 @@ class ChannelInfo:
     channel_id: str
     title: str
     description: str
+
+
+@dataclass(frozen=True)
+class VideoState:
+    fingerprint: str
+    video_name: str
+    completed_stages: tuple[str, ...]
+    video_id: str | None
+    updated_at: str
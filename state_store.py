@@ -0,0 +1,483 @@
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import atomic_io
+import config
+import utils
+from custom_exceptions import CorruptArtifactError
+from fingerprint import get_fingerprint
+from logger import get_logger
+from schemas import MatchMetadata, UploadedRecord, VideoState
+
+logger = get_logger(__name__)
+
+_schema_lock = threading.Lock()
+_schema_applied: set[Path] = set()
+
+STAGE_METADATA = "metadata"
+STAGE_SELECTED_THUMBNAIL = "selected_thumbnail"
+STAGE_THUMBNAIL = "thumbnail"
+STAGE_PROCESSED_VIDEO = "processed_video"
+STAGE_UPLOADED = "uploaded"
+STAGE_ARCHIVED = "archived"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    fingerprint TEXT PRIMARY KEY,
+    video_name TEXT NOT NULL,
+    metadata TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_name ON videos(video_name);
+
+CREATE TABLE IF NOT EXISTS stages (
+    fingerprint TEXT NOT NULL REFERENCES videos(fingerprint),
+    stage TEXT NOT NULL,
+    artifact_path TEXT,
+    artifact_size INTEGER,
+    artifact_mtime_ns INTEGER,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (fingerprint, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_stages_stage ON stages(stage);
+
+CREATE TABLE IF NOT EXISTS uploads (
+    fingerprint TEXT PRIMARY KEY REFERENCES videos(fingerprint),
+    video_id TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    thumbnail_set INTEGER NOT NULL,
+    youtube_link TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS stage_timings (
+    activity TEXT NOT NULL,
+    media_seconds REAL NOT NULL,
+    wall_seconds REAL NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stage_timings_activity ON stage_timings(activity, recorded_at);
+"""
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    # Databases created before the artifact stat columns existed.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(stages)")}
+    for column in ("artifact_size", "artifact_mtime_ns"):
+        if column in columns:
+            continue
+        try:
+            conn.execute(f"ALTER TABLE stages ADD COLUMN {column} INTEGER")
+        except sqlite3.OperationalError as e:
+            # Another process migrated the same database first.
+            if "duplicate column" not in str(e):
+                raise
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # The schema and WAL mode persist in the file, so they are applied once per
+    # process unless the database was removed in the meantime.
+    needs_schema = db_path not in _schema_applied or not db_path.exists()
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if needs_schema:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _add_missing_columns(conn)
+            _schema_applied.add(db_path)
+    return conn
+
+
+@contextmanager
+def open_store(db_path: Path | None = None) -> Iterator[sqlite3.Connection]:
+    conn = connect(db_path or config.STATE_DB_PATH)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _register_video(conn: sqlite3.Connection, fingerprint: str, video_name: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO videos (fingerprint, video_name, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(fingerprint) DO UPDATE SET
+            video_name = excluded.video_name, updated_at = excluded.updated_at
+        """,
+        (fingerprint, video_name, _now()),
+    )
+
+
+def _insert_stage(
+    conn: sqlite3.Connection, fingerprint: str, stage: str, artifact_path: str | None
+) -> None:
+    size = mtime_ns = None
+    if artifact_path:
+        try:
+            st = Path(artifact_path).stat()
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except FileNotFoundError:
+            pass
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO stages
+            (fingerprint, stage, artifact_path, artifact_size, artifact_mtime_ns, completed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (fingerprint, stage, artifact_path, size, mtime_ns, _now()),
+    )
+
+
+def mark_stage_complete(
+    conn: sqlite3.Connection,
+    fingerprint: str,
+    video_name: str,
+    stage: str,
+    artifact_path: str | None = None,
+) -> None:
+    with conn:
+        _register_video(conn, fingerprint, video_name)
+        _insert_stage(conn, fingerprint, stage, artifact_path)
+
+
+def clear_stage(conn: sqlite3.Connection, fingerprint: str, stage: str) -> None:
+    with conn:
+        conn.execute(
+            "DELETE FROM stages WHERE fingerprint = ? AND stage = ?", (fingerprint, stage)
+        )
+
+
+def get_stage_artifact(
+    conn: sqlite3.Connection, fingerprint: str, stage: str
+) -> str | None:
+    row = conn.execute(
+        "SELECT artifact_path FROM stages WHERE fingerprint = ? AND stage = ?",
+        (fingerprint, stage),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def stage_matches_artifact(
+    conn: sqlite3.Connection, fingerprint: str, stage: str, artifact_path: Path
+) -> bool:
+    """Whether the stage row recorded `artifact_path` with its current size and mtime."""
+    row = conn.execute(
+        """
+        SELECT artifact_path, artifact_size, artifact_mtime_ns FROM stages
+        WHERE fingerprint = ? AND stage = ?
+        """,
+        (fingerprint, stage),
+    ).fetchone()
+    if not row or row[0] != str(artifact_path):
+        return False
+    try:
+        st = artifact_path.stat()
+    except FileNotFoundError:
+        return False
+    return (row[1], row[2]) == (st.st_size, st.st_mtime_ns)
+
+
+def has_stage(conn: sqlite3.Connection, fingerprint: str, stage: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM stages WHERE fingerprint = ? AND stage = ?", (fingerprint, stage)
+    ).fetchone()
+    return row is not None
+
+
+def save_metadata(
+    conn: sqlite3.Connection,
+    fingerprint: str,
+    video_name: str,
+    metadata: MatchMetadata,
+    artifact_path: str | None = None,
+) -> None:
+    with conn:
+        _register_video(conn, fingerprint, video_name)
+        conn.execute(
+            "UPDATE videos SET metadata = ? WHERE fingerprint = ?",
+            (json.dumps(asdict(metadata), ensure_ascii=False), fingerprint),
+        )
+        _insert_stage(conn, fingerprint, STAGE_METADATA, artifact_path)
+
+
+def get_metadata(conn: sqlite3.Connection, fingerprint: str) -> MatchMetadata | None:
+    row = conn.execute(
+        "SELECT metadata FROM videos WHERE fingerprint = ?", (fingerprint,)
+    ).fetchone()
+    if not row or row[0] is None:
+        return None
+    return MatchMetadata(**json.loads(row[0]))
+
+
+def save_upload(
+    conn: sqlite3.Connection, fingerprint: str, video_name: str, record: UploadedRecord
+) -> None:
+    with conn:
+        _register_video(conn, fingerprint, video_name)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO uploads
+                (fingerprint, video_id, uploaded_at, thumbnail_set, youtube_link)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                fingerprint,
+                record.video_id,
+                record.uploaded_at,
+                int(record.thumbnail_set),
+                record.youtube_link,
+            ),
+        )
+        _insert_stage(conn, fingerprint, STAGE_UPLOADED, None)
+
+
+def get_upload(conn: sqlite3.Connection, fingerprint: str) -> UploadedRecord | None:
+    row = conn.execute(
+        """
+        SELECT video_id, uploaded_at, thumbnail_set, youtube_link
+        FROM uploads WHERE fingerprint = ?
+        """,
+        (fingerprint,),
+    ).fetchone()
+    if not row:
+        return None
+    return UploadedRecord(
+        video_id=row[0], uploaded_at=row[1], thumbnail_set=bool(row[2]), youtube_link=row[3]
+    )
+
+
+def filter_ready_for_upload(
+    conn: sqlite3.Connection, fingerprints: list[str]
+) -> set[str]:
+    if not fingerprints:
+        return set()
+    placeholders = ",".join("?" * len(fingerprints))
+    rows = conn.execute(
+        f"""
+        SELECT v.fingerprint FROM videos v
+        JOIN stages s ON s.fingerprint = v.fingerprint AND s.stage = ?
+        LEFT JOIN uploads u ON u.fingerprint = v.fingerprint
+        WHERE v.fingerprint IN ({placeholders})
+            AND v.metadata IS NOT NULL
+            AND u.fingerprint IS NULL
+        """,
+        (STAGE_THUMBNAIL, *fingerprints),
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def add_stage_timing(
+    conn: sqlite3.Connection, activity: str, media_seconds: float, wall_seconds: float
+) -> None:
+    with conn:
+        conn.execute(
+            "INSERT INTO stage_timings (activity, media_seconds, wall_seconds, recorded_at) "
+            "VALUES (?, ?, ?, ?)",
+            (activity, media_seconds, wall_seconds, _now()),
+        )
+
+
+def get_stage_timings(
+    conn: sqlite3.Connection, limit_per_activity: int = 50
+) -> dict[str, list[tuple[float, float]]]:
+    """Most recent (media_seconds, wall_seconds) samples of every activity."""
+    rows = conn.execute(
+        """
+        SELECT activity, media_seconds, wall_seconds FROM (
+            SELECT activity, media_seconds, wall_seconds, ROW_NUMBER() OVER (
+                PARTITION BY activity ORDER BY recorded_at DESC
+            ) AS recency
+            FROM stage_timings
+        )
+        WHERE recency <= ?
+        """,
+        (limit_per_activity,),
+    ).fetchall()
+    timings: dict[str, list[tuple[float, float]]] = {}
+    for activity, media_seconds, wall_seconds in rows:
+        timings.setdefault(activity, []).append((media_seconds, wall_seconds))
+    return timings
+
+
+def list_videos(conn: sqlite3.Connection) -> list[VideoState]:
+    rows = conn.execute(
+        """
+        SELECT v.fingerprint, v.video_name, v.updated_at, u.video_id,
+            (SELECT group_concat(stage, ',') FROM stages s WHERE s.fingerprint = v.fingerprint)
+        FROM videos v
+        LEFT JOIN uploads u ON u.fingerprint = v.fingerprint
+        ORDER BY v.updated_at DESC
+        """
+    ).fetchall()
+    return [
+        VideoState(
+            fingerprint=row[0],
+            video_name=row[1],
+            updated_at=row[2],
+            video_id=row[3],
+            completed_stages=tuple(sorted(row[4].split(","))) if row[4] else (),
+        )
+        for row in rows
+    ]
+
+
+def import_workspace(
+    conn: sqlite3.Connection, video_path: Path, workspace_dir: Path
+) -> str:
+    """Imports the JSON files and artifacts of a pre-existing workspace."""
+    fingerprint = get_fingerprint(video_path, workspace_dir)
+    video_name = video_path.name
+
+    metadata_path = workspace_dir / utils.METADATA_FILE
+    if metadata_path.exists():
+        metadata = utils.read_metadata_file(metadata_path)
+        save_metadata(conn, fingerprint, video_name, metadata, str(metadata_path))
+
+    artifacts = {
+        STAGE_SELECTED_THUMBNAIL: workspace_dir / utils.SELECTED_CANDIDATE_NAME,
+        STAGE_THUMBNAIL: workspace_dir / utils.RENDERED_THUMBNAIL_NAME,
+        STAGE_PROCESSED_VIDEO: workspace_dir / utils.PROCESSED_VIDEO_NAME,
+    }
+    for stage, artifact_path in artifacts.items():
+        if artifact_path.exists():
+            mark_stage_complete(conn, fingerprint, video_name, stage, str(artifact_path))
+
+    record = utils.read_upload_record_file(workspace_dir / utils.UPLOADED_FILE)
+    if record:
+        save_upload(conn, fingerprint, video_name, record)
+
+    return fingerprint
+
+
+def import_directory(conn: sqlite3.Connection, root: Path, archived: bool) -> int:
+    imported = 0
+    for video_path in utils.scan_videos(root):
+        workspace_dir = root / video_path.stem
+        if not workspace_dir.is_dir():
+            continue
+        fingerprint = import_workspace(conn, video_path, workspace_dir)
+        if archived:
+            mark_stage_complete(
+                conn, fingerprint, video_path.name, STAGE_ARCHIVED, str(video_path)
+            )
+        imported += 1
+    return imported
+
+
+def is_registered(conn: sqlite3.Connection, fingerprint: str) -> bool:
+    row = conn.execute("SELECT 1 FROM videos WHERE fingerprint = ?", (fingerprint,)).fetchone()
+    return row is not None
+
+
+def register_video_path(conn: sqlite3.Connection, video_path: Path) -> str:
+    """The video's fingerprint, importing its pre-store workspace on first lookup.
+
+    This way `import-state` is not required before resuming old workspaces.
+    """
+    fingerprint = get_fingerprint(video_path)
+    if not is_registered(conn, fingerprint):
+        workspace_dir = utils.get_workspace_dir(video_path)
+        if workspace_dir.is_dir():
+            import_workspace(conn, video_path, workspace_dir)
+    return fingerprint
+
+
+@contextmanager
+def open_video(video_path: Path) -> Iterator[tuple[sqlite3.Connection, str]]:
+    """The store and the video's fingerprint; see `register_video_path`."""
+    with open_store() as conn:
+        yield conn, register_video_path(conn, video_path)
+
+
+def record_stage(video_path: Path, stage: str, artifact_path: Path | None = None) -> None:
+    with open_video(video_path) as (conn, fingerprint):
+        mark_stage_complete(
+            conn,
+            fingerprint,
+            video_path.name,
+            stage,
+            str(artifact_path) if artifact_path else None,
+        )
+
+
+def is_stage_complete(video_path: Path, stage: str, artifact_path: Path) -> bool:
+    """Whether `stage` already produced `artifact_path`.
+
+    A stage row whose recorded size and mtime still match the file is trusted
+    without hashing; only unrecorded or changed artifacts are checked against
+    their sidecar here. Consumers re-verify with `require_verified_artifact`.
+    """
+    if not artifact_path.exists():
+        return False
+
+    with open_video(video_path) as (conn, fingerprint):
+        if stage_matches_artifact(conn, fingerprint, stage, artifact_path):
+            return True
+
+        if not atomic_io.verify_artifact(artifact_path):
+            logger.warning(f"Artifact failed integrity check, regenerating: {artifact_path}")
+            atomic_io.discard_artifact(artifact_path)
+            clear_stage(conn, fingerprint, stage)
+            return False
+
+        # Also covers artifacts outside the workspace, which the import does not pick up.
+        mark_stage_complete(conn, fingerprint, video_path.name, stage, str(artifact_path))
+    return True
+
+
+def require_verified_artifact(video_path: Path, stage: str, artifact_path: Path) -> None:
+    """Checks `artifact_path` against its sidecar right before it is read.
+
+    A corrupt artifact is discarded and its stage cleared, so the next run
+    of the workflow regenerates it.
+    """
+    if atomic_io.verify_artifact(artifact_path):
+        return
+
+    atomic_io.discard_artifact(artifact_path)
+    with open_video(video_path) as (conn, fingerprint):
+        clear_stage(conn, fingerprint, stage)
+    raise CorruptArtifactError(
+        f"{artifact_path} failed its integrity check and was discarded; "
+        "rerun the workflow to regenerate it"
+    )
+
+
+def store_metadata(video_path: Path, metadata: MatchMetadata) -> None:
+    with open_video(video_path) as (conn, fingerprint):
+        save_metadata(
+            conn,
+            fingerprint,
+            video_path.name,
+            metadata,
+            str(utils.get_metadata_path(video_path)),
+        )
+
+
+def store_upload_record(video_path: Path, record: UploadedRecord) -> None:
+    with open_video(video_path) as (conn, fingerprint):
+        save_upload(conn, fingerprint, video_path.name, record)
+
+
+def load_upload_record(video_path: Path) -> UploadedRecord | None:
+    with open_video(video_path) as (conn, fingerprint):
+        record = get_upload(conn, fingerprint)
+        if record:
+            return record
+
+        legacy_record = utils.get_uploaded_record(video_path)
+        if legacy_record:
+            save_upload(conn, fingerprint, video_path.name, legacy_record)
+        return legacy_record
@@ -4,34 +4,68 @@ from temporalio import activity
 from temporalio.exceptions import ApplicationError
 from video_prep import create_and_store_metadata, auto_select_thumbnail
 from video_overlay import add_video_overlays
+from ffmpeg_progress import FfmpegProgress
 from uploader import (
     upload_video_with_idempotency,
     set_thumbnail_for_video,
     update_video_visibility_for_video,
 )
-from custom_exceptions import VideoAlreadyUploadedError
+from custom_exceptions import (
+    CorruptArtifactError,
+    InsufficientDiskSpaceError,
+    VideoAlreadyUploadedError,
+)
 from cleanup import cleanup_video
-from logger import get_logger
+from archive import ArchiveProgress
+from retention import Artifact
+from web_selector.frames import FrameExtractionError
+from web_selector.server import save_frame_as_selected
+from fingerprint import schedule_full_hash
+from instrumentation import instrumented
+from logger import get_logger, get_rate_limited_logger
 from pathlib import Path
+from datetime import timedelta
 import config
 
 logger = get_logger(__name__)
+progress_logger = get_rate_limited_logger(__name__)
+
+
+def _corrupt_artifact_error(e: CorruptArtifactError) -> ApplicationError:
+    # Retrying cannot help: the stage that produces the artifact has to run again.
+    return ApplicationError(str(e), type="CorruptArtifactError", non_retryable=True)
+
+
+def _report_progress(message: str) -> None:
+    # `main.py debug` runs activities outside a worker, where there is nothing to heartbeat to.
+    if activity.in_activity():
+        activity.heartbeat(message)
+    progress_logger.info(message)
 
 
 @activity.defn
+@instrumented
 def create_metadata_activity(video_path: str) -> MatchMetadata:
-    return create_and_store_metadata(video_path)
+    metadata = create_and_store_metadata(video_path)
+    if config.FINGERPRINT_FULL_HASH:
+        schedule_full_hash(Path(video_path))
+    return metadata
 
 
 @activity.defn
+@instrumented
 def render_thumbnail_activity(video_path: str) -> str:
-    return render_thumbnail(video_path)
+    try:
+        return render_thumbnail(video_path)
+    except CorruptArtifactError as e:
+        raise _corrupt_artifact_error(e)
 
 
 @activity.defn
+@instrumented
 def upload_video_activity(video_path: str) -> UploadedRecord:
     def heartbeat(progress: float) -> None:
-        activity.heartbeat(f"Upload progress: {progress:.1f}%")
+        _report_progress(f"Upload progress: {progress:.1f}%")
 
     try:
         logger.info(f"Uploading video: {video_path}")
@@ -44,32 +78,72 @@ def upload_video_activity(video_path: str) -> UploadedRecord:
             type="VideoAlreadyUploadedError",
             non_retryable=True,
         )
+    except CorruptArtifactError as e:
+        raise _corrupt_artifact_error(e)
 
 
 @activity.defn
+@instrumented
 def set_thumbnail_activity(video_path: str) -> None:
-    set_thumbnail_for_video(video_path)
+    try:
+        set_thumbnail_for_video(video_path)
+    except CorruptArtifactError as e:
+        raise _corrupt_artifact_error(e)
 
 
 @activity.defn
+@instrumented
 def update_video_visibility_activity(video_path: str) -> None:
     update_video_visibility_for_video(video_path)
 
 
 @activity.defn
+@instrumented
 def cleanup_activity(video_path: str) -> str:
-    return cleanup_video(video_path)
+    def heartbeat(progress: ArchiveProgress) -> None:
+        _report_progress(f"Archive progress: {progress.describe()}")
+
+    return cleanup_video(video_path, progress_callback=heartbeat)
 
 
 @activity.defn
+@instrumented
 def auto_select_thumbnail_activity(video_path: str) -> None:
     auto_select_thumbnail(video_path)
 
 
 @activity.defn
+@instrumented
+def save_selected_thumbnail_activity(video_path: str, timestamp: float) -> None:
+    try:
+        save_frame_as_selected(Path(video_path), timestamp)
+    except FrameExtractionError as e:
+        # Retrying the same timestamp fails the same way; the workflow must not
+        # fall back to auto-selection either.
+        raise ApplicationError(str(e), type="FrameExtractionError", non_retryable=True)
+
+
+@activity.defn
+@instrumented
 def add_video_overlays_activity(video_path: str) -> str:
+    def heartbeat(progress: FfmpegProgress) -> None:
+        _report_progress(f"Encode progress: {progress.describe()}")
+
+    def evicted(artifact: Artifact) -> None:
+        # A long eviction pass runs before ffmpeg and must not miss the heartbeat timeout.
+        _report_progress(f"Evicted {artifact.path} to free disk space")
+
     try:
-        return add_video_overlays(video_path)
+        return add_video_overlays(
+            video_path, progress_callback=heartbeat, eviction_callback=evicted
+        )
+    except InsufficientDiskSpaceError as e:
+        # Retried later instead of failing; archiving or pruning may free space meanwhile.
+        raise ApplicationError(
+            str(e),
+            type="InsufficientDiskSpaceError",
+            next_retry_delay=timedelta(seconds=config.DISK_SPACE_RETRY_DELAY),
+        )
     except FileNotFoundError as e:
         raise ApplicationError(
             str(e),
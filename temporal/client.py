@@ -1,41 +1,82 @@
+import asyncio
 from dataclasses import dataclass
 from constants import TEMPORAL_TASK_QUEUE
 from pathlib import Path
 import config
-from temporalio.client import Client
-from datetime import datetime
+from fingerprint import get_fingerprint
+from temporalio.client import Client, WorkflowHandle
+from temporalio.common import Priority, WorkflowIDConflictPolicy, WorkflowIDReusePolicy
+from temporalio.runtime import Runtime
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+RUNNING_WORKFLOWS_QUERY = 'WorkflowType = "ProcessVideoWorkflow" AND ExecutionStatus = "Running"'
+
 
 @dataclass
 class VideoWorkflowOptions:
     video_path: str
     top_n: int = config.TOP_RANKED_CANDIDATES_NUM
+    manual_selection: bool = config.MANUAL_THUMBNAIL_SELECTION
+    # Temporal priority key, 1 (first) to 5; activities inherit it from the workflow.
+    priority: int | None = None
 
 
-async def get_client():
-    client = await Client.connect(config.TEMPORAL_SERVER_ADDRESS)
+async def get_client(runtime: Runtime | None = None):
+    client = await Client.connect(config.TEMPORAL_SERVER_ADDRESS, runtime=runtime)
 
     return client
 
 
-def gen_workflow_id(video_path: Path) -> str:
-    video_name = video_path.stem
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{video_name}_{timestamp}"
+def gen_workflow_id(video_path: Path, fingerprint: str) -> str:
+    return f"{video_path.stem}_{fingerprint[:16]}"
 
 
-async def start_video_workflow(client: Client, options: VideoWorkflowOptions):
-    workflow_id = gen_workflow_id(Path(options.video_path))
+async def start_video_workflow(
+    client: Client, options: VideoWorkflowOptions, fingerprint: str | None = None
+) -> WorkflowHandle:
+    path = Path(options.video_path)
+    if fingerprint is None:
+        fingerprint = await asyncio.to_thread(get_fingerprint, path)
+    workflow_id = gen_workflow_id(path, fingerprint)
 
     logger.info(
         f"Starting video workflow for {options.video_path} with ID {workflow_id}"
     )
+    # A completed run is never repeated, so re-running `start` on a processed video
+    # does not redo the encode or re-upload it; failed, timed out or terminated
+    # runs can be started again.
     return await client.start_workflow(
         "ProcessVideoWorkflow",
-        options.video_path,
+        args=[options.video_path, options.manual_selection],
         id=workflow_id,
         task_queue=TEMPORAL_TASK_QUEUE,
+        id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE_FAILED_ONLY,
+        id_conflict_policy=WorkflowIDConflictPolicy.FAIL,
+        priority=Priority(priority_key=options.priority),
+    )
+
+
+async def start_video_workflows(
+    client: Client,
+    options_list: list[VideoWorkflowOptions],
+    max_concurrency: int = config.WORKFLOW_START_CONCURRENCY,
+) -> list[WorkflowHandle | BaseException]:
+    # Semaphore waiters are woken in FIFO order, so workflows are started in list order.
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def start_one(options: VideoWorkflowOptions) -> WorkflowHandle:
+        async with semaphore:
+            return await start_video_workflow(client, options)
+
+    return await asyncio.gather(
+        *(start_one(options) for options in options_list), return_exceptions=True
     )
+
+
+async def list_running_workflows(client: Client) -> list[WorkflowHandle]:
+    return [
+        client.get_workflow_handle(execution.id, run_id=execution.run_id)
+        async for execution in client.list_workflows(RUNNING_WORKFLOWS_QUERY)
+    ]
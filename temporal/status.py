@@ -0,0 +1,99 @@
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+from temporalio.client import Client, WorkflowHandle
+
+from instrumentation import StageStats, format_bytes
+from logger import get_logger
+from schemas import VideoState
+from temporal.client import list_running_workflows
+
+logger = get_logger(__name__)
+
+STATUS_COLUMNS = ("Video", "Stage", "Wall", "CPU", "Subproc", "Peak RSS", "Read", "Written")
+STORE_COLUMNS = ("Video", "Completed stages", "YouTube ID", "Ready for upload")
+
+
+@dataclass(frozen=True)
+class WorkflowStatus:
+    workflow_id: str
+    video_name: str
+    stage: str
+    timings: dict[str, StageStats]
+
+
+async def get_workflow_status(handle: WorkflowHandle) -> WorkflowStatus:
+    stage, video_path, timings = await asyncio.gather(
+        handle.query("get_stage"),
+        handle.query("get_video_path"),
+        handle.query("get_stage_timings"),
+    )
+    return WorkflowStatus(
+        workflow_id=handle.id,
+        video_name=Path(video_path).name,
+        stage=stage,
+        timings={name: StageStats(**stats) for name, stats in timings.items()},
+    )
+
+
+async def get_running_statuses(client: Client) -> list[WorkflowStatus]:
+    handles = await list_running_workflows(client)
+    results = await asyncio.gather(
+        *(get_workflow_status(handle) for handle in handles), return_exceptions=True
+    )
+
+    statuses = []
+    for handle, result in zip(handles, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Could not query workflow {handle.id}: {result}")
+        else:
+            statuses.append(result)
+    return sorted(statuses, key=lambda status: status.video_name)
+
+
+def _format_row(video_name: str, stage: str, stats: StageStats | None) -> tuple[str, ...]:
+    if stats is None:
+        return (video_name, f"{stage} (running)", "", "", "", "", "", "")
+    return (
+        video_name,
+        stage,
+        f"{stats.wall_seconds:.1f}s",
+        f"{stats.cpu_seconds:.1f}s",
+        f"{stats.subprocess_seconds:.1f}s",
+        format_bytes(stats.peak_rss_bytes),
+        format_bytes(stats.read_bytes),
+        format_bytes(stats.write_bytes),
+    )
+
+
+def _format_table(rows: list[tuple[str, ...]]) -> str:
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    )
+
+
+def format_status_table(statuses: list[WorkflowStatus]) -> str:
+    """One row per finished stage, plus the stage each workflow is currently in."""
+    rows = [STATUS_COLUMNS]
+    for status in statuses:
+        for stage, stats in status.timings.items():
+            rows.append(_format_row(status.video_name, stage, stats))
+        if status.stage not in status.timings:
+            rows.append(_format_row(status.video_name, status.stage, None))
+    return _format_table(rows)
+
+
+def format_store_table(videos: list[VideoState], ready_names: set[str]) -> str:
+    """One row per video recorded in the state store."""
+    rows = [STORE_COLUMNS]
+    for video in videos:
+        rows.append((
+            video.video_name,
+            ", ".join(video.completed_stages) or "-",
+            video.video_id or "-",
+            "yes" if video.video_name in ready_names else "",
+        ))
+    return _format_table(rows)
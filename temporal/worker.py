@@ -1,4 +1,3 @@
-from concurrent.futures import ThreadPoolExecutor
 from temporal.workflows import ProcessVideoWorkflow
 from temporal.activities import (
     create_metadata_activity,
@@ -9,19 +8,58 @@ from temporal.activities import (
     cleanup_activity,
     auto_select_thumbnail_activity,
     add_video_overlays_activity,
+    save_selected_thumbnail_activity,
 )
 from temporal.client import get_client
 from constants import TEMPORAL_TASK_QUEUE
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
 from temporalio.worker import Worker
 from logger import get_logger
+from metrics import MeteredThreadPoolExecutor, register_lru_cache, start_metrics_server
+from instrumentation import add_stage_listener
+from scheduling import record_stage_timing
 import asyncio
+import config
 
 logger = get_logger(__name__)
 
+ACTIVITY_EXECUTOR_WORKERS = 3
+
+
+def register_cache_metrics() -> None:
+    import asset_cache
+    from thumbnail_enhancement import template_a, template_b
+    from web_selector import frames
+
+    register_lru_cache("logo", asset_cache._load_logo)
+    register_lru_cache("resized_logo", asset_cache._resize_logo)
+    register_lru_cache("template_a_font", template_a.get_font)
+    register_lru_cache("template_b_font", template_b.get_font)
+    register_lru_cache("facet_bar", template_a.render_facet_bar)
+    register_lru_cache("selector_frame", frames._get_cached_frame)
+
+
+def create_runtime() -> Runtime | None:
+    """SDK runtime exporting Temporal's own worker metrics, when enabled."""
+    if not config.TEMPORAL_METRICS_PORT:
+        return None
+    bind_address = f"0.0.0.0:{config.TEMPORAL_METRICS_PORT}"
+    logger.info(f"Temporal SDK metrics available at http://{bind_address}/metrics")
+    return Runtime(
+        telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=bind_address))
+    )
+
 
 async def main():
-    client = await get_client()
-    with ThreadPoolExecutor(max_workers=3) as executor:
+    # Timing history that `start` uses to estimate and order new batches.
+    add_stage_listener(record_stage_timing)
+
+    if config.METRICS_PORT:
+        register_cache_metrics()
+        start_metrics_server(config.METRICS_PORT)
+
+    client = await get_client(runtime=create_runtime())
+    with MeteredThreadPoolExecutor(ACTIVITY_EXECUTOR_WORKERS, "activity") as executor:
         worker = Worker(
             client,
             task_queue=TEMPORAL_TASK_QUEUE,
@@ -35,6 +73,7 @@ async def main():
                 cleanup_activity,
                 auto_select_thumbnail_activity,
                 add_video_overlays_activity,
+                save_selected_thumbnail_activity,
             ],
             activity_executor=executor,
         )
@@ -1,9 +1,13 @@
+import asyncio
 from datetime import timedelta
 from temporalio import workflow
+from temporalio.common import RawValue
 
 from constants import (
     WORKFLOW_STAGE_INITIALIZING,
     WORKFLOW_STAGE_CREATING_METADATA,
+    WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION,
+    WORKFLOW_STAGE_SAVING_SELECTED_THUMBNAIL,
     WORKFLOW_STAGE_AUTO_SELECTING_THUMBNAIL,
     WORKFLOW_STAGE_ENHANCING_THUMBNAIL,
     WORKFLOW_STAGE_ADDING_VIDEO_OVERLAYS,
@@ -11,9 +15,12 @@ from constants import (
     WORKFLOW_STAGE_SETTING_THUMBNAIL,
     WORKFLOW_STAGE_UPDATING_VISIBILITY,
     WORKFLOW_STAGE_COMPLETED,
+    SELECT_THUMBNAIL_SIGNAL,
+    THUMBNAIL_SELECTION_TIMEOUT_HOURS,
 )
 
 with workflow.unsafe.imports_passed_through():
+    from instrumentation import StageStats, unwrap_result
     from temporal.activities import (
         create_metadata_activity,
         render_thumbnail_activity,
@@ -23,6 +30,7 @@ with workflow.unsafe.imports_passed_through():
         cleanup_activity,
         auto_select_thumbnail_activity,
         add_video_overlays_activity,
+        save_selected_thumbnail_activity,
     )
 
 
@@ -31,75 +39,137 @@ class ProcessVideoWorkflow:
     def __init__(self):
         self.stage: str = WORKFLOW_STAGE_INITIALIZING
         self.video_path: str = ""
+        self.selected_timestamp: float | None = None
+        self.stage_timings: dict[str, StageStats] = {}
 
     @workflow.query
     def get_stage(self) -> str:
         return self.stage
 
+    @workflow.signal(name=SELECT_THUMBNAIL_SIGNAL)
+    def select_thumbnail(self, timestamp: float) -> None:
+        self.selected_timestamp = timestamp
+
     @workflow.query
     def get_video_path(self) -> str:
         return self.video_path
 
+    @workflow.query
+    def get_stage_timings(self) -> dict[str, StageStats]:
+        return self.stage_timings
+
     @workflow.run
-    async def run(self, video_path: str) -> None:
+    async def run(self, video_path: str, manual_selection: bool = False) -> None:
         workflow.logger.info(f"Running workflow for {video_path}")
 
         self.video_path = video_path
 
-        self.stage = WORKFLOW_STAGE_CREATING_METADATA
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_CREATING_METADATA,
             create_metadata_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=5),
+            timeout=timedelta(minutes=5),
         )
 
-        self.stage = WORKFLOW_STAGE_AUTO_SELECTING_THUMBNAIL
-        await workflow.execute_activity(
+        if manual_selection:
+            await self._wait_for_manual_selection(video_path)
+
+        # Skips itself when a manual selection was saved.
+        await self._run_stage(
+            WORKFLOW_STAGE_AUTO_SELECTING_THUMBNAIL,
             auto_select_thumbnail_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=10),
+            timeout=timedelta(minutes=10),
         )
 
-        self.stage = WORKFLOW_STAGE_ENHANCING_THUMBNAIL
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_ENHANCING_THUMBNAIL,
             render_thumbnail_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=10),
+            timeout=timedelta(minutes=10),
         )
 
-        self.stage = WORKFLOW_STAGE_ADDING_VIDEO_OVERLAYS
-        await workflow.execute_activity(
+        # ffmpeg progress is heartbeated, so a dead worker or hung encode is
+        # detected within minutes instead of at the hour-long timeout.
+        await self._run_stage(
+            WORKFLOW_STAGE_ADDING_VIDEO_OVERLAYS,
             add_video_overlays_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=60),
+            timeout=timedelta(minutes=60),
+            heartbeat_timeout=timedelta(minutes=2),
         )
 
-        self.stage = WORKFLOW_STAGE_UPLOADING
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_UPLOADING,
             upload_video_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=120),
+            timeout=timedelta(minutes=120),
         )
 
-        self.stage = WORKFLOW_STAGE_UPDATING_VISIBILITY
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_UPDATING_VISIBILITY,
             update_video_visibility_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=5),
+            timeout=timedelta(minutes=5),
         )
 
-        self.stage = WORKFLOW_STAGE_SETTING_THUMBNAIL
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_SETTING_THUMBNAIL,
             set_thumbnail_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=5),
+            timeout=timedelta(minutes=5),
         )
 
-        self.stage = WORKFLOW_STAGE_COMPLETED
-        await workflow.execute_activity(
+        await self._run_stage(
+            WORKFLOW_STAGE_COMPLETED,
             cleanup_activity,
             video_path,
-            start_to_close_timeout=timedelta(minutes=5),
+            timeout=timedelta(minutes=120),
+            heartbeat_timeout=timedelta(minutes=2),
         )
 
         workflow.logger.info(f"Workflow completed for {video_path}")
+
+    async def _wait_for_manual_selection(self, video_path: str) -> None:
+        self.stage = WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION
+        try:
+            await workflow.wait_condition(
+                lambda: self.selected_timestamp is not None,
+                timeout=timedelta(hours=THUMBNAIL_SELECTION_TIMEOUT_HOURS),
+            )
+        except asyncio.TimeoutError:
+            workflow.logger.warning(
+                f"No thumbnail selected for {video_path}, falling back to auto-selection"
+            )
+            return
+
+        await self._run_stage(
+            WORKFLOW_STAGE_SAVING_SELECTED_THUMBNAIL,
+            save_selected_thumbnail_activity,
+            video_path,
+            self.selected_timestamp,
+            timeout=timedelta(minutes=5),
+        )
+
+    async def _run_stage(
+        self,
+        stage: str,
+        activity,
+        *args,
+        timeout: timedelta,
+        heartbeat_timeout: timedelta | None = None,
+    ):
+        self.stage = stage
+        # Scheduled by name with a raw result so histories recorded before the
+        # results carried stage stats still replay.
+        raw: RawValue = await workflow.execute_activity(
+            activity.__name__,
+            args=list(args),
+            start_to_close_timeout=timeout,
+            heartbeat_timeout=heartbeat_timeout,
+            result_type=RawValue,
+        )
+        value, stats = unwrap_result(workflow.payload_converter().from_payload(raw.payload))
+        if stats is not None:
+            self.stage_timings[stage] = stats
+        return value
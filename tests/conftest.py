@@ -1,4 +1,13 @@
 import os
 
+import pytest
+
 os.environ["INPUT_DIR"] = "/tmp/test_input_videos"
 os.environ["COMPLETED_DIR"] = "/tmp/test_output_videos"
+
+
+@pytest.fixture(autouse=True)
+def isolated_state_db(tmp_path, monkeypatch):
+    import config
+
+    monkeypatch.setattr(config, "STATE_DB_PATH", tmp_path / "state.db")
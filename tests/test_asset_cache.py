@@ -0,0 +1,43 @@
+import os
+
+from PIL import Image
+
+import asset_cache
+
+
+def make_logo(path, size=(400, 200), color=(255, 0, 0, 255)):
+    Image.new("RGBA", size, color).save(path)
+    return path
+
+
+def test_get_resized_logo_keeps_aspect_and_is_cached(tmp_path):
+    logo_path = make_logo(tmp_path / "logo.png")
+
+    first = asset_cache.get_resized_logo(logo_path, 100)
+    second = asset_cache.get_resized_logo(logo_path, 100)
+
+    assert first.size == (100, 50)
+    assert first.mode == "RGBA"
+    assert first is second
+
+
+def test_logo_is_reloaded_when_file_changes(tmp_path):
+    logo_path = make_logo(tmp_path / "logo.png")
+    before = asset_cache.load_logo(logo_path)
+
+    make_logo(logo_path, size=(300, 300), color=(0, 0, 255, 255))
+    stat = logo_path.stat()
+    os.utime(logo_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    after = asset_cache.load_logo(logo_path)
+    assert before.size == (400, 200)
+    assert after.size == (300, 300)
+
+
+def test_write_resized_logo_png(tmp_path):
+    logo_path = make_logo(tmp_path / "logo.png")
+
+    output_path = asset_cache.write_resized_logo_png(logo_path, 192, tmp_path / "scaled.png")
+
+    with Image.open(output_path) as scaled:
+        assert scaled.size == (192, 96)
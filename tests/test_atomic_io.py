@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from atomic_io import (
+    atomic_output,
+    atomic_write_json,
+    get_sidecar_path,
+    verify_artifact,
+    write_integrity_sidecar,
+)
+
+
+def test_atomic_output_replaces_target_only_on_success(tmp_path):
+    target = tmp_path / "thumbnail.jpg"
+    target.write_bytes(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_output(target) as tmp:
+            tmp.write_bytes(b"half written")
+            raise RuntimeError("worker killed")
+
+    assert target.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_atomic_output_keeps_suffix_for_format_detection(tmp_path):
+    target = tmp_path / "thumbnail.jpg"
+
+    with atomic_output(target) as tmp:
+        assert tmp.suffix == ".jpg"
+        assert tmp.parent == tmp_path
+        tmp.write_bytes(b"new")
+
+    assert target.read_bytes() == b"new"
+
+
+def test_atomic_write_json_round_trip(tmp_path):
+    target = tmp_path / "upload.json"
+
+    atomic_write_json(target, {"video_id": "abc"})
+
+    assert json.loads(target.read_text()) == {"video_id": "abc"}
+
+
+def test_verify_artifact_detects_truncation(tmp_path):
+    artifact = tmp_path / "processed.mov"
+    artifact.write_bytes(b"complete video data")
+    write_integrity_sidecar(artifact)
+
+    assert verify_artifact(artifact)
+
+    artifact.write_bytes(b"complete")
+    assert not verify_artifact(artifact)
+
+
+def test_verify_artifact_detects_corrupted_content(tmp_path):
+    artifact = tmp_path / "selected.jpg"
+    artifact.write_bytes(b"aaaa")
+    write_integrity_sidecar(artifact)
+
+    artifact.write_bytes(b"aaab")
+
+    assert not verify_artifact(artifact)
+
+
+def test_verify_artifact_trusts_legacy_artifacts_without_sidecar(tmp_path):
+    artifact = tmp_path / "thumbnail.jpg"
+    artifact.write_bytes(b"legacy")
+
+    assert not get_sidecar_path(artifact).exists()
+    assert verify_artifact(artifact)
+    assert not verify_artifact(tmp_path / "missing.jpg")
+
+
+def test_atomic_io_does_not_import_fingerprint():
+    code = "import sys, atomic_io; assert 'fingerprint' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent)
@@ -72,7 +72,7 @@ def test_score_frame_no_motion_identical_frames():
 
 # --- _get_video_duration_seconds tests ---
 
-@patch("video_prep.subprocess.run")
+@patch("video_prep.run_subprocess")
 def test_get_video_duration_seconds_returns_float(mock_run):
     payload = json.dumps({"format": {"duration": "923.456"}}).encode()
     mock_run.return_value = MagicMock(stdout=payload, returncode=0)
@@ -85,7 +85,7 @@ def test_get_video_duration_seconds_returns_float(mock_run):
     assert "video.mov" in args
 
 
-@patch("video_prep.subprocess.run")
+@patch("video_prep.run_subprocess")
 def test_get_video_duration_seconds_raises_on_failure(mock_run):
     mock_run.side_effect = subprocess.CalledProcessError(1, "ffprobe")
 
@@ -95,7 +95,7 @@ def test_get_video_duration_seconds_raises_on_failure(mock_run):
 
 # --- _extract_frame_at tests ---
 
-@patch("video_prep.subprocess.run")
+@patch("video_prep.run_subprocess")
 def test_extract_frame_at_returns_frame(mock_run):
     jpeg_bytes = encode_jpeg(make_frame(128))
     mock_run.return_value = MagicMock(stdout=jpeg_bytes, returncode=0)
@@ -110,7 +110,7 @@ def test_extract_frame_at_returns_frame(mock_run):
     assert "10.500" in args
 
 
-@patch("video_prep.subprocess.run")
+@patch("video_prep.run_subprocess")
 def test_extract_frame_at_returns_none_on_ffmpeg_failure(mock_run):
     mock_run.return_value = MagicMock(stdout=b"", returncode=1)
 
@@ -119,7 +119,7 @@ def test_extract_frame_at_returns_none_on_ffmpeg_failure(mock_run):
     assert result is None
 
 
-@patch("video_prep.subprocess.run")
+@patch("video_prep.run_subprocess")
 def test_extract_frame_at_uses_fast_seeking(mock_run):
     jpeg_bytes = encode_jpeg(make_frame(64))
     mock_run.return_value = MagicMock(stdout=jpeg_bytes, returncode=0)
@@ -162,13 +162,14 @@ def test_auto_select_thumbnail_picks_sharpest_frame(mock_duration, mock_extract,
     video_path.touch()
 
     saved_frames = []
+    real_imencode = cv2.imencode
 
-    def fake_imwrite(path, frame):
+    def recording_imencode(ext, frame):
         saved_frames.append(frame.copy())
-        return True
+        return real_imencode(ext, frame)
 
     with patch("video_prep.utils.get_selected_candidate_path", return_value=tmp_path / "selected.jpg"):
-        with patch("video_prep.cv2.imwrite", side_effect=fake_imwrite):
+        with patch("video_prep.cv2.imencode", side_effect=recording_imencode):
             with patch("video_prep.config.CANDIDATE_THUMBNAIL_NUM", 2):
                 auto_select_thumbnail(str(video_path))
 
@@ -204,3 +205,20 @@ def test_auto_select_thumbnail_raises_if_no_frames(mock_duration, mock_extract,
         with patch("video_prep.config.CANDIDATE_THUMBNAIL_NUM", 3):
             with pytest.raises(ValueError, match="Could not extract"):
                 auto_select_thumbnail(str(video_path))
+
+
+def test_auto_select_thumbnail_regenerates_when_integrity_check_fails(tmp_path):
+    selected = tmp_path / "selected.jpg"
+    selected.write_bytes(b"truncated")
+    (tmp_path / "selected.jpg.integrity.json").write_text('{"size": 9999, "checksum": "x"}')
+
+    video_path = tmp_path / "ms_LeovsKhanh.mov"
+    video_path.touch()
+
+    with patch("video_prep.utils.get_selected_candidate_path", return_value=selected):
+        with patch("video_prep._get_video_duration_seconds", return_value=100.0):
+            with patch("video_prep._extract_frame_at", return_value=make_checkerboard()):
+                auto_select_thumbnail(str(video_path))
+
+    assert selected.read_bytes() != b"truncated"
+    assert cv2.imread(str(selected)) is not None
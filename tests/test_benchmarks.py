@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks import bench_pipeline
+from benchmarks.bench_pipeline import compare_results, run, summarize
+from benchmarks.synthetic import ffmpeg_available
+
+
+def _result(case="render_thumbnail", best=1.0):
+    return {
+        "case": case,
+        "resolution": "1080p",
+        "duration": 30.0,
+        "repeats": 3,
+        "cold_seconds": best * 2,
+        "best_seconds": best,
+        "median_seconds": best,
+        "throughput": 1 / best,
+        "unit": "thumbnails/s",
+    }
+
+
+def test_summarize_reports_cold_best_and_throughput():
+    result = summarize("add_video_overlays", "4k", 30.0, [6.0, 3.0, 4.0], 30.0, "x realtime")
+
+    assert result.cold_seconds == 6.0
+    assert result.best_seconds == 3.0
+    assert result.median_seconds == 4.0
+    assert result.throughput == 10.0
+
+
+def test_compare_results_flags_only_regressions_over_threshold():
+    baseline = [_result("render_thumbnail", 1.0), _result("dedup", 1.0)]
+    current = [_result("render_thumbnail", 1.1), _result("dedup", 1.5), _result("new_case", 9.0)]
+
+    regressions = compare_results(current, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("dedup 1080p/30s")
+
+
+def test_run_skips_everything_without_ffmpeg():
+    with patch.object(bench_pipeline, "ffmpeg_available", return_value=False):
+        report = run(["1080p"], [30.0], repeats=1, candidate_count=3)
+
+    assert report["results"] == []
+    assert report["skipped"] == ["all: ffmpeg/ffprobe not found on PATH"]
+
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg is not installed")
+def test_run_benchmarks_short_synthetic_video():
+    report = run(["720p"], [3.0], repeats=1, candidate_count=3)
+
+    cases = {result["case"] for result in report["results"]}
+    assert {"auto_select_thumbnail", "render_thumbnail", "add_video_overlays", "dedup"} <= cases
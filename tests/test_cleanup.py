@@ -0,0 +1,154 @@
+import errno
+import os
+from unittest.mock import patch
+
+import pytest
+
+import archive
+import config
+import state_store
+from archive import archive_paths, copy_file_contents
+from cleanup import cleanup_video
+from custom_exceptions import ArchiveVerificationError, NoUploadedRecordError
+from schemas import UploadedRecord
+
+
+UPLOADED = UploadedRecord(
+    video_id="yt123",
+    uploaded_at="2024-12-15T10:00:00",
+    thumbnail_set=True,
+    youtube_link="https://youtu.be/yt123",
+)
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    input_dir = tmp_path / "input"
+    completed_dir = tmp_path / "completed"
+    input_dir.mkdir()
+    completed_dir.mkdir()
+    monkeypatch.setattr(config, "INPUT_DIR", input_dir)
+    monkeypatch.setattr(config, "COMPLETED_DIR", completed_dir)
+    return input_dir, completed_dir
+
+
+def make_video(input_dir, name="ms_LeovsKhanh.mov", size=300_000):
+    video = input_dir / name
+    video.write_bytes(os.urandom(size))
+    workspace = input_dir / video.stem
+    (workspace / "candidates").mkdir(parents=True)
+    (workspace / "candidates" / "candidate_001.jpg").write_bytes(b"jpeg")
+    (workspace / "processed.mov").write_bytes(os.urandom(size))
+    (workspace / "thumbnail.jpg").write_bytes(b"thumb")
+    return video, workspace
+
+
+def test_copy_falls_back_when_copy_file_range_is_unsupported(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(os.urandom(10_000))
+    dst = tmp_path / "dst.bin"
+
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, "cross-device")
+
+    chunks = []
+    with patch.object(archive, "_copy_file_range", unsupported):
+        copy_file_contents(src, dst, chunks.append, chunk_size=4096)
+
+    assert dst.read_bytes() == src.read_bytes()
+    assert chunks == [4096, 4096, 1808]
+
+
+def test_cross_device_archive_copies_verifies_and_removes_sources(tmp_path, dirs):
+    input_dir, completed_dir = dirs
+    video, workspace = make_video(input_dir)
+    original = video.read_bytes()
+    mtime_ns = video.stat().st_mtime_ns
+
+    updates = []
+    with patch.object(archive, "is_same_device", return_value=False):
+        archive_paths(
+            [(video, completed_dir / video.name), (workspace, completed_dir / workspace.name)],
+            updates.append,
+        )
+
+    assert not video.exists() and not workspace.exists()
+    assert (completed_dir / video.name).read_bytes() == original
+    assert (completed_dir / video.name).stat().st_mtime_ns == mtime_ns
+    assert (completed_dir / workspace.name / "candidates" / "candidate_001.jpg").exists()
+    assert updates[-1].copied_bytes == updates[-1].total_bytes == 600_000 + 4 + 5
+    assert updates[-1].percent == 100.0
+
+
+def test_failed_verification_keeps_source_and_leaves_no_partial_copy(tmp_path, dirs):
+    input_dir, completed_dir = dirs
+    video, _ = make_video(input_dir)
+
+    with patch.object(archive, "is_same_device", return_value=False), \
+         patch.object(archive, "compute_fingerprint", side_effect=["a", "b"]):
+        with pytest.raises(ArchiveVerificationError):
+            archive_paths([(video, completed_dir / video.name)])
+
+    assert video.exists()
+    assert list(completed_dir.iterdir()) == []
+
+
+def test_interrupted_copy_is_not_repeated(tmp_path, dirs):
+    input_dir, completed_dir = dirs
+    video, _ = make_video(input_dir)
+    (completed_dir / video.name).write_bytes(video.read_bytes())
+
+    with patch.object(archive, "is_same_device", return_value=False), \
+         patch.object(archive, "copy_file_contents") as mock_copy:
+        archive_paths([(video, completed_dir / video.name)])
+
+    mock_copy.assert_not_called()
+    assert not video.exists()
+
+
+def test_cleanup_video_archives_and_records_stage(dirs):
+    input_dir, completed_dir = dirs
+    video, workspace = make_video(input_dir)
+    state_store.store_upload_record(video, UPLOADED)
+
+    result = cleanup_video(str(video))
+
+    assert result == str(completed_dir / video.name)
+    assert (completed_dir / workspace.name / "processed.mov").exists()
+    with state_store.open_store() as conn:
+        videos = state_store.list_videos(conn)
+    assert state_store.STAGE_ARCHIVED in videos[0].completed_stages
+
+
+def test_cleanup_video_drops_intermediates_when_enabled(dirs, monkeypatch):
+    input_dir, completed_dir = dirs
+    video, workspace = make_video(input_dir)
+    state_store.store_upload_record(video, UPLOADED)
+    monkeypatch.setattr(config, "ARCHIVE_DROP_INTERMEDIATES", True)
+
+    cleanup_video(str(video))
+
+    archived = completed_dir / workspace.name
+    assert not (archived / "processed.mov").exists()
+    assert not (archived / "candidates").exists()
+    assert (archived / "thumbnail.jpg").exists()
+
+
+def test_cleanup_video_resumes_after_video_was_archived(dirs):
+    input_dir, completed_dir = dirs
+    video, workspace = make_video(input_dir)
+    state_store.store_upload_record(video, UPLOADED)
+    video.rename(completed_dir / video.name)
+
+    cleanup_video(str(video))
+
+    assert (completed_dir / workspace.name / "thumbnail.jpg").exists()
+    assert not workspace.exists()
+
+
+def test_cleanup_video_requires_upload_record(dirs):
+    input_dir, _ = dirs
+    video, _ = make_video(input_dir)
+
+    with pytest.raises(NoUploadedRecordError):
+        cleanup_video(str(video))
@@ -0,0 +1,100 @@
+import sys
+import textwrap
+
+import pytest
+
+from ffmpeg_progress import (
+    STDERR_TAIL_LINES,
+    FfmpegStalledError,
+    build_progress,
+    run_ffmpeg_with_progress,
+    with_progress_output,
+)
+
+
+def _fake_ffmpeg(tmp_path, body: str):
+    """Executable standing in for ffmpeg; it ignores its arguments."""
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\nimport sys, time\n" + textwrap.dedent(body))
+    script.chmod(0o755)
+    return str(script)
+
+
+def _block(out_time_us: int, progress: str = "continue") -> str:
+    return (
+        f"frame={out_time_us // 40000}\\nfps=48.5\\nout_time_us={out_time_us}\\n"
+        f"speed=2.0x\\nprogress={progress}\\n"
+    )
+
+
+def test_build_progress_computes_percent_and_eta():
+    progress = build_progress(
+        {"frame": "750", "fps": "50.0", "out_time_us": "30000000", "speed": "2.5x", "progress": "continue"},
+        duration=120.0,
+    )
+
+    assert progress.out_time == 30.0
+    assert progress.frame == 750
+    assert progress.percent == 25.0
+    assert progress.eta_seconds == 36.0
+    assert not progress.done
+
+
+def test_build_progress_handles_unknown_values():
+    progress = build_progress(
+        {"fps": "0.0", "out_time_us": "N/A", "speed": "N/A", "progress": "end"}, duration=None
+    )
+
+    assert progress.out_time == 0.0
+    assert progress.speed == 0.0
+    assert progress.percent is None
+    assert progress.done
+
+
+def test_with_progress_output_inserts_after_executable():
+    assert with_progress_output(["ffmpeg", "-y", "-i", "in.mov"]) == [
+        "ffmpeg", "-progress", "pipe:1", "-nostats", "-y", "-i", "in.mov",
+    ]
+
+
+def test_run_streams_progress_and_bounds_stderr(tmp_path):
+    ffmpeg = _fake_ffmpeg(tmp_path, f"""
+        for i in range(STDERR_LINES):
+            sys.stderr.write(f"line {{i}}\\n")
+        sys.stdout.write("{_block(5_000_000)}")
+        sys.stdout.write("{_block(10_000_000, "end")}")
+    """.replace("STDERR_LINES", str(STDERR_TAIL_LINES * 3)))
+
+    updates = []
+    result = run_ffmpeg_with_progress([ffmpeg, "-y"], duration=10.0, on_progress=updates.append)
+
+    assert result.returncode == 0
+    assert [update.percent for update in updates] == [50.0, 100.0]
+    assert updates[-1].done
+    stderr_lines = result.stderr.decode().splitlines()
+    assert len(stderr_lines) == STDERR_TAIL_LINES
+    assert stderr_lines[-1] == f"line {STDERR_TAIL_LINES * 3 - 1}"
+
+
+def test_run_returns_failure_code(tmp_path):
+    ffmpeg = _fake_ffmpeg(tmp_path, """
+        sys.stderr.write("Unknown encoder\\n")
+        sys.exit(1)
+    """)
+
+    result = run_ffmpeg_with_progress([ffmpeg])
+
+    assert result.returncode == 1
+    assert b"Unknown encoder" in result.stderr
+
+
+def test_run_kills_stalled_encode(tmp_path):
+    ffmpeg = _fake_ffmpeg(tmp_path, f"""
+        while True:
+            sys.stdout.write("{_block(1_000_000)}")
+            sys.stdout.flush()
+            time.sleep(0.05)
+    """)
+
+    with pytest.raises(FfmpegStalledError):
+        run_ffmpeg_with_progress([ffmpeg], duration=10.0, stall_timeout=0.5)
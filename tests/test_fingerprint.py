@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+
+from fingerprint import get_fingerprint, upgrade_to_full_hash
+from sampled_checksum import compute_fingerprint, sample_ranges
+
+
+def test_sample_ranges_reads_small_files_whole():
+    assert sample_ranges(100, block_size=10, block_count=8) == [(0, 100)]
+
+
+def test_sample_ranges_covers_head_tail_and_evenly_spaced_blocks():
+    ranges = sample_ranges(1000, block_size=10, block_count=3)
+
+    offsets = [offset for offset, _ in ranges]
+    assert offsets[0] == 0
+    assert offsets[-1] == 990
+    assert len(ranges) == 5
+    assert offsets == sorted(offsets)
+
+
+def test_compute_fingerprint_detects_change_in_sampled_block(tmp_path):
+    video = tmp_path / "match.mov"
+    data = bytearray(os.urandom(64 * 1024))
+    video.write_bytes(bytes(data))
+    original = compute_fingerprint(video, block_size=1024, block_count=4)
+
+    data[-1] ^= 0xFF
+    video.write_bytes(bytes(data))
+
+    assert compute_fingerprint(video, block_size=1024, block_count=4) != original
+
+
+def test_compute_fingerprint_depends_on_size(tmp_path):
+    first = tmp_path / "first.mov"
+    second = tmp_path / "second.mov"
+    first.write_bytes(b"\0" * 100)
+    second.write_bytes(b"\0" * 101)
+
+    assert compute_fingerprint(first) != compute_fingerprint(second)
+
+
+def test_get_fingerprint_uses_workspace_cache(tmp_path):
+    video = tmp_path / "match.mov"
+    video.write_bytes(b"video")
+
+    with patch("fingerprint.utils.get_workspace_dir", return_value=tmp_path / "ws"):
+        first = get_fingerprint(video)
+        with patch("fingerprint.compute_fingerprint") as mock_compute:
+            assert get_fingerprint(video) == first
+            mock_compute.assert_not_called()
+
+    cached = json.loads((tmp_path / "ws" / "fingerprint.json").read_text())
+    assert cached["sampled"] == first
+
+
+def test_get_fingerprint_recomputes_when_file_changes(tmp_path):
+    video = tmp_path / "match.mov"
+    video.write_bytes(b"video")
+
+    with patch("fingerprint.utils.get_workspace_dir", return_value=tmp_path / "ws"):
+        first = get_fingerprint(video)
+        video.write_bytes(b"other video")
+        assert get_fingerprint(video) != first
+
+
+def test_upgrade_to_full_hash_stores_full_digest(tmp_path):
+    video = tmp_path / "match.mov"
+    video.write_bytes(b"video")
+
+    with patch("fingerprint.utils.get_workspace_dir", return_value=tmp_path / "ws"):
+        record = upgrade_to_full_hash(video)
+
+    cached = json.loads((tmp_path / "ws" / "fingerprint.json").read_text())
+    assert record.full
+    assert cached["full"] == record.full
+    assert cached["full_algorithm"] == record.full_algorithm
+
+
+def test_upgrade_to_full_hash_skips_archived_workspace(tmp_path):
+    video = tmp_path / "match.mov"
+    video.write_bytes(b"video")
+    workspace = tmp_path / "ws"
+
+    def archive_while_hashing(path):
+        shutil.rmtree(workspace)
+        return "blake2b", "digest"
+
+    with patch("fingerprint.utils.get_workspace_dir", return_value=workspace):
+        get_fingerprint(video)
+        with patch("fingerprint.compute_full_hash", side_effect=archive_while_hashing):
+            record = upgrade_to_full_hash(video)
+
+    assert record.full == "digest"
+    assert not workspace.exists()
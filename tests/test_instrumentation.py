@@ -0,0 +1,138 @@
+import subprocess
+import sys
+
+from temporalio import activity
+from temporalio.common import _type_hints_from_func
+from temporalio.converter import default
+
+from instrumentation import (
+    InstrumentedResult,
+    StageStats,
+    add_subprocess_listener,
+    format_bytes,
+    instrumented,
+    measure_stage,
+    remove_subprocess_listener,
+    run_subprocess,
+    unwrap_result,
+)
+from schemas import VideoState
+from temporal.status import WorkflowStatus, format_status_table, format_store_table
+
+
+def _stats(**overrides) -> StageStats:
+    values = dict(
+        wall_seconds=12.34,
+        cpu_seconds=5.0,
+        peak_rss_bytes=300 * 1024 * 1024,
+        read_bytes=2 * 1024**3,
+        write_bytes=512,
+        subprocess_seconds=10.0,
+        subprocess_count=1,
+    )
+    values.update(overrides)
+    return StageStats(**values)
+
+
+def test_instrumented_returns_value_with_stats():
+    @instrumented
+    def busy(n: int) -> int:
+        return sum(i * i for i in range(n))
+
+    result = busy(200_000)
+
+    assert isinstance(result, InstrumentedResult)
+    assert result.value == sum(i * i for i in range(200_000))
+    assert result.stats.wall_seconds >= result.stats.cpu_seconds > 0
+    assert result.stats.peak_rss_bytes > 0
+    assert result.stats.subprocess_count == 0
+
+
+def test_instrumented_activity_advertises_envelope_return_type():
+    @activity.defn
+    @instrumented
+    def sample_activity(video_path: str) -> str:
+        return video_path
+
+    arg_types, return_type = _type_hints_from_func(sample_activity)
+
+    assert arg_types == [str]
+    assert return_type is InstrumentedResult
+    assert activity._Definition.from_callable(sample_activity).name == "sample_activity"
+
+
+def test_unwrap_result_accepts_envelope_and_legacy_payloads():
+    converter = default().payload_converter
+
+    def roundtrip(value):
+        return converter.from_payload(converter.to_payload(value))
+
+    assert unwrap_result(roundtrip(InstrumentedResult(value="title", stats=_stats()))) == (
+        "title",
+        _stats(),
+    )
+    assert unwrap_result(roundtrip("title")) == ("title", None)
+    assert unwrap_result(roundtrip({"title": "Final"})) == ({"title": "Final"}, None)
+
+
+def test_measure_stage_attributes_subprocess_time():
+    with measure_stage() as get_stats:
+        run_subprocess([sys.executable, "-c", "import time; time.sleep(0.05)"], check=True)
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+    stats = get_stats()
+    assert stats.subprocess_count == 1
+    assert 0.05 <= stats.subprocess_seconds <= stats.wall_seconds
+
+
+def test_subprocess_listener_receives_argv_and_returncode():
+    calls = []
+
+    def listener(argv, seconds, returncode):
+        calls.append((argv, returncode))
+
+    add_subprocess_listener(listener)
+    try:
+        run_subprocess([sys.executable, "-c", "raise SystemExit(3)"])
+        subprocess.run([sys.executable, "-c", "pass"])
+    finally:
+        remove_subprocess_listener(listener)
+
+    assert calls == [([sys.executable, "-c", "raise SystemExit(3)"], 3)]
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(1536) == "1.5 KB"
+    assert format_bytes(300 * 1024 * 1024) == "300.0 MB"
+    assert format_bytes(2 * 1024**3) == "2.0 GB"
+
+
+def test_format_status_table_lists_finished_and_running_stages():
+    status = WorkflowStatus(
+        workflow_id="wf",
+        video_name="ms_LeovsKhanh.mov",
+        stage="UPLOADING",
+        timings={"ADDING_VIDEO_OVERLAYS": _stats()},
+    )
+
+    lines = format_status_table([status]).splitlines()
+
+    assert lines[0].split() == ["Video", "Stage", "Wall", "CPU", "Subproc", "Peak", "RSS", "Read", "Written"]
+    assert lines[1].split() == [
+        "ms_LeovsKhanh.mov", "ADDING_VIDEO_OVERLAYS", "12.3s", "5.0s", "10.0s",
+        "300.0", "MB", "2.0", "GB", "512", "B",
+    ]
+    assert lines[2].split() == ["ms_LeovsKhanh.mov", "UPLOADING", "(running)"]
+
+
+def test_format_store_table_marks_ready_videos():
+    videos = [
+        VideoState("fp1", "ms_LeovsKhanh.mov", ("metadata", "thumbnail"), None, "2024-12-15"),
+        VideoState("fp2", "ms_AnhvsMai.mov", ("metadata", "uploaded"), "vid2", "2024-12-14"),
+    ]
+
+    lines = format_store_table(videos, {"ms_LeovsKhanh.mov"}).splitlines()
+
+    assert lines[1].split() == ["ms_LeovsKhanh.mov", "metadata,", "thumbnail", "-", "yes"]
+    assert lines[2].split() == ["ms_AnhvsMai.mov", "metadata,", "uploaded", "vid2"]
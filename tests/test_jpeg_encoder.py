@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from thumbnail_enhancement import jpeg_encoder
+from thumbnail_enhancement.jpeg_encoder import encode_jpeg, encode_under_budget
+
+
+def make_noisy_image(width: int = 320, height: int = 180) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def test_small_image_keeps_max_quality():
+    img = Image.new("RGB", (320, 180), (20, 40, 60))
+
+    encoded = encode_under_budget(img)
+
+    assert encoded.quality == jpeg_encoder.MAX_QUALITY
+    with Image.open(io.BytesIO(encoded.data)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.info.get("progressive")
+
+
+def test_picks_highest_quality_within_budget():
+    img = make_noisy_image()
+    budget = len(encode_jpeg(img, 70)) + 1
+
+    encoded = encode_under_budget(img, max_bytes=budget)
+
+    assert len(encoded.data) <= budget
+    assert encoded.quality >= 70
+    assert len(encode_jpeg(img, encoded.quality + 1)) > budget
+
+
+def test_quality_hint_is_cached_per_key(monkeypatch):
+    monkeypatch.setattr(jpeg_encoder, "_quality_hints", {})
+    img = make_noisy_image()
+    budget = len(encode_jpeg(img, 60)) + 1
+
+    first = encode_under_budget(img, max_bytes=budget, cache_key="template_x")
+
+    calls = []
+    original = jpeg_encoder.encode_jpeg
+    monkeypatch.setattr(
+        jpeg_encoder,
+        "encode_jpeg",
+        lambda image, quality: calls.append(quality) or original(image, quality),
+    )
+    second = encode_under_budget(img, max_bytes=budget, cache_key="template_x")
+
+    assert second.quality == first.quality
+    assert calls[:2] == [jpeg_encoder.MAX_QUALITY, first.quality]
+
+
+def test_downscales_when_minimum_quality_is_too_large():
+    img = make_noisy_image(640, 360)
+    budget = len(encode_jpeg(img, jpeg_encoder.MIN_QUALITY)) // 2
+
+    encoded = encode_under_budget(img, max_bytes=budget)
+
+    assert len(encoded.data) <= budget
+    assert encoded.size[0] < 640
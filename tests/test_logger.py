@@ -0,0 +1,106 @@
+import json
+import logging
+import sys
+from unittest.mock import patch
+
+from instrumentation import instrumented
+from logger import (
+    ContextFilter,
+    JsonFormatter,
+    RateLimitedLogger,
+    _QueueHandler,
+    get_log_context,
+    log_context,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _isolated_logger(name: str) -> tuple[logging.Logger, ListHandler]:
+    log = logging.getLogger(name)
+    handler = ListHandler()
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log, handler
+
+
+def _make_record(msg="hello", exc_info=None, **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_log_context_nests_and_resets():
+    with log_context(video="ms_A", stage="upload"):
+        with log_context(stage="cleanup", workflow_id=None):
+            assert get_log_context() == {"video": "ms_A", "stage": "cleanup"}
+        assert get_log_context() == {"video": "ms_A", "stage": "upload"}
+    assert get_log_context() == {}
+
+
+def test_context_filter_stamps_context_and_temporal_workflow_id():
+    record = _make_record(temporal_workflow={"workflow_id": "wf-1", "run_id": "r"})
+
+    with log_context(video="ms_A"):
+        ContextFilter().filter(record)
+
+    assert record.context == {"video": "ms_A", "workflow_id": "wf-1"}
+    assert record.context_text == "[workflow_id=wf-1 video=ms_A] "
+
+
+def test_json_formatter_keeps_exception_prepared_by_queue_handler():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _make_record("failed %s", exc_info=sys.exc_info())
+    record.args = ("upload",)
+    with log_context(stage="upload"):
+        ContextFilter().filter(record)
+
+    prepared = _QueueHandler(None).prepare(record)
+    entry = json.loads(JsonFormatter().format(prepared))
+
+    assert entry["message"] == "failed upload"
+    assert entry["stage"] == "upload"
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_rate_limited_logger_suppresses_per_context_and_reports_count():
+    log, handler = _isolated_logger("test.rate_limited")
+    limited = RateLimitedLogger(log, interval=10)
+
+    with patch("logger.time.monotonic", side_effect=[0, 1, 2, 3, 11]):
+        with log_context(video="ms_A"):
+            limited.info("progress 1")
+            limited.info("progress 2")
+            limited.info("progress 3")
+        with log_context(video="ms_B"):
+            limited.info("other video")
+        with log_context(video="ms_A"):
+            limited.info("progress 4")
+
+    assert [r.getMessage() for r in handler.records] == [
+        "progress 1",
+        "other video",
+        "progress 4 (2 similar messages suppressed)",
+    ]
+
+
+def test_instrumented_binds_video_and_stage_context():
+    seen = {}
+
+    @instrumented
+    def render_activity(video_path: str) -> None:
+        seen.update(get_log_context())
+
+    render_activity("/input/ms_LeovsKhanh.mov")
+
+    assert seen == {"video": "ms_LeovsKhanh", "stage": "render_activity"}
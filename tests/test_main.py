@@ -5,8 +5,8 @@ from unittest.mock import patch
 from main import cmd_start
 
 
-@patch("main.validate_auth", side_effect=Exception("Token expired"))
-@patch("main.start_video_workflow")
+@patch("auth_service.validate_auth", side_effect=Exception("Token expired"))
+@patch("temporal.client.start_video_workflows")
 def test_cmd_start_exits_on_auth_failure(mock_start_workflow, mock_validate_auth):
     with pytest.raises(SystemExit) as exc:
         asyncio.run(cmd_start(None))
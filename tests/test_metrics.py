@@ -0,0 +1,116 @@
+import functools
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from instrumentation import instrumented
+from metrics import (
+    REGISTRY,
+    MeteredThreadPoolExecutor,
+    Registry,
+    register_lru_cache,
+    start_metrics_server,
+)
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs.", ("kind",)).inc(2, kind='a"b')
+    registry.gauge("depth", "Depth.").set(3)
+    histogram = registry.histogram("latency_seconds", "Latency.", (), (1, 5))
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a\\"b"} 2' in text
+    assert "depth 3" in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="5"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    assert "latency_seconds_sum 3.5" in text
+
+
+def test_labels_must_match_declared_names():
+    counter = Registry().counter("jobs_total", "Jobs.", ("kind",))
+
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_lru_cache_hit_ratio_is_computed_at_scrape_time():
+    registry = Registry()
+
+    @functools.lru_cache(maxsize=4)
+    def square(n):
+        return n * n
+
+    register_lru_cache("square", square, registry)
+    square(2)
+    square(2)
+    square(2)
+    square(3)
+
+    text = registry.render()
+    assert 'cache_hits{cache="square"} 2' in text
+    assert 'cache_misses{cache="square"} 2' in text
+    assert 'cache_hit_ratio{cache="square"} 0.5' in text
+
+
+def test_metered_executor_reports_queue_depth_and_utilization():
+    registry = Registry()
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    with MeteredThreadPoolExecutor(1, "test", registry) as executor:
+        executor.submit(block)
+        started.wait(5)
+        executor.submit(lambda: None)
+        text = registry.render()
+        release.set()
+
+    assert 'executor_active_threads{executor="test"} 1' in text
+    assert 'executor_queue_depth{executor="test"} 1' in text
+    assert 'executor_utilization{executor="test"} 1' in text
+    assert executor.queued == executor.active == 0
+
+
+def test_instrumented_activity_failures_are_exported():
+    @instrumented
+    def failing_activity() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        failing_activity()
+
+    assert 'activity_duration_seconds_count{activity="failing_activity",status="error"} 1' in (
+        REGISTRY.render()
+    )
+
+
+def test_metrics_server_serves_local_scrape():
+    registry = Registry()
+    registry.counter("scrapes_total", "Scrapes.").inc()
+    server = start_metrics_server(0, "127.0.0.1", registry)
+    port = server.server_address[1]
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "scrapes_total 1" in body
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert exc.value.code == 404
@@ -0,0 +1,81 @@
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from instrumentation import run_subprocess
+from profiling import StackSampler, _PeakSnapshotter, profile_step
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def test_cprofile_report_written_to_report_dir(tmp_path):
+    with profile_step(tmp_path / "debug", "render", profile="cprofile") as prefix:
+        _busy(0.05)
+
+    assert prefix.parent == tmp_path / "debug"
+    assert prefix.name.startswith("render-")
+    assert (tmp_path / "debug" / f"{prefix.name}.prof").exists()
+    assert "_busy" in (tmp_path / "debug" / f"{prefix.name}.profile.txt").read_text()
+
+
+def test_sampling_report_attributes_time_to_hot_function(tmp_path):
+    with profile_step(tmp_path, "render", profile="sample") as prefix:
+        _busy(0.2)
+
+    summary = (tmp_path / f"{prefix.name}.samples.txt").read_text()
+    folded = (tmp_path / f"{prefix.name}.folded").read_text()
+    assert "_busy" in summary
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+
+def test_stack_sampler_summary_without_samples():
+    assert "No samples" in StackSampler(0).summary()
+
+
+def test_subprocess_trace_records_argv_and_returncode(tmp_path):
+    with profile_step(tmp_path, "metadata", trace_subprocess=True) as prefix:
+        run_subprocess([sys.executable, "-c", "raise SystemExit(3)"])
+
+    report = (tmp_path / f"{prefix.name}.subprocess.txt").read_text()
+    assert report.startswith("1 subprocesses")
+    assert "\t3\t" in report
+    assert "raise SystemExit(3)" in report
+
+
+def test_memory_report_lists_peak_and_top_allocations(tmp_path):
+    with profile_step(tmp_path, "render", mem=True) as prefix:
+        blocks = [bytearray(1024 * 1024) for _ in range(4)]
+        time.sleep(0.3)
+        del blocks
+
+    report = (tmp_path / f"{prefix.name}.memory.txt").read_text()
+    assert report.startswith("Peak traced memory: 4.")
+    assert "test_profiling.py" in report
+
+
+def test_peak_snapshots_only_after_meaningful_growth():
+    traced = [(1000, 0), (1050, 0), (1099, 0), (1100, 0), (1150, 0)]
+    snapshotter = _PeakSnapshotter(growth=1.1)
+
+    with patch("profiling.tracemalloc.get_traced_memory", side_effect=traced), \
+         patch("profiling.tracemalloc.take_snapshot") as take_snapshot:
+        for _ in traced:
+            snapshotter.poll()
+
+    assert take_snapshot.call_count == 2
+    assert snapshotter.snapshot_size == 1100
+
+
+def test_reports_written_when_step_fails(tmp_path):
+    with pytest.raises(RuntimeError):
+        with profile_step(tmp_path, "upload", profile="cprofile", mem=True) as prefix:
+            raise RuntimeError("boom")
+
+    assert (tmp_path / f"{prefix.name}.profile.txt").exists()
+    assert (tmp_path / f"{prefix.name}.memory.txt").exists()
@@ -0,0 +1,142 @@
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import config
+import retention
+from custom_exceptions import InsufficientDiskSpaceError
+from retention import (
+    SECONDS_PER_DAY,
+    Artifact,
+    RetentionPolicy,
+    RetentionRule,
+    apply_retention,
+    disk_space_reservation,
+    plan_evictions,
+)
+
+NOW = 1_000 * SECONDS_PER_DAY
+PROCESSED = RetentionRule("processed.mov", ttl_days=14)
+CANDIDATES = RetentionRule("candidates", ttl_days=None)
+
+
+def _artifact(name: str, rule: RetentionRule, size: int, age_days: float) -> Artifact:
+    return Artifact(Path(name), rule, size, NOW - age_days * SECONDS_PER_DAY)
+
+
+def _disk(free: int):
+    return shutil._ntuple_diskusage(total=10 * free, used=9 * free, free=free)
+
+
+def make_workspace(root: Path, stem: str, age_days: float, processed_size: int = 1000) -> Path:
+    workspace = root / stem
+    (workspace / "candidates").mkdir(parents=True)
+    (workspace / "metadata.json").write_text("{}")
+    (workspace / "thumbnail.jpg").write_bytes(b"thumb")
+    (workspace / "processed.mov").write_bytes(b"\0" * processed_size)
+    (workspace / "candidates" / "candidate_001.jpg").write_bytes(b"jpeg")
+    old = NOW - age_days * SECONDS_PER_DAY
+    for path in [workspace / "processed.mov", workspace / "candidates", workspace / "candidates" / "candidate_001.jpg"]:
+        os.utime(path, (old, old))
+    return workspace
+
+
+def test_plan_evicts_expired_then_least_recently_used_over_budget():
+    expired = _artifact("a/processed.mov", PROCESSED, 500, age_days=20)
+    oldest = _artifact("b/candidates", CANDIDATES, 300, age_days=10)
+    newest = _artifact("c/candidates", CANDIDATES, 300, age_days=1)
+    policy = RetentionPolicy((PROCESSED, CANDIDATES), max_total_bytes=400)
+
+    assert plan_evictions([newest, oldest, expired], policy, NOW) == [expired, oldest]
+
+
+def test_plan_without_budget_only_evicts_expired():
+    fresh = _artifact("a/processed.mov", PROCESSED, 500, age_days=3)
+    policy = RetentionPolicy((PROCESSED,))
+
+    assert plan_evictions([fresh], policy, NOW) == []
+
+
+def test_apply_retention_only_deletes_regenerable_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RETENTION_PROCESSED_TTL_DAYS", 14)
+    monkeypatch.setattr(config, "RETENTION_CANDIDATES_TTL_DAYS", 30)
+    monkeypatch.setattr(config, "RETENTION_MAX_BYTES", 0)
+    workspace = make_workspace(tmp_path, "ms_Old", age_days=20)
+
+    evicted = apply_retention(roots=[tmp_path], now=NOW)
+
+    assert [artifact.path for artifact in evicted] == [workspace / "processed.mov"]
+    assert not (workspace / "processed.mov").exists()
+    assert (workspace / "candidates" / "candidate_001.jpg").exists()
+    assert (workspace / "thumbnail.jpg").exists()
+
+
+def test_apply_retention_dry_run_keeps_files(tmp_path):
+    workspace = make_workspace(tmp_path, "ms_Old", age_days=400)
+
+    evicted = apply_retention(roots=[tmp_path], dry_run=True, now=NOW)
+
+    assert evicted
+    assert (workspace / "processed.mov").exists()
+
+
+def test_reservations_count_against_free_space(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DISK_SPACE_RESERVE_BYTES", 0)
+
+    with patch("retention.shutil.disk_usage", return_value=_disk(1500)):
+        with disk_space_reservation(tmp_path, 1000, roots=[]):
+            with pytest.raises(InsufficientDiskSpaceError):
+                with disk_space_reservation(tmp_path, 1000, roots=[]):
+                    pass
+        with disk_space_reservation(tmp_path, 1000, roots=[]):
+            pass
+
+
+def test_disk_pressure_evicts_least_recently_used_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DISK_SPACE_RESERVE_BYTES", 0)
+    archive_root = tmp_path / "completed"
+    older = make_workspace(archive_root, "ms_Older", age_days=5, processed_size=600)
+    newer = make_workspace(archive_root, "ms_Newer", age_days=1, processed_size=600)
+
+    evicted = []
+
+    with patch("retention.shutil.disk_usage", side_effect=[_disk(500), _disk(500), _disk(1100)]):
+        with disk_space_reservation(tmp_path, 1000, roots=[archive_root], on_evict=evicted.append):
+            pass
+
+    assert [artifact.path for artifact in evicted] == [older / "processed.mov"]
+    assert not (older / "processed.mov").exists()
+    assert (newer / "processed.mov").exists()
+
+
+def test_disk_pressure_keeps_artifacts_when_eviction_cannot_help(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DISK_SPACE_RESERVE_BYTES", 0)
+    archive_root = tmp_path / "completed"
+    workspace = make_workspace(archive_root, "ms_Only", age_days=5, processed_size=100)
+
+    with patch("retention.shutil.disk_usage", return_value=_disk(100)):
+        with pytest.raises(InsufficientDiskSpaceError):
+            with disk_space_reservation(tmp_path, 1000, roots=[archive_root]):
+                pass
+
+    assert (workspace / "processed.mov").exists()
+
+
+def test_eviction_does_not_hold_the_reservation_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DISK_SPACE_RESERVE_BYTES", 0)
+    lock_held = []
+
+    def evict_slowly(device, shortfall, roots, on_evict):
+        lock_held.append(retention._reservation_lock.locked())
+        return 0
+
+    with patch("retention.shutil.disk_usage", return_value=_disk(100)), \
+         patch("retention._free_for_lru_eviction", side_effect=evict_slowly):
+        with pytest.raises(InsufficientDiskSpaceError):
+            with disk_space_reservation(tmp_path, 1000, roots=[]):
+                pass
+
+    assert lock_held == [False]
@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import config
+import scheduling
+from instrumentation import StageStats
+from scheduling import (
+    StageCost,
+    fit_stage_cost,
+    load_cost_model,
+    parse_schedule_tags,
+    plan_batch,
+    probe_video,
+    record_stage_timing,
+)
+from temporal.client import VideoWorkflowOptions, start_video_workflow
+from tests.test_temporal_client import FakeClient
+
+NOW = datetime(2024, 12, 15, 12, 0)
+
+
+@pytest.fixture
+def input_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "INPUT_DIR", tmp_path)
+    monkeypatch.setattr(config, "COMPLETED_DIR", tmp_path / "completed")
+    return tmp_path
+
+
+def make_videos(input_dir: Path, durations: dict[str, float]) -> list[Path]:
+    videos = []
+    for name in durations:
+        video = input_dir / name
+        video.write_bytes(name.encode())
+        videos.append(video)
+    return videos
+
+
+def _stats(wall_seconds: float) -> StageStats:
+    return StageStats(wall_seconds, 0.0, 0, 0, 0, 0.0, 0)
+
+
+def test_parse_schedule_tags():
+    tags = parse_schedule_tags("ms_LeovsKhanh_Final_@p1_@due20241220")
+
+    assert tags.priority == 1
+    assert tags.deadline == datetime(2024, 12, 21)
+    assert parse_schedule_tags("ms_LeovsKhanh_@p9_@soon").priority is None
+
+
+def test_fit_stage_cost_uses_regression_or_ratio():
+    linear = [(60.0, 40.0), (120.0, 70.0), (300.0, 160.0)]
+    cost = fit_stage_cost(linear)
+    assert cost.fixed_seconds == pytest.approx(10.0)
+    assert cost.seconds_per_media_second == pytest.approx(0.5)
+
+    assert fit_stage_cost([(100.0, 50.0)]) == StageCost(0, 0.5)
+    assert fit_stage_cost([]) is None
+
+
+def test_probe_is_cached_until_file_changes(input_dir):
+    (video,) = make_videos(input_dir, {"ms_LeovsKhanh.mov": 0})
+
+    with patch.object(scheduling, "_probe_duration", return_value=300.0) as mock_probe:
+        assert probe_video(video).duration == 300.0
+        assert probe_video(video).duration == 300.0
+        assert mock_probe.call_count == 1
+
+        video.write_bytes(b"re-exported")
+        probe_video(video)
+        assert mock_probe.call_count == 2
+
+
+def test_plan_batch_runs_short_videos_first_and_honors_tags(input_dir):
+    durations = {
+        "ms_FinalvsSemis.mov": 90 * 60,
+        "ms_LeovsKhanh.mov": 5 * 60,
+        "ms_AnhvsMai.mov": 20 * 60,
+        "ms_VipvsGuest_@p1.mov": 95 * 60,
+    }
+    videos = make_videos(input_dir, durations)
+
+    with patch.object(scheduling, "_probe_duration", side_effect=lambda path: durations[path.name]):
+        plan = plan_batch(videos, "sjf", now=NOW)
+
+    assert [video.video_path.name for video in plan] == [
+        "ms_VipvsGuest_@p1.mov",
+        "ms_LeovsKhanh.mov",
+        "ms_AnhvsMai.mov",
+        "ms_FinalvsSemis.mov",
+    ]
+    assert [video.priority for video in plan] == [1, 2, 3, 4]
+
+
+def test_plan_batch_deadline_orders_by_due_date(input_dir):
+    durations = {
+        "ms_LeovsKhanh.mov": 5 * 60,
+        "ms_AnhvsMai_@due20241220.mov": 60 * 60,
+        "ms_FinalvsSemis_@due20241215.mov": 90 * 60,
+    }
+    videos = make_videos(input_dir, durations)
+
+    with patch.object(scheduling, "_probe_duration", side_effect=lambda path: durations[path.name]):
+        plan = plan_batch(videos, "deadline", now=NOW)
+
+    assert [video.video_path.name for video in plan] == [
+        "ms_FinalvsSemis_@due20241215.mov",
+        "ms_AnhvsMai_@due20241220.mov",
+        "ms_LeovsKhanh.mov",
+    ]
+    assert [video.priority for video in plan] == [2, 3, 4]
+
+
+def test_recorded_timings_replace_default_costs(input_dir):
+    (video,) = make_videos(input_dir, {"ms_LeovsKhanh.mov": 0})
+    with patch.object(scheduling, "_probe_duration", return_value=100.0):
+        probe_video(video)
+
+    record_stage_timing("add_video_overlays_activity", (str(video),), _stats(25.0), "ok")
+    record_stage_timing("add_video_overlays_activity", (str(video),), _stats(99.0), "error")
+
+    cost_model = load_cost_model()
+    assert cost_model["add_video_overlays_activity"] == StageCost(0, 0.25)
+    assert cost_model["upload_video_activity"] == scheduling.DEFAULT_STAGE_COSTS["upload_video_activity"]
+
+
+def test_start_video_workflow_passes_priority(tmp_path):
+    video = tmp_path / "ms_LeovsKhanh.mov"
+    video.write_bytes(b"video")
+    client = FakeClient()
+
+    asyncio.run(start_video_workflow(client, VideoWorkflowOptions(video_path=str(video), priority=2)))
+
+    assert client.calls[0]["priority"].priority_key == 2
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from constants import (
+    SELECT_THUMBNAIL_SIGNAL,
+    WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION,
+    WORKFLOW_STAGE_UPLOADING,
+)
+from web_selector.queue_service import (
+    SelectionQueueService,
+    SelectionTask,
+    list_awaiting_selection,
+)
+from web_selector.routes import VideoSession
+
+
+class FakeHandle:
+    def __init__(self, workflow_id, stage, video_path, signals):
+        self.id = workflow_id
+        self.stage = stage
+        self.video_path = video_path
+        self.signals = signals
+
+    async def query(self, name):
+        return {"get_stage": self.stage, "get_video_path": self.video_path}[name]
+
+    async def signal(self, name, arg):
+        self.signals.append((self.id, name, arg))
+
+
+class FakeClient:
+    def __init__(self, workflows=()):
+        self.workflows = {wid: (stage, path) for wid, stage, path in workflows}
+        self.signals = []
+
+    async def list_workflows(self, query):
+        for workflow_id in self.workflows:
+            yield SimpleNamespace(id=workflow_id, run_id=None)
+
+    def get_workflow_handle(self, workflow_id, run_id=None):
+        stage, path = self.workflows.get(workflow_id, (None, None))
+        return FakeHandle(workflow_id, stage, path, self.signals)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def no_preload():
+    with patch.object(VideoSession, "preload") as preload:
+        yield preload
+
+
+def _tasks(tmp_path, *names):
+    return [SelectionTask(f"wf_{name}", str(tmp_path / f"{name}.mov")) for name in names]
+
+
+def test_list_awaiting_selection_filters_on_stage(tmp_path):
+    client = FakeClient([
+        ("wf_b", WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION, "/videos/b.mov"),
+        ("wf_busy", WORKFLOW_STAGE_UPLOADING, "/videos/busy.mov"),
+        ("wf_a", WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION, "/videos/a.mov"),
+    ])
+
+    tasks = asyncio.run(list_awaiting_selection(client))
+
+    assert tasks == [
+        SelectionTask("wf_a", "/videos/a.mov"),
+        SelectionTask("wf_b", "/videos/b.mov"),
+    ]
+
+
+def test_index_redirects_to_first_pending_video(tmp_path, loop):
+    service = SelectionQueueService(FakeClient(), loop)
+    client = service.app.test_client()
+
+    assert b"No videos are waiting" in client.get("/").data
+
+    service.update_tasks(_tasks(tmp_path, "a", "b"))
+    response = client.get("/")
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/videos/wf_a/")
+    assert [item["workflow_id"] for item in client.get("/queue").get_json()["pending"]] == [
+        "wf_a",
+        "wf_b",
+    ]
+
+
+def test_unknown_workflow_returns_404(tmp_path, loop):
+    service = SelectionQueueService(FakeClient(), loop)
+
+    assert service.app.test_client().get("/videos/missing/info").status_code == 404
+
+
+def test_select_signals_workflow_and_returns_next(tmp_path, loop, no_preload):
+    fake_client = FakeClient()
+    service = SelectionQueueService(fake_client, loop)
+    service.update_tasks(_tasks(tmp_path, "a", "b"))
+    no_preload.reset_mock()
+    client = service.app.test_client()
+
+    with patch("web_selector.routes.probe_duration", return_value=60.0):
+        response = client.post("/videos/wf_a/select?t=12.5")
+
+    assert response.get_json()["next"] == "/videos/wf_b/"
+    assert fake_client.signals == [("wf_a", SELECT_THUMBNAIL_SIGNAL, 12.5)]
+    assert service.pending_ids() == ["wf_b"]
+    no_preload.assert_called_once()
+
+    with patch("web_selector.routes.probe_duration", return_value=60.0):
+        response = client.post("/videos/wf_b/select?t=3")
+    assert response.get_json()["next"] is None
+
+
+def test_update_tasks_drops_workflows_no_longer_waiting(tmp_path, loop):
+    service = SelectionQueueService(FakeClient(), loop)
+    service.update_tasks(_tasks(tmp_path, "a", "b"))
+
+    service.update_tasks(_tasks(tmp_path, "b", "c"))
+
+    assert service.pending_ids() == ["wf_b", "wf_c"]
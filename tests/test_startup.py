@@ -0,0 +1,48 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MAIN_IMPORT_BUDGET_US = 500_000
+HEAVY_MODULES = ("temporalio", "googleapiclient", "cv2", "numpy", "PIL", "flask", "torch", "clip")
+MEDIA_MODULES = ("cv2", "numpy", "PIL", "flask", "torch", "clip")
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """Runs `statement` under `python -X importtime` and returns cumulative µs per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_main_import_is_within_budget_and_skips_heavy_modules():
+    times = _import_times("import main")
+
+    assert times["main"] < MAIN_IMPORT_BUDGET_US
+    assert not [module for module in HEAVY_MODULES if module in times]
+
+
+def test_start_dependencies_skip_media_modules():
+    times = _import_times("import main, auth_service, utils, temporal.client")
+
+    assert not [module for module in MEDIA_MODULES if module in times]
+
+
+def test_clip_ranker_defers_torch():
+    times = _import_times("import thumbnail_ranking.clip_ranker")
+
+    assert "torch" not in times
+    assert "clip" not in times
@@ -0,0 +1,222 @@
+import json
+import sqlite3
+from dataclasses import asdict
+from unittest.mock import patch
+
+import pytest
+
+import atomic_io
+import state_store
+from custom_exceptions import CorruptArtifactError
+from schemas import MatchMetadata, UploadedRecord
+
+
+@pytest.fixture
+def conn(tmp_path):
+    with state_store.open_store(tmp_path / "state.db") as conn:
+        yield conn
+
+
+def make_metadata() -> MatchMetadata:
+    return MatchMetadata(
+        match_type="Men's Singles",
+        team1_names=["Leo"],
+        team2_names=["Khanh"],
+        tournament="Cafe Game",
+        title="Leo vs Khanh | Cafe Game (2024-12-15)",
+        description="#badminton",
+        category="17",
+    )
+
+
+def make_upload_record(video_id: str = "abc123") -> UploadedRecord:
+    return UploadedRecord(
+        video_id=video_id,
+        uploaded_at="2024-12-15T10:00:00",
+        thumbnail_set=False,
+        youtube_link=f"https://youtu.be/{video_id}",
+    )
+
+
+def test_open_store_uses_wal_mode(conn):
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_metadata_round_trip(conn):
+    state_store.save_metadata(conn, "fp1", "ms_LeovsKhanh.mov", make_metadata())
+
+    assert state_store.get_metadata(conn, "fp1") == make_metadata()
+    assert state_store.has_stage(conn, "fp1", state_store.STAGE_METADATA)
+
+
+def test_upload_round_trip(conn):
+    state_store.save_upload(conn, "fp1", "ms_LeovsKhanh.mov", make_upload_record())
+
+    assert state_store.get_upload(conn, "fp1") == make_upload_record()
+    assert state_store.get_upload(conn, "missing") is None
+
+
+def test_filter_ready_for_upload_requires_metadata_and_thumbnail_without_upload(conn):
+    for fp in ("ready", "uploaded", "no_thumbnail"):
+        state_store.save_metadata(conn, fp, f"{fp}.mov", make_metadata())
+    for fp in ("ready", "uploaded"):
+        state_store.mark_stage_complete(conn, fp, f"{fp}.mov", state_store.STAGE_THUMBNAIL)
+    state_store.save_upload(conn, "uploaded", "uploaded.mov", make_upload_record())
+
+    ready = state_store.filter_ready_for_upload(conn, ["ready", "uploaded", "no_thumbnail", "unknown"])
+
+    assert ready == {"ready"}
+
+
+def test_clear_stage_removes_completion(conn):
+    state_store.mark_stage_complete(conn, "fp1", "a.mov", state_store.STAGE_THUMBNAIL, "/x.jpg")
+    state_store.clear_stage(conn, "fp1", state_store.STAGE_THUMBNAIL)
+
+    assert state_store.get_stage_artifact(conn, "fp1", state_store.STAGE_THUMBNAIL) is None
+
+
+def test_list_videos_aggregates_stages_and_upload(conn):
+    state_store.save_metadata(conn, "fp1", "a.mov", make_metadata())
+    state_store.mark_stage_complete(conn, "fp1", "a.mov", state_store.STAGE_THUMBNAIL)
+    state_store.save_upload(conn, "fp1", "a.mov", make_upload_record("vid1"))
+
+    [video] = state_store.list_videos(conn)
+
+    assert video.video_name == "a.mov"
+    assert video.video_id == "vid1"
+    assert set(video.completed_stages) == {
+        state_store.STAGE_METADATA,
+        state_store.STAGE_THUMBNAIL,
+        state_store.STAGE_UPLOADED,
+    }
+
+
+def test_import_directory_reads_existing_json_files(conn, tmp_path):
+    root = tmp_path / "completed"
+    workspace = root / "ms_LeovsKhanh"
+    workspace.mkdir(parents=True)
+    (root / "ms_LeovsKhanh.mov").write_bytes(b"video")
+    (workspace / "metadata.json").write_text(json.dumps(asdict(make_metadata())))
+    (workspace / "upload.json").write_text(json.dumps(asdict(make_upload_record())))
+    (workspace / "thumbnail.jpg").write_bytes(b"jpeg")
+
+    imported = state_store.import_directory(conn, root, archived=True)
+
+    [video] = state_store.list_videos(conn)
+    assert imported == 1
+    assert video.video_id == "abc123"
+    assert state_store.STAGE_ARCHIVED in video.completed_stages
+    assert state_store.STAGE_THUMBNAIL in video.completed_stages
+    assert state_store.get_metadata(conn, video.fingerprint) == make_metadata()
+
+
+def test_legacy_workspace_is_imported_on_first_lookup(tmp_path, monkeypatch):
+    import config
+
+    monkeypatch.setattr(config, "INPUT_DIR", tmp_path)
+    video_path = tmp_path / "ms_LeovsKhanh.mov"
+    video_path.write_bytes(b"video")
+    workspace = tmp_path / "ms_LeovsKhanh"
+    workspace.mkdir()
+    (workspace / "metadata.json").write_text(json.dumps(asdict(make_metadata())))
+    (workspace / "thumbnail.jpg").write_bytes(b"jpeg")
+
+    with state_store.open_video(video_path) as (conn, fingerprint):
+        assert state_store.get_metadata(conn, fingerprint) == make_metadata()
+        assert state_store.has_stage(conn, fingerprint, state_store.STAGE_THUMBNAIL)
+        assert state_store.filter_ready_for_upload(conn, [fingerprint]) == {fingerprint}
+
+
+def test_schema_is_reapplied_when_database_is_removed(tmp_path):
+    db_path = tmp_path / "state.db"
+    with state_store.open_store(db_path):
+        pass
+    db_path.unlink()
+
+    with state_store.open_store(db_path) as conn:
+        assert state_store.list_videos(conn) == []
+
+
+def test_videos_ready_for_upload_come_from_one_store_query(tmp_path, monkeypatch):
+    import config
+    from uploader import get_videos_ready_for_upload
+
+    monkeypatch.setattr(config, "INPUT_DIR", tmp_path)
+    videos = []
+    for stem, files in [
+        ("ms_Ready", {"metadata.json", "thumbnail.jpg"}),
+        ("ms_Uploaded", {"metadata.json", "thumbnail.jpg", "upload.json"}),
+        ("ms_NoThumbnail", {"metadata.json"}),
+        ("ms_NotStarted", None),
+    ]:
+        video_path = tmp_path / f"{stem}.mov"
+        video_path.write_bytes(stem.encode())
+        videos.append(video_path)
+        if files is None:
+            continue
+        workspace = tmp_path / stem
+        workspace.mkdir()
+        (workspace / "metadata.json").write_text(json.dumps(asdict(make_metadata())))
+        if "thumbnail.jpg" in files:
+            (workspace / "thumbnail.jpg").write_bytes(b"jpeg")
+        if "upload.json" in files:
+            (workspace / "upload.json").write_text(json.dumps(asdict(make_upload_record())))
+
+    assert get_videos_ready_for_upload(videos) == [tmp_path / "ms_Ready.mov"]
+    assert not (tmp_path / "ms_NotStarted").exists()
+
+
+def _write_artifact(path, data: bytes) -> None:
+    with atomic_io.atomic_output(path) as tmp_path:
+        tmp_path.write_bytes(data)
+    atomic_io.write_integrity_sidecar(path)
+
+
+def test_recorded_stage_is_trusted_without_rehashing(tmp_path):
+    video_path = tmp_path / "ms_LeovsKhanh.mov"
+    video_path.write_bytes(b"video")
+    artifact = tmp_path / "thumbnail.jpg"
+    _write_artifact(artifact, b"jpeg")
+    state_store.record_stage(video_path, state_store.STAGE_THUMBNAIL, artifact)
+
+    with patch("state_store.atomic_io.verify_artifact", wraps=atomic_io.verify_artifact) as verify:
+        assert state_store.is_stage_complete(video_path, state_store.STAGE_THUMBNAIL, artifact)
+        assert verify.call_count == 0
+
+        artifact.write_bytes(b"truncated jpeg")
+        assert not state_store.is_stage_complete(video_path, state_store.STAGE_THUMBNAIL, artifact)
+        assert verify.call_count == 1
+    assert not artifact.exists()
+
+
+def test_require_verified_artifact_discards_corrupt_artifact(tmp_path):
+    video_path = tmp_path / "ms_LeovsKhanh.mov"
+    video_path.write_bytes(b"video")
+    artifact = tmp_path / "processed.mov"
+    _write_artifact(artifact, b"processed")
+    state_store.record_stage(video_path, state_store.STAGE_PROCESSED_VIDEO, artifact)
+
+    state_store.require_verified_artifact(video_path, state_store.STAGE_PROCESSED_VIDEO, artifact)
+
+    artifact.write_bytes(b"corrupted")
+    with pytest.raises(CorruptArtifactError):
+        state_store.require_verified_artifact(
+            video_path, state_store.STAGE_PROCESSED_VIDEO, artifact
+        )
+    assert not artifact.exists()
+    with state_store.open_video(video_path) as (conn, fingerprint):
+        assert not state_store.has_stage(conn, fingerprint, state_store.STAGE_PROCESSED_VIDEO)
+
+
+def test_stage_stat_columns_are_added_to_existing_databases(tmp_path):
+    db_path = tmp_path / "old.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE TABLE stages (fingerprint TEXT NOT NULL, stage TEXT NOT NULL, "
+        "artifact_path TEXT, completed_at TEXT NOT NULL, PRIMARY KEY (fingerprint, stage))"
+    )
+    legacy.close()
+
+    with state_store.open_store(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(stages)")}
+    assert {"artifact_size", "artifact_mtime_ns"} <= columns
@@ -0,0 +1,72 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from temporalio.common import WorkflowIDReusePolicy
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+from temporal.client import (
+    VideoWorkflowOptions,
+    gen_workflow_id,
+    start_video_workflow,
+    start_video_workflows,
+)
+
+
+class FakeClient:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def start_workflow(self, workflow, arg=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.calls.append(kwargs)
+        if kwargs["id"] in self.fail_ids:
+            raise WorkflowAlreadyStartedError(kwargs["id"], workflow)
+        return MagicMock(id=kwargs["id"])
+
+
+def test_gen_workflow_id_is_deterministic():
+    path = Path("ms_LeovsKhanh.mov")
+
+    assert gen_workflow_id(path, "abcdef0123456789ff") == "ms_LeovsKhanh_abcdef0123456789"
+    assert gen_workflow_id(path, "abcdef0123456789ff") == gen_workflow_id(path, "abcdef0123456789ff")
+
+
+def test_start_video_workflow_rejects_duplicates(tmp_path):
+    video = tmp_path / "ms_LeovsKhanh.mov"
+    video.write_bytes(b"video")
+    client = FakeClient()
+
+    asyncio.run(start_video_workflow(client, VideoWorkflowOptions(video_path=str(video))))
+    asyncio.run(start_video_workflow(client, VideoWorkflowOptions(video_path=str(video))))
+
+    assert client.calls[0]["id"] == client.calls[1]["id"]
+    assert client.calls[0]["id_reuse_policy"] == WorkflowIDReusePolicy.ALLOW_DUPLICATE_FAILED_ONLY
+
+
+def test_start_video_workflows_bounds_concurrency_and_collects_errors(tmp_path):
+    videos = []
+    for i in range(6):
+        video = tmp_path / f"ms_Player{i}vsKhanh.mov"
+        video.write_bytes(f"video {i}".encode())
+        videos.append(video)
+
+    client = FakeClient()
+    first = asyncio.run(
+        start_video_workflows(client, [VideoWorkflowOptions(video_path=str(videos[0]))])
+    )
+    duplicate_id = first[0].id
+
+    client = FakeClient(fail_ids={duplicate_id})
+    options_list = [VideoWorkflowOptions(video_path=str(v)) for v in videos]
+    results = asyncio.run(start_video_workflows(client, options_list, max_concurrency=2))
+
+    assert client.max_in_flight <= 2
+    assert isinstance(results[0], WorkflowAlreadyStartedError)
+    assert all(r.id for r in results[1:])
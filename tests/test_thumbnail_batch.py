@@ -0,0 +1,144 @@
+import json
+from dataclasses import asdict
+
+from PIL import Image
+
+from schemas import MatchMetadata, UploadedRecord
+from thumbnail_enhancement.batch import (
+    RateLimiter,
+    RerenderJob,
+    ThumbnailPushQueue,
+    find_rerender_workspaces,
+    get_versioned_thumbnail_path,
+    load_archived_upload_record,
+    preload_render_assets,
+    render_job,
+    rerender_workspaces,
+)
+from thumbnail_enhancement import template_a, template_b
+
+
+def make_workspace(root, stem: str, with_selected: bool = True):
+    workspace = root / stem
+    workspace.mkdir(parents=True)
+    metadata = MatchMetadata(
+        match_type="Men's Singles",
+        team1_names=["Leo"],
+        team2_names=["Khanh"],
+        tournament="Cafe Game",
+        title="Leo vs Khanh | Cafe Game (2024-12-15)",
+        description="#badminton",
+        category="17",
+    )
+    (workspace / "metadata.json").write_text(json.dumps(asdict(metadata)))
+    if with_selected:
+        Image.new("RGB", (320, 180), (90, 120, 60)).save(workspace / "selected.jpg")
+    return workspace
+
+
+def test_find_rerender_workspaces_requires_metadata_and_selected(tmp_path):
+    ready = make_workspace(tmp_path, "ms_LeovsKhanh")
+    make_workspace(tmp_path, "ms_NoSelected", with_selected=False)
+    (tmp_path / "ms_LeovsKhanh.mov").write_bytes(b"video")
+
+    assert find_rerender_workspaces(tmp_path) == [ready]
+
+
+def test_rerender_workspaces_writes_versioned_outputs(tmp_path):
+    workspaces = [make_workspace(tmp_path, f"ms_Match{i}") for i in range(3)]
+
+    results = list(rerender_workspaces(workspaces, "template_b", "v2", max_workers=2))
+
+    assert all(result.error is None for result in results)
+    assert {result.workspace_dir for result in results} == set(workspaces)
+    for workspace in workspaces:
+        output_path = get_versioned_thumbnail_path(workspace, "v2")
+        assert output_path.name == "thumbnail.v2.jpg"
+        with Image.open(output_path) as img:
+            assert img.size == (1920, 1080)
+        assert not (workspace / "thumbnail.jpg").exists()
+
+
+def test_rerender_workspaces_reports_failures_per_workspace(tmp_path):
+    good = make_workspace(tmp_path, "ms_Good")
+    bad = make_workspace(tmp_path, "ms_Bad")
+    (bad / "selected.jpg").write_bytes(b"not a jpeg")
+
+    results = {r.workspace_dir: r for r in rerender_workspaces([good, bad], "template_a", "v1", 1)}
+
+    assert results[good].error is None
+    assert results[bad].output_path is None
+    assert results[bad].error
+
+
+def test_render_job_marks_existing_version_as_skipped(tmp_path):
+    workspace = make_workspace(tmp_path, "ms_LeovsKhanh")
+    job = RerenderJob(workspace, "template_a", get_versioned_thumbnail_path(workspace, "v1"))
+
+    assert not render_job(job).skipped
+    assert render_job(job).skipped
+
+
+def test_load_archived_upload_record_falls_back_to_upload_json(tmp_path):
+    workspace = make_workspace(tmp_path, "ms_LeovsKhanh")
+    (tmp_path / "ms_LeovsKhanh.mov").write_bytes(b"video")
+    record = UploadedRecord(
+        video_id="abc123",
+        uploaded_at="2024-12-15T10:00:00",
+        thumbnail_set=True,
+        youtube_link="https://youtu.be/abc123",
+    )
+    (workspace / "upload.json").write_text(json.dumps(asdict(record)))
+
+    assert load_archived_upload_record(workspace) == record
+
+
+def test_rate_limiter_spaces_calls():
+    now = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(2.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert sleeps == [0.5, 0.5]
+
+
+def test_rate_limiter_without_rate_never_sleeps():
+    sleeps = []
+    limiter = RateLimiter(0, clock=lambda: 100.0, sleep=sleeps.append)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert sleeps == []
+
+
+def test_preload_loads_only_the_template_starting_font_sizes():
+    for template_name, template in (("template_a", template_a), ("template_b", template_b)):
+        template.get_font.cache_clear()
+        preload_render_assets(template_name)
+
+        assert template.get_font.cache_info().currsize == len(
+            template.preload_font_sizes(1920, 1080) | template.preload_font_sizes(3840, 2160)
+        )
+
+
+def test_push_queue_counts_pushes_and_failures(tmp_path):
+    pushed = []
+
+    def push(video_id, path):
+        if video_id == "broken":
+            raise RuntimeError("quota exceeded")
+        pushed.append((video_id, path))
+
+    push_queue = ThumbnailPushQueue(push, RateLimiter(1000.0))
+    push_queue.submit("vid1", tmp_path / "a.jpg")
+    push_queue.submit("broken", tmp_path / "b.jpg")
+    push_queue.close()
+
+    assert pushed == [("vid1", tmp_path / "a.jpg")]
+    assert (push_queue.pushed, push_queue.failed) == (1, 1)
@@ -0,0 +1,102 @@
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from thumbnail_enhancement.common import (
+    enhance_image_visuals,
+    get_vignette_mask,
+)
+from thumbnail_enhancement.template_a import (
+    BAR_HEIGHT_RATIO,
+    BAR_STYLES,
+    draw_background_bar,
+    render_facet_bar,
+)
+
+
+def reference_enhance(img_pil: Image.Image) -> Image.Image:
+    img_pil = ImageEnhance.Color(img_pil).enhance(1.5)
+    img_pil = ImageEnhance.Contrast(img_pil).enhance(1.05)
+    img_pil = ImageEnhance.Brightness(img_pil).enhance(1.15)
+    img_pil = img_pil.convert("RGBA")
+
+    width, height = img_pil.size
+    x = np.linspace(-1, 1, width)
+    y = np.linspace(-1, 1, height)
+    X, Y = np.meshgrid(x, y)
+    mask = np.clip(np.sqrt(X**2 + Y**2) - 0.65, 0, 1)
+    alpha = (mask * 140).astype(np.uint8)
+
+    black_layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    black_layer.putalpha(Image.fromarray(alpha))
+    return Image.alpha_composite(img_pil, black_layer).convert("RGB")
+
+
+def make_test_image(width: int = 320, height: int = 180) -> Image.Image:
+    rng = np.random.default_rng(42)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    noise = rng.integers(0, 80, size=(height, width, 3)).astype(np.float32)
+    pixels = np.clip(gradient * np.array([1.0, 0.6, 0.3]) + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_enhance_image_visuals_matches_reference_pipeline():
+    img = make_test_image()
+
+    fused = np.asarray(enhance_image_visuals(img)).astype(int)
+    reference = np.asarray(reference_enhance(img)).astype(int)
+
+    diff = np.abs(fused - reference)
+    assert fused.shape == reference.shape
+    assert diff.max() <= 3
+    assert diff.mean() < 0.5
+
+
+def test_enhance_image_visuals_returns_rgb_of_same_size():
+    img = make_test_image(64, 48).convert("RGBA")
+
+    result = enhance_image_visuals(img)
+
+    assert result.mode == "RGB"
+    assert result.size == (64, 48)
+
+
+def test_vignette_mask_is_cached_and_read_only():
+    first = get_vignette_mask(64, 48)
+
+    assert get_vignette_mask(64, 48) is first
+    assert first.dtype == np.uint8
+    assert first.shape == (48, 64)
+    assert not first.flags.writeable
+    assert first[24, 32] == 0
+    assert first[0, 0] > 0
+
+
+def test_background_bar_is_reproducible_for_same_seed():
+    img = make_test_image(640, 360)
+
+    first = draw_background_bar(img, "blue", seed=7)
+    second = draw_background_bar(img, "blue", seed=7)
+    other_seed = draw_background_bar(img, "blue", seed=8)
+
+    assert first.tobytes() == second.tobytes()
+    assert first.tobytes() != other_seed.tobytes()
+
+
+def test_background_bar_only_touches_bar_region():
+    img = make_test_image(640, 360)
+    bar_top = 360 - int(360 * BAR_HEIGHT_RATIO)
+
+    result = np.asarray(draw_background_bar(img, "purple", seed=1))
+    original = np.asarray(img.convert("RGB"))
+
+    assert np.array_equal(result[:bar_top], original[:bar_top])
+    assert not np.array_equal(result[bar_top:], original[bar_top:])
+
+
+def test_facet_bar_covers_full_bar_with_style_alpha():
+    bar = np.asarray(render_facet_bar(640, 64, "white", 3))
+
+    assert bar.shape == (64, 640, 4)
+    start_alpha = BAR_STYLES["white"]["start"][3]
+    end_alpha = BAR_STYLES["white"]["end"][3]
+    assert bar[..., 3].min() >= min(start_alpha, end_alpha)
@@ -1,5 +1,6 @@
 from unittest.mock import patch
-from thumbnail_enhancement.renderer import render_thumbnail
+from constants import THUMBNAIL_TEMPLATE_NAMES
+from thumbnail_enhancement.renderer import TEMPLATES, render_thumbnail
 
 
 def test_render_thumbnail_skips_if_thumbnail_jpg_exists(tmp_path):
@@ -31,3 +32,7 @@ def test_render_thumbnail_proceeds_if_thumbnail_jpg_missing(tmp_path):
         mock_get_template.return_value.render_thumbnail.return_value = str(thumbnail)
         render_thumbnail(str(video_path))
         mock_get_template.assert_called_once()
+
+
+def test_template_names_match_registered_templates():
+    assert sorted(TEMPLATES) == sorted(THUMBNAIL_TEMPLATE_NAMES)
@@ -0,0 +1,74 @@
+import json
+from unittest.mock import patch
+
+from PIL import Image
+
+from schemas import MatchMetadata
+from thumbnail_enhancement import common
+from thumbnail_enhancement.variants import (
+    ThumbnailVariant,
+    get_variant_path,
+    render_variants,
+)
+
+
+def make_metadata() -> MatchMetadata:
+    return MatchMetadata(
+        match_type="Men's Doubles",
+        team1_names=["Leo", "Huy"],
+        team2_names=["Khanh", "Viet"],
+        tournament="Cafe Game",
+        title="Leo/Huy vs Khanh/Viet | Cafe Game (2024-12-15)",
+        description="#badminton",
+        category="17",
+    )
+
+
+def test_render_variants_enhances_once_and_writes_manifest(tmp_path):
+    selected_path = tmp_path / "selected.jpg"
+    Image.new("RGB", (640, 360), (90, 120, 60)).save(selected_path)
+    variants = [
+        ThumbnailVariant("template_a"),
+        ThumbnailVariant("template_b", "purple"),
+        ThumbnailVariant("template_b", "white"),
+    ]
+
+    with patch(
+        "thumbnail_enhancement.variants.load_enhanced_source",
+        wraps=common.load_enhanced_source,
+    ) as mock_load:
+        rendered = render_variants(selected_path, make_metadata(), variants, tmp_path)
+
+    assert mock_load.call_count == 1
+    assert [variant.name for variant in rendered] == [
+        "template_a",
+        "template_b_purple",
+        "template_b_white",
+    ]
+    for variant in variants:
+        assert get_variant_path(tmp_path, variant).exists()
+
+    manifest = json.loads((tmp_path / "variants.json").read_text())
+    assert manifest["source"] == str(selected_path)
+    assert [entry["theme"] for entry in manifest["variants"]] == [None, "purple", "white"]
+    assert all(entry["size_bytes"] > 0 for entry in manifest["variants"])
+
+
+def test_theme_override_changes_output(tmp_path):
+    selected_path = tmp_path / "selected.jpg"
+    Image.new("RGB", (640, 360), (90, 120, 60)).save(selected_path)
+    variants = [ThumbnailVariant("template_b", "blue"), ThumbnailVariant("template_b", "white")]
+
+    render_variants(selected_path, make_metadata(), variants, tmp_path)
+
+    with Image.open(get_variant_path(tmp_path, variants[0])) as blue, Image.open(
+        get_variant_path(tmp_path, variants[1])
+    ) as white:
+        assert blue.getpixel((10, 10)) != white.getpixel((10, 10))
+
+
+def test_render_variants_with_no_variants_renders_nothing(tmp_path):
+    selected_path = tmp_path / "selected.jpg"
+    Image.new("RGB", (640, 360), (90, 120, 60)).save(selected_path)
+
+    assert render_variants(selected_path, make_metadata(), [], tmp_path) == []
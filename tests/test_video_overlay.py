@@ -1,10 +1,12 @@
 import subprocess
 from pathlib import Path
+from contextlib import nullcontext
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from video_overlay import _run_ffmpeg_overlay, add_video_overlays
+from ffmpeg_progress import FfmpegProgress, FfmpegStalledError
+from video_overlay import _run_ffmpeg_overlay, add_video_overlays, build_overlay_command
 
 
 def _make_result(returncode=0):
@@ -13,52 +15,67 @@ def _make_result(returncode=0):
     return r
 
 
-class TestRunFfmpegOverlay:
+class TestBuildOverlayCommand:
     def test_logo_added_as_input_with_thanks(self):
-        with patch("subprocess.run", return_value=_make_result()) as mock_run:
-            _run_ffmpeg_overlay(
-                "video.mp4", "cafe.png", "thanks.png", 60.0,
-                "out.mov", use_hardware=False,
-                logo_path="logo.png", logo_size=192,
-            )
-            cmd = mock_run.call_args[0][0]
-            assert "logo.png" in cmd
-            assert cmd.index("logo.png") > cmd.index("thanks.png")
+        cmd = build_overlay_command(
+            "video.mp4", "cafe.png", "thanks.png", 60.0,
+            "out.mov", use_hardware=False,
+            logo_path="logo.png",
+        )
+        assert "logo.png" in cmd
+        assert cmd.index("logo.png") > cmd.index("thanks.png")
 
     def test_logo_added_as_input_without_thanks(self):
-        with patch("subprocess.run", return_value=_make_result()) as mock_run:
-            _run_ffmpeg_overlay(
-                "video.mp4", "cafe.png", None, 60.0,
-                "out.mov", use_hardware=False,
-                logo_path="logo.png", logo_size=192,
-            )
-            cmd = mock_run.call_args[0][0]
-            assert "logo.png" in cmd
-
-    def test_filter_complex_contains_logo_scale_and_overlay(self):
-        with patch("subprocess.run", return_value=_make_result()) as mock_run:
-            _run_ffmpeg_overlay(
-                "video.mp4", "cafe.png", "thanks.png", 60.0,
-                "out.mov", use_hardware=False,
-                logo_path="logo.png", logo_size=192,
-            )
-            cmd = mock_run.call_args[0][0]
-            fc = cmd[cmd.index("-filter_complex") + 1]
-            assert "scale=192:-1" in fc
-            assert "format=rgba" in fc
-            assert "main_w-overlay_w-20" in fc
-            assert "y=20" in fc
+        cmd = build_overlay_command(
+            "video.mp4", "cafe.png", None, 60.0,
+            "out.mov", use_hardware=False,
+            logo_path="logo.png",
+        )
+        assert "logo.png" in cmd
+
+    def test_filter_complex_overlays_prescaled_logo_without_scale(self):
+        cmd = build_overlay_command(
+            "video.mp4", "cafe.png", "thanks.png", 60.0,
+            "out.mov", use_hardware=False,
+            logo_path="logo.png",
+        )
+        fc = cmd[cmd.index("-filter_complex") + 1]
+        assert "scale=" not in fc
+        assert "[v2][3:v]overlay" in fc
+        assert "main_w-overlay_w-20" in fc
+        assert "y=20" in fc
 
     def test_no_logo_omits_logo_from_filter(self):
-        with patch("subprocess.run", return_value=_make_result()) as mock_run:
-            _run_ffmpeg_overlay(
+        cmd = build_overlay_command(
+            "video.mp4", "cafe.png", None, 60.0,
+            "out.mov", use_hardware=False,
+        )
+        fc = cmd[cmd.index("-filter_complex") + 1]
+        assert "scale=" not in fc
+        assert "format=rgba" not in fc
+
+
+class TestRunFfmpegOverlay:
+    def test_streams_progress_to_callback(self):
+        progress = FfmpegProgress(30.0, 900, 60.0, 2.0, 50.0, 15.0, False)
+
+        def fake_run(cmd, duration, on_progress, stall_timeout):
+            on_progress(progress)
+            return _make_result()
+
+        updates = []
+        with patch("video_overlay.run_ffmpeg_with_progress", side_effect=fake_run) as mock_run:
+            result = _run_ffmpeg_overlay(
                 "video.mp4", "cafe.png", None, 60.0,
-                "out.mov", use_hardware=False,
+                "out.mov", 60.0, use_hardware=False,
+                progress_callback=updates.append,
             )
-            cmd = mock_run.call_args[0][0]
-            fc = cmd[cmd.index("-filter_complex") + 1]
-            assert "scale=" not in fc
-            assert "format=rgba" not in fc
+
+        assert result.returncode == 0
+        assert updates == [progress]
+        cmd, duration = mock_run.call_args[0][:2]
+        assert cmd[0] == "ffmpeg"
+        assert duration == 60.0
 
 
 class TestAddVideoOverlaysIdempotency:
@@ -78,3 +95,26 @@ class TestAddVideoOverlaysIdempotency:
 
         mock_ffmpeg.assert_not_called()
         assert result == str(processed)
+
+
+class TestAddVideoOverlaysFallback:
+    def test_stalled_hardware_encode_falls_back_to_libx264(self, tmp_path):
+        video = tmp_path / "match.mp4"
+        video.write_bytes(b"video")
+        output = tmp_path / "out.mov"
+
+        def fake_overlay(*args, use_hardware, **kwargs):
+            if use_hardware:
+                raise FfmpegStalledError("ffmpeg made no progress for 90s")
+            Path(args[4]).write_bytes(b"encoded")
+            return _make_result()
+
+        with patch("video_overlay.get_video_dimensions", return_value=(320, 180)), \
+             patch("video_overlay._get_video_duration", return_value=10.0), \
+             patch("video_overlay.disk_space_reservation", return_value=nullcontext()), \
+             patch("video_overlay._run_ffmpeg_overlay", side_effect=fake_overlay) as mock_ffmpeg:
+            result = add_video_overlays(str(video), str(output))
+
+        assert [c.kwargs["use_hardware"] for c in mock_ffmpeg.call_args_list] == [True, False]
+        assert result == str(output)
+        assert output.read_bytes() == b"encoded"
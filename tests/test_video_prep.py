@@ -39,6 +39,10 @@ from video_prep import (
             "ms_LeovsKhanh_Summer Cup 2024",
             ("Summer Cup 2024", "Men's Singles", ["Leo"], ["Khanh"]),
         ),
+        (
+            "ms_LeovsKhanh_@p1_Summer Cup 2024_@due20241220",
+            ("Summer Cup 2024", "Men's Singles", ["Leo"], ["Khanh"]),
+        ),
     ],
 )
 def test_parse_filename_valid(filename, expected):
@@ -0,0 +1,117 @@
+import struct
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+from watcher import (
+    FileSnapshot,
+    PendingFile,
+    parse_inotify_events,
+    split_settled,
+    update_pending,
+    watch_videos,
+)
+
+
+def test_update_pending_resets_timer_when_file_grows():
+    path = Path("match.mov")
+    pending = update_pending({}, path, FileSnapshot(size=10, mtime_ns=1), now=0.0)
+    pending = update_pending(pending, path, FileSnapshot(size=20, mtime_ns=2), now=5.0)
+
+    assert pending[path].stable_since == 5.0
+
+
+def test_update_pending_keeps_timer_when_unchanged():
+    path = Path("match.mov")
+    snapshot = FileSnapshot(size=10, mtime_ns=1)
+    pending = update_pending({}, path, snapshot, now=0.0)
+    pending = update_pending(pending, path, snapshot, now=5.0)
+
+    assert pending[path].stable_since == 0.0
+
+
+def test_update_pending_drops_deleted_file():
+    path = Path("match.mov")
+    pending = {path: PendingFile(FileSnapshot(size=10, mtime_ns=1), stable_since=0.0)}
+
+    assert update_pending(pending, path, None, now=1.0) == {}
+
+
+def test_split_settled_waits_for_settle_window():
+    stable = Path("stable.mov")
+    copying = Path("copying.mov")
+    empty = Path("empty.mov")
+    pending = {
+        stable: PendingFile(FileSnapshot(size=10, mtime_ns=1), stable_since=0.0),
+        copying: PendingFile(FileSnapshot(size=10, mtime_ns=1), stable_since=8.0),
+        empty: PendingFile(FileSnapshot(size=0, mtime_ns=1), stable_since=0.0),
+    }
+
+    settled, remaining = split_settled(pending, now=10.0, settle_seconds=5.0)
+
+    assert settled == [stable]
+    assert set(remaining) == {copying, empty}
+
+
+def test_parse_inotify_events_extracts_padded_names():
+    name = b"match.mov\0\0\0\0\0\0\0"
+    buffer = struct.pack("iIII", 1, 0x8, 0, len(name)) + name
+
+    assert parse_inotify_events(buffer) == ["match.mov"]
+
+
+class FakeChangeSource:
+    def __init__(self, paths, stop_event, max_waits=3):
+        self.paths = paths
+        self.stop_event = stop_event
+        self.max_waits = max_waits
+        self.waits = 0
+
+    def wait(self, timeout):
+        self.waits += 1
+        if self.waits >= self.max_waits:
+            self.stop_event.set()
+        return self.paths
+
+    def close(self):
+        pass
+
+
+def test_watch_videos_dispatches_each_stable_video_once(tmp_path):
+    video = tmp_path / "ms_LeovsKhanh.mov"
+    video.write_bytes(b"video")
+    notes = tmp_path / "notes.txt"
+    notes.write_bytes(b"ignored")
+
+    stop_event = threading.Event()
+    source = FakeChangeSource([video, notes], stop_event)
+    ready = []
+
+    def on_ready(path):
+        ready.append(path)
+        return True
+
+    with patch("watcher.open_change_source", return_value=source):
+        watch_videos(tmp_path, on_ready, stop_event, settle_seconds=0.0, poll_interval=0.0)
+
+    assert ready == [video]
+
+
+def test_watch_videos_retries_video_whose_start_failed(tmp_path):
+    video = tmp_path / "ms_LeovsKhanh.mov"
+    video.write_bytes(b"video")
+
+    stop_event = threading.Event()
+    source = FakeChangeSource([], stop_event, max_waits=4)
+    attempts = []
+
+    def on_ready(path):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise RuntimeError("temporal unavailable")
+        return True
+
+    with patch("watcher.open_change_source", return_value=source):
+        watch_videos(tmp_path, on_ready, stop_event, settle_seconds=0.0, poll_interval=0.0)
+
+    assert attempts == [video, video]
@@ -0,0 +1,136 @@
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from web_selector import frames
+from web_selector import server as server_module
+from web_selector.frames import FrameExtractionError, extract_frame_jpeg, get_frame
+from web_selector.server import ThumbnailSelectorServer
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "ms_LeovsKhanh.mov"
+    path.write_bytes(b"video")
+    return path
+
+
+@pytest.fixture
+def server(video_path):
+    return ThumbnailSelectorServer(video_path)
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+def _ffmpeg_result(stdout=b"\xff\xd8jpeg", returncode=0):
+    result = MagicMock(spec=subprocess.CompletedProcess)
+    result.returncode = returncode
+    result.stdout = stdout
+    result.stderr = b"error"
+    return result
+
+
+def test_extract_frame_seeks_before_input(video_path):
+    with patch("subprocess.run", return_value=_ffmpeg_result()) as mock_run:
+        assert extract_frame_jpeg(video_path, 12.5) == b"\xff\xd8jpeg"
+
+    cmd = mock_run.call_args[0][0]
+    assert cmd.index("-ss") < cmd.index("-i")
+    assert cmd[cmd.index("-ss") + 1] == "12.500"
+    assert "-vf" not in cmd
+
+
+def test_extract_frame_raises_on_ffmpeg_failure(video_path):
+    with patch("subprocess.run", return_value=_ffmpeg_result(b"", returncode=1)):
+        with pytest.raises(FrameExtractionError):
+            extract_frame_jpeg(video_path, 1.0)
+
+
+def test_get_frame_is_cached_per_timestamp_and_width(video_path):
+    frames._get_cached_frame.cache_clear()
+    with patch("subprocess.run", return_value=_ffmpeg_result()) as mock_run:
+        get_frame(video_path, 3.0001)
+        get_frame(video_path, 3.0)
+        get_frame(video_path, 3.0, max_width=640)
+
+    assert mock_run.call_count == 2
+
+
+def test_frame_endpoint_returns_jpeg(client):
+    with patch("web_selector.routes.get_frame", return_value=b"\xff\xd8jpeg") as mock_frame:
+        response = client.get("/frame?t=4.25&w=1280")
+
+    assert response.status_code == 200
+    assert response.mimetype == "image/jpeg"
+    assert response.data == b"\xff\xd8jpeg"
+    assert mock_frame.call_args[0][1:] == (4.25, 1280)
+
+
+@pytest.mark.parametrize("query", ["", "?t=abc", "?t=-1", "?t=nan"])
+def test_frame_endpoint_rejects_invalid_timestamp(client, query):
+    assert client.get(f"/frame{query}").status_code == 400
+
+
+def test_info_endpoint_reports_unreadable_video_as_json(client):
+    error = subprocess.CalledProcessError(1, ["ffprobe"])
+    with patch("subprocess.run", side_effect=error):
+        response = client.get("/info")
+
+    assert response.status_code == 502
+    assert response.get_json() == {"error": "Could not read video duration"}
+
+    with patch("subprocess.run", return_value=_ffmpeg_result(b'{"format": {}}')):
+        assert client.get("/info").status_code == 502
+
+
+def test_select_records_timestamp_only(client, server):
+    with patch("web_selector.routes.probe_duration", return_value=60.0):
+        response = client.post("/select?t=17.5")
+
+    assert response.status_code == 200
+    assert server.wait_for_selection(timeout=0) == 17.5
+
+
+def test_select_rejects_timestamp_past_end_of_video(client, server):
+    with patch("web_selector.routes.probe_duration", return_value=60.0):
+        response = client.post("/select?t=75")
+
+    assert response.status_code == 400
+    assert not server.selection_event.is_set()
+
+
+def test_save_selected_thumbnail_activity_fails_without_retry(video_path):
+    from temporalio.exceptions import ApplicationError
+
+    from temporal.activities import save_selected_thumbnail_activity
+
+    error = FrameExtractionError("no frame at 75.000s")
+    with patch("temporal.activities.save_frame_as_selected", side_effect=error):
+        with pytest.raises(ApplicationError) as exc_info:
+            save_selected_thumbnail_activity(str(video_path), 75.0)
+
+    assert exc_info.value.non_retryable
+    assert exc_info.value.type == "FrameExtractionError"
+
+
+def test_select_thumbnail_web_saves_native_frame(video_path, tmp_path):
+    selected_path = tmp_path / "selected.jpg"
+
+    def fake_start(self):
+        self.selected_timestamp = 9.0
+        self.selection_event.set()
+
+    with (
+        patch.object(ThumbnailSelectorServer, "start", fake_start),
+        patch.object(server_module, "get_frame", return_value=b"native") as mock_frame,
+        patch.object(server_module, "get_selected_candidate_path", return_value=selected_path),
+        patch.object(server_module.state_store, "record_stage"),
+    ):
+        server_module.select_thumbnail_web(video_path)
+
+    mock_frame.assert_called_once_with(video_path.resolve(), 9.0)
+    assert selected_path.read_bytes() == b"native"
@@ -0,0 +1,75 @@
+import subprocess
+from unittest.mock import MagicMock, patch
+
+from web_selector.server import ThumbnailSelectorServer
+from web_selector.sprites import (
+    SpriteLayout,
+    build_sprite_command,
+    build_vtt,
+    generate_sprites,
+    get_vtt_path,
+)
+
+
+def test_build_vtt_maps_tiles_across_sheets():
+    layout = SpriteLayout(interval=2.0, tile_width=160, tile_height=90, columns=2, rows=2)
+
+    vtt = build_vtt(9.0, layout)
+    cues = vtt.split("\n\n")[1:]
+
+    assert vtt.startswith("WEBVTT")
+    assert cues[0] == "00:00:00.000 --> 00:00:02.000\nsprite_001.jpg#xywh=0,0,160,90"
+    assert cues[3] == "00:00:06.000 --> 00:00:08.000\nsprite_001.jpg#xywh=160,90,160,90"
+    assert cues[4].startswith("00:00:08.000 --> 00:00:09.000\nsprite_002.jpg#xywh=0,0,")
+
+
+def test_sprite_command_is_single_keyframe_pass(tmp_path):
+    cmd = build_sprite_command(tmp_path / "a.mov", tmp_path, SpriteLayout())
+
+    assert cmd.count("-i") == 1
+    assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+    video_filter = cmd[cmd.index("-vf") + 1]
+    assert video_filter.startswith("fps=1/2.0,")
+    assert "tile=10x10" in video_filter
+
+
+def _fake_ffmpeg(cmd, capture_output):
+    output_pattern = cmd[-1]
+    for index in (1, 2):
+        with open(output_pattern % index, "wb") as f:
+            f.write(b"jpeg")
+    result = MagicMock(spec=subprocess.CompletedProcess)
+    result.returncode = 0
+    return result
+
+
+def test_generate_sprites_caches_in_workspace(tmp_path):
+    workspace = tmp_path / "ms_LeovsKhanh"
+
+    with patch("subprocess.run", side_effect=_fake_ffmpeg) as mock_run:
+        vtt_path = generate_sprites(tmp_path / "a.mov", workspace, 300.0, SpriteLayout())
+        generate_sprites(tmp_path / "a.mov", workspace, 300.0, SpriteLayout())
+
+    assert mock_run.call_count == 1
+    assert vtt_path == get_vtt_path(workspace)
+    assert (workspace / "sprites" / "sprite_002.jpg").read_bytes() == b"jpeg"
+    assert not list(workspace.glob(".sprites-*"))
+
+
+def test_server_serves_sprite_status_and_sheets(tmp_path):
+    video_path = tmp_path / "a.mov"
+    video_path.write_bytes(b"video")
+    workspace = tmp_path / "a"
+    server = ThumbnailSelectorServer(video_path, workspace_dir=workspace)
+    client = server.app.test_client()
+
+    assert client.get("/sprites/status").get_json()["ready"] is False
+
+    with patch("subprocess.run", side_effect=_fake_ffmpeg):
+        generate_sprites(video_path, workspace, 10.0, SpriteLayout())
+
+    status = client.get("/sprites/status").get_json()
+    assert status["ready"] is True
+    assert status["tile_width"] == 160
+    assert client.get("/sprites/sprite_001.jpg").data == b"jpeg"
+    assert client.get("/sprites/../../a.mov").status_code == 404
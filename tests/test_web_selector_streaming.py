@@ -0,0 +1,153 @@
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from web_selector.server import ThumbnailSelectorServer
+from web_selector.streaming import (
+    ByteRange,
+    RangeNotSatisfiableError,
+    range_response,
+    generate_proxy,
+    get_proxy_path,
+    iter_file_range,
+    parse_range_header,
+)
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def server(tmp_path):
+    video_path = tmp_path / "ms_LeovsKhanh.mov"
+    video_path.write_bytes(CONTENT)
+    return ThumbnailSelectorServer(video_path, workspace_dir=tmp_path / "ms_LeovsKhanh")
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", ByteRange(0, 99)),
+        ("bytes=100-", ByteRange(100, 999)),
+        ("bytes=-100", ByteRange(900, 999)),
+        ("bytes=900-5000", ByteRange(900, 999)),
+        ("bytes=0-1,5-6", None),
+    ],
+)
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=50-10", "bytes=-0"])
+def test_parse_range_header_rejects_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header(header, 1000)
+
+
+def test_iter_file_range_reads_in_chunks(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(CONTENT)
+
+    chunks = list(iter_file_range(path, 10, 2500, chunk_size=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert b"".join(chunks) == CONTENT[10:2510]
+
+
+def test_video_serves_partial_content(client):
+    response = client.get("/video", headers={"Range": "bytes=1000-1999"})
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 1000-1999/{len(CONTENT)}"
+    assert response.headers["Content-Length"] == "1000"
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.data == CONTENT[1000:2000]
+
+
+def test_video_without_range_serves_whole_file(client):
+    response = client.get("/video")
+
+    assert response.status_code == 200
+    assert response.mimetype == "video/quicktime"
+    assert response.data == CONTENT
+
+
+def test_video_unsatisfiable_range(client):
+    response = client.get("/video", headers={"Range": f"bytes={len(CONTENT)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_empty_file_serves_empty_body_or_416(tmp_path, server):
+    path = tmp_path / "empty.mov"
+    path.write_bytes(b"")
+
+    with server.app.test_request_context():
+        whole = range_response(path, None)
+        suffix = range_response(path, "bytes=-100")
+
+    assert whole.status_code == 200
+    assert whole.headers["Content-Length"] == "0"
+    assert suffix.status_code == 416
+    assert suffix.headers["Content-Range"] == "bytes */0"
+
+
+def _fake_ffmpeg(cmd, capture_output):
+    with open(cmd[-1], "wb") as f:
+        f.write(b"proxy-bytes")
+    result = MagicMock(spec=subprocess.CompletedProcess)
+    result.returncode = 0
+    return result
+
+
+def test_proxy_generated_on_demand_then_streamed(client, server):
+    with patch("subprocess.run", side_effect=_fake_ffmpeg) as mock_run:
+        first = client.get("/proxy")
+        server.proxy.join(timeout=5)
+        second = client.get("/proxy", headers={"Range": "bytes=0-4"})
+
+    assert first.status_code == 202
+    assert mock_run.call_count == 1
+    assert second.status_code == 206
+    assert second.mimetype == "video/mp4"
+    assert second.data == b"proxy"
+    assert client.get("/proxy/status").get_json()["ready"] is True
+
+
+def test_generate_proxy_is_cached(tmp_path):
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    with patch("subprocess.run", side_effect=_fake_ffmpeg) as mock_run:
+        generate_proxy(tmp_path / "a.mov", workspace)
+        generate_proxy(tmp_path / "a.mov", workspace)
+
+    assert mock_run.call_count == 1
+    assert get_proxy_path(workspace).read_bytes() == b"proxy-bytes"
+    cmd = mock_run.call_args[0][0]
+    assert cmd[cmd.index("-c:v") + 1] == "libx264"
+    assert "+faststart" in cmd
+
+
+def test_failed_proxy_is_retried_on_next_request(client, server):
+    failed = MagicMock(spec=subprocess.CompletedProcess, returncode=1, stderr=b"boom")
+    with patch("subprocess.run", return_value=failed):
+        client.get("/proxy")
+        server.proxy.join(timeout=5)
+    assert client.get("/proxy/status").get_json()["error"]
+
+    with patch("subprocess.run", side_effect=_fake_ffmpeg):
+        retry = client.get("/proxy")
+        server.proxy.join(timeout=5)
+
+    assert retry.status_code == 202
+    assert retry.get_json()["error"] is None
+    assert client.get("/proxy/status").get_json() == {
+        "ready": True, "generating": False, "error": None,
+    }
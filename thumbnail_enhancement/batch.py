@@ -0,0 +1,185 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import asset_cache
+import atomic_io
+import state_store
+import utils
+from fingerprint import get_fingerprint
+from logger import get_logger
+from schemas import UploadedRecord
+from thumbnail_enhancement import common
+from thumbnail_enhancement.renderer import get_template_module
+
+logger = get_logger(__name__)
+
+PRELOAD_FRAME_SIZES = ((1920, 1080), (3840, 2160))
+
+
+@dataclass(frozen=True)
+class RerenderJob:
+    workspace_dir: Path
+    template_name: str
+    output_path: Path
+
+
+@dataclass(frozen=True)
+class RerenderResult:
+    workspace_dir: Path
+    output_path: Path | None
+    error: str | None = None
+    # The same version was already rendered by an earlier run.
+    skipped: bool = False
+
+
+def make_version() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def get_versioned_thumbnail_path(workspace_dir: Path, version: str) -> Path:
+    return workspace_dir / f"thumbnail.{version}.jpg"
+
+
+def find_rerender_workspaces(completed_dir: Path) -> list[Path]:
+    return sorted(
+        workspace_dir
+        for workspace_dir in completed_dir.iterdir()
+        if workspace_dir.is_dir()
+        and (workspace_dir / utils.METADATA_FILE).exists()
+        and (workspace_dir / utils.SELECTED_CANDIDATE_NAME).exists()
+    )
+
+
+def find_archived_video(workspace_dir: Path) -> Path | None:
+    for extension in sorted(utils.SUPPORTED_VIDEO_EXTENSIONS):
+        video_path = workspace_dir.parent / f"{workspace_dir.name}{extension}"
+        if video_path.is_file():
+            return video_path
+    return None
+
+
+def load_archived_upload_record(workspace_dir: Path) -> UploadedRecord | None:
+    video_path = find_archived_video(workspace_dir)
+    if video_path:
+        fingerprint = get_fingerprint(video_path, workspace_dir)
+        with state_store.open_store() as conn:
+            record = state_store.get_upload(conn, fingerprint)
+        if record:
+            return record
+    return utils.read_upload_record_file(workspace_dir / utils.UPLOADED_FILE)
+
+
+def preload_render_assets(template_name: str) -> None:
+    """Warms the per-process font, logo and vignette caches before the first job."""
+    template = get_template_module(template_name)
+    for width, height in PRELOAD_FRAME_SIZES:
+        for size in template.preload_font_sizes(width, height):
+            template.get_font(size)
+        common.get_vignette_multiplier(width, height)
+        if common.LOGO_PATH.exists():
+            asset_cache.get_resized_logo(
+                common.LOGO_PATH, int(width * common.LOGO_WIDTH_RATIO)
+            )
+
+
+def render_job(job: RerenderJob) -> RerenderResult:
+    if atomic_io.verify_artifact(job.output_path):
+        return RerenderResult(job.workspace_dir, job.output_path, skipped=True)
+
+    try:
+        metadata = utils.read_metadata_file(job.workspace_dir / utils.METADATA_FILE)
+        selected_path = job.workspace_dir / utils.SELECTED_CANDIDATE_NAME
+        template = get_template_module(job.template_name)
+        template.render_to_path(selected_path, metadata, job.output_path)
+    except Exception as e:
+        return RerenderResult(job.workspace_dir, None, f"{type(e).__name__}: {e}")
+    return RerenderResult(job.workspace_dir, job.output_path)
+
+
+def rerender_workspaces(
+    workspace_dirs: list[Path],
+    template_name: str,
+    version: str,
+    max_workers: int | None = None,
+) -> Iterator[RerenderResult]:
+    jobs = [
+        RerenderJob(
+            workspace_dir=workspace_dir,
+            template_name=template_name,
+            output_path=get_versioned_thumbnail_path(workspace_dir, version),
+        )
+        for workspace_dir in workspace_dirs
+    ]
+    # forkserver: the parent already runs the logging thread, and forking a
+    # threaded process can deadlock the children.
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=preload_render_assets,
+        initargs=(template_name,),
+    ) as executor:
+        futures = [executor.submit(render_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        # A rate of zero or below disables the limit.
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        now = self._clock()
+        if now < self._next_at:
+            self._sleep(self._next_at - now)
+            now = self._next_at
+        self._next_at = now + self._interval
+
+
+class ThumbnailPushQueue:
+    """Pushes rendered thumbnails from a background thread while rendering continues."""
+
+    def __init__(
+        self, push: Callable[[str, Path], None], limiter: RateLimiter
+    ):
+        self._push = push
+        self._limiter = limiter
+        self._queue: queue.Queue[tuple[str, Path] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.pushed = 0
+        self.failed = 0
+        self._thread.start()
+
+    def submit(self, video_id: str, thumbnail_path: Path) -> None:
+        self._queue.put((video_id, thumbnail_path))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            video_id, thumbnail_path = item
+            self._limiter.acquire()
+            try:
+                self._push(video_id, thumbnail_path)
+                self.pushed += 1
+                logger.info(f"Pushed thumbnail {thumbnail_path.name} to video {video_id}")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to push thumbnail for video {video_id}: {e}")
@@ -1,16 +1,22 @@
+import functools
 from pathlib import Path
 
+import cv2
 import numpy as np
-from PIL import Image, ImageEnhance
+from PIL import Image
+import atomic_io
+from asset_cache import get_resized_logo
+from constants import THUMBNAIL_THEMES
 from logger import get_logger
+from thumbnail_enhancement.jpeg_encoder import encode_under_budget
 
 logger = get_logger(__name__)
 
 LOGO_PATH = Path("assets/logo.png")
+LOGO_WIDTH_RATIO = 0.10
 
-STYLE_BLUE = "blue"
-STYLE_PURPLE = "purple"
-STYLE_WHITE = "white"
+THEMES = THUMBNAIL_THEMES
+STYLE_BLUE, STYLE_PURPLE, STYLE_WHITE = THEMES
 
 RECOGNIZED_TOURNAMENTS = {
     "cafe game": STYLE_BLUE,
@@ -43,36 +49,65 @@ def format_matchup_text(team1_names: list[str], team2_names: list[str]) -> str:
     return f"{team1} vs {team2}"
 
 
-def enhance_image_visuals(img_pil: Image.Image) -> Image.Image:
-    enhancer_color = ImageEnhance.Color(img_pil)
-    img_pil = enhancer_color.enhance(1.5)
-
-    enhancer_contrast = ImageEnhance.Contrast(img_pil)
-    img_pil = enhancer_contrast.enhance(1.05)
+COLOR_FACTOR = 1.5
+CONTRAST_FACTOR = 1.05
+BRIGHTNESS_FACTOR = 1.15
+VIGNETTE_START_RADIUS = 0.65
+VIGNETTE_INTENSITY = 140
 
-    enhancer_brightness = ImageEnhance.Brightness(img_pil)
-    img_pil = enhancer_brightness.enhance(1.15)
-
-    img_pil = img_pil.convert("RGBA")
-    width, height = img_pil.size
 
+@functools.lru_cache(maxsize=8)
+def get_vignette_mask(width: int, height: int) -> np.ndarray:
     x = np.linspace(-1, 1, width)
     y = np.linspace(-1, 1, height)
     X, Y = np.meshgrid(x, y)
 
     radius = np.sqrt(X**2 + Y**2)
+    mask = np.clip(radius - VIGNETTE_START_RADIUS, 0, 1)
+    alpha = (mask * VIGNETTE_INTENSITY).astype(np.uint8)
+    alpha.flags.writeable = False
+    return alpha
+
 
-    mask = np.clip(radius - 0.65, 0, 1)
+@functools.lru_cache(maxsize=8)
+def get_vignette_multiplier(width: int, height: int) -> np.ndarray:
+    """Per-pixel 255 - alpha, replicated over RGB for a single saturating multiply."""
+    alpha = get_vignette_mask(width, height)
+    multiplier = cv2.cvtColor(255 - alpha, cv2.COLOR_GRAY2RGB)
+    multiplier.flags.writeable = False
+    return multiplier
 
-    vignette_intensity = 140
-    alpha_channel = (mask * vignette_intensity).astype(np.uint8)
 
-    black_layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    black_layer.putalpha(Image.fromarray(alpha_channel, mode="L"))
+def build_tone_lut(mean_luma: int) -> np.ndarray:
+    # Contrast then brightness as one 256-entry table, truncating after each
+    # step the way PIL's Image.blend does.
+    values = np.arange(256, dtype=np.float32)
+    values = np.floor(np.clip(mean_luma + CONTRAST_FACTOR * (values - mean_luma), 0, 255))
+    values = np.floor(np.clip(values * BRIGHTNESS_FACTOR, 0, 255))
+    return values.astype(np.uint8)
 
-    final_img = Image.alpha_composite(img_pil, black_layer)
 
-    return final_img.convert("RGB")
+def enhance_rgb_array(rgb: np.ndarray) -> np.ndarray:
+    """Same look as the former ImageEnhance Color/Contrast/Brightness + vignette
+    composite chain (within a few levels), without intermediate PIL images."""
+    height, width, _ = rgb.shape
+
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    # gamma=-0.5 turns OpenCV's rounding into the truncation PIL applies.
+    saturated = cv2.addWeighted(
+        rgb, COLOR_FACTOR, cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB), 1 - COLOR_FACTOR, -0.5
+    )
+
+    # ImageEnhance.Contrast pivots on the rounded mean luma of its input.
+    mean_luma = int(cv2.cvtColor(saturated, cv2.COLOR_RGB2GRAY).mean() + 0.5)
+    toned = cv2.LUT(saturated, build_tone_lut(mean_luma))
+
+    return cv2.multiply(toned, get_vignette_multiplier(width, height), scale=1 / 255)
+
+
+def enhance_image_visuals(img_pil: Image.Image) -> Image.Image:
+    rgb = np.asarray(img_pil.convert("RGB"))
+    return Image.fromarray(enhance_rgb_array(rgb))
 
 
 def add_logo(img_pil: Image.Image, logo_path: Path) -> Image.Image:
@@ -81,13 +116,8 @@ def add_logo(img_pil: Image.Image, logo_path: Path) -> Image.Image:
         return img_pil
 
     img_pil = img_pil.convert("RGBA")
-    logo = Image.open(logo_path).convert("RGBA")
-
-    target_width = int(img_pil.width * 0.10)
-    aspect_ratio = logo.height / logo.width
-    target_height = int(target_width * aspect_ratio)
-
-    logo = logo.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    target_width = int(img_pil.width * LOGO_WIDTH_RATIO)
+    logo = get_resized_logo(logo_path, target_width)
 
     padding = int(img_pil.width * 0.03)
     x = img_pil.width - target_width - padding
@@ -96,3 +126,21 @@ def add_logo(img_pil: Image.Image, logo_path: Path) -> Image.Image:
     img_pil.paste(logo, (x, y), logo)
 
     return img_pil.convert("RGB")
+
+
+def load_enhanced_source(selected_path: Path) -> Image.Image:
+    with Image.open(selected_path) as img:
+        return enhance_image_visuals(img.convert("RGB"))
+
+
+def save_thumbnail(
+    img: Image.Image, output_path: Path, cache_key: str | None = None
+) -> str:
+    encoded = encode_under_budget(img, cache_key=cache_key)
+    atomic_io.atomic_write_bytes(output_path, encoded.data)
+    atomic_io.write_integrity_sidecar(output_path)
+    logger.info(
+        f"Saved {output_path.name}: {len(encoded.data) / 1024:.0f} KB, "
+        f"quality {encoded.quality}, {encoded.size[0]}x{encoded.size[1]}"
+    )
+    return str(output_path)
@@ -0,0 +1,93 @@
+import io
+import threading
+from dataclasses import dataclass
+
+from PIL import Image
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+YOUTUBE_THUMBNAIL_MAX_BYTES = 2 * 1024 * 1024
+MAX_QUALITY = 95
+MIN_QUALITY = 40
+DOWNSCALE_STEP = 0.85
+
+_quality_hints: dict[str, int] = {}
+_quality_hints_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class EncodedJpeg:
+    data: bytes
+    quality: int
+    size: tuple[int, int]
+
+
+def encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    img.convert("RGB").save(
+        buffer, format="JPEG", quality=quality, optimize=True, progressive=True
+    )
+    return buffer.getvalue()
+
+
+def _search_quality(
+    img: Image.Image, max_bytes: int, low: int, high: int, hint: int | None
+) -> EncodedJpeg | None:
+    """Finds the highest quality in [low, high] whose encoding fits in max_bytes."""
+    best: EncodedJpeg | None = None
+
+    def probe(quality: int) -> bool:
+        nonlocal best
+        data = encode_jpeg(img, quality)
+        if len(data) > max_bytes:
+            return False
+        if best is None or quality > best.quality:
+            best = EncodedJpeg(data, quality, img.size)
+        return True
+
+    # Most frames fit at full quality; the per-template hint narrows the rest.
+    if probe(high):
+        return best
+    high -= 1
+    if hint is not None and low <= hint <= high:
+        if probe(hint):
+            low = hint + 1
+        else:
+            high = hint - 1
+
+    while low <= high:
+        mid = (low + high) // 2
+        if probe(mid):
+            low = mid + 1
+        else:
+            high = mid - 1
+    return best
+
+
+def encode_under_budget(
+    img: Image.Image,
+    max_bytes: int = YOUTUBE_THUMBNAIL_MAX_BYTES,
+    cache_key: str | None = None,
+    max_quality: int = MAX_QUALITY,
+    min_quality: int = MIN_QUALITY,
+) -> EncodedJpeg:
+    with _quality_hints_lock:
+        hint = _quality_hints.get(cache_key) if cache_key else None
+
+    encoded = _search_quality(img, max_bytes, min_quality, max_quality, hint)
+    while encoded is None:
+        # Not even the minimum quality fits: shrink the image until it does.
+        width, height = img.size
+        img = img.resize(
+            (int(width * DOWNSCALE_STEP), int(height * DOWNSCALE_STEP)),
+            Image.Resampling.LANCZOS,
+        )
+        logger.warning(f"JPEG over {max_bytes} bytes at quality {min_quality}, downscaling to {img.size}")
+        encoded = _search_quality(img, max_bytes, min_quality, max_quality, None)
+
+    if cache_key:
+        with _quality_hints_lock:
+            _quality_hints[cache_key] = encoded.quality
+    return encoded
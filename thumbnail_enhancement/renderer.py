@@ -2,6 +2,8 @@ from pathlib import Path
 
 from thumbnail_enhancement import template_a
 from thumbnail_enhancement import template_b
+import state_store
+from constants import DEFAULT_THUMBNAIL_TEMPLATE
 import utils
 from logger import get_logger
 
@@ -12,7 +14,7 @@ TEMPLATES = {
     "template_b": template_b,
 }
 
-DEFAULT_TEMPLATE = "template_b"
+DEFAULT_TEMPLATE = DEFAULT_THUMBNAIL_TEMPLATE
 
 
 def get_template_module(template_name: str):
@@ -27,9 +29,17 @@ def render_thumbnail(video_path: str, template_name: str = DEFAULT_TEMPLATE) ->
     path = Path(video_path)
 
     thumbnail_path = utils.get_thumbnail_path(path)
-    if thumbnail_path.exists():
+    if state_store.is_stage_complete(path, state_store.STAGE_THUMBNAIL, thumbnail_path):
         logger.info(f"Thumbnail already rendered, skipping: {thumbnail_path}")
         return str(thumbnail_path)
 
+    selected_path = utils.get_selected_candidate_path(path)
+    if selected_path.exists():
+        state_store.require_verified_artifact(
+            path, state_store.STAGE_SELECTED_THUMBNAIL, selected_path
+        )
+
     template_module = get_template_module(template_name)
-    return template_module.render_thumbnail(path)
+    rendered_path = template_module.render_thumbnail(path)
+    state_store.record_stage(path, state_store.STAGE_THUMBNAIL, Path(rendered_path))
+    return rendered_path
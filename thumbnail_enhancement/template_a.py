@@ -1,6 +1,8 @@
+import functools
+import zlib
 from pathlib import Path
 
-import random
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 from thumbnail_enhancement.common import (
@@ -9,12 +11,14 @@ from thumbnail_enhancement.common import (
     STYLE_PURPLE,
     STYLE_WHITE,
     add_logo,
-    enhance_image_visuals,
     format_matchup_text,
     get_theme_for_tournament,
+    load_enhanced_source,
+    save_thumbnail,
 )
 from utils import get_metadata, get_selected_candidate_path, get_thumbnail_path
 from logger import get_logger
+from schemas import MatchMetadata
 from custom_exceptions import MissingThumbnailDataError
 
 logger = get_logger(__name__)
@@ -38,82 +42,97 @@ BAR_STYLES = {
 }
 
 BAR_HEIGHT_RATIO = 0.18
+BAR_COLS = 10
+BAR_ROWS = 2
+BAR_JITTER = 0.3
+BAR_NOISE = 25
 
 FONT_PATH = Path("assets/Montserrat-ExtraBold.ttf")
 
 
-def draw_background_bar(
-    img_pil: Image.Image, style_name: str = STYLE_BLUE
-) -> Image.Image:
-    img_pil = img_pil.convert("RGBA")
-    width, height = img_pil.size
-
-    style = BAR_STYLES.get(style_name, BAR_STYLES[STYLE_BLUE])
-    color_start = style["start"]
-    color_end = style["end"]
-
-    bar_height = int(height * BAR_HEIGHT_RATIO)
-    bar_top_y = height - bar_height
+@functools.lru_cache(maxsize=256)
+def get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype(str(FONT_PATH), size)
+    except OSError:
+        logger.warning(f"Could not load font at {FONT_PATH}. Using default.")
+        return ImageFont.load_default()
 
-    cols = 10
-    rows = 2
-    cell_w = width / cols
-    cell_h = bar_height / rows
 
-    vertices = []
-    for r in range(rows + 1):
-        row_points = []
-        for c in range(cols + 1):
-            x = c * cell_w
-            y = r * cell_h
+def matchup_font_size(height: int) -> int:
+    return int(int(height * BAR_HEIGHT_RATIO) * 0.6)
 
-            if 0 < c < cols and 0 < r < rows:
-                x += random.uniform(-cell_w * 0.3, cell_w * 0.3)
-                y += random.uniform(-cell_h * 0.3, cell_h * 0.3)
 
-            row_points.append((x, y))
-        vertices.append(row_points)
+def badge_font_size(width: int) -> int:
+    return int(width * 0.04)
 
-    poly_bar = Image.new("RGBA", (width, bar_height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(poly_bar)
 
-    for r in range(rows):
-        for c in range(cols):
-            p1 = vertices[r][c]
-            p2 = vertices[r][c + 1]
-            p3 = vertices[r + 1][c + 1]
-            p4 = vertices[r + 1][c]
+def preload_font_sizes(width: int, height: int) -> set[int]:
+    """Starting font sizes for a frame; text that does not fit shrinks from there."""
+    return {matchup_font_size(height), badge_font_size(width)}
 
-            center_x = (p1[0] + p2[0]) / 2
-            t = center_x / width
 
-            red = int(color_start[0] * (1 - t) + color_end[0] * t)
-            green = int(color_start[1] * (1 - t) + color_end[1] * t)
-            blue = int(color_start[2] * (1 - t) + color_end[2] * t)
-            alpha = int(color_start[3] * (1 - t) + color_end[3] * t)
+def get_bar_seed(metadata: MatchMetadata) -> int:
+    return zlib.crc32(metadata.title.encode("utf-8"))
 
-            noise_intensity = 25
 
-            def get_faceted_color(r, g, b, a, noise):
-                n = random.randint(-noise, noise)
-                return (
-                    max(0, min(255, r + n)),
-                    max(0, min(255, g + n)),
-                    max(0, min(255, b + n)),
-                    a,
-                )
+@functools.lru_cache(maxsize=16)
+def render_facet_bar(
+    width: int, bar_height: int, style_name: str, seed: int
+) -> Image.Image:
+    """Rasterizes the low-poly gradient bar; identical inputs give identical pixels."""
+    style = BAR_STYLES.get(style_name, BAR_STYLES[STYLE_BLUE])
+    color_start = np.array(style["start"], dtype=np.float64)
+    color_end = np.array(style["end"], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    cell_w = width / BAR_COLS
+    cell_h = bar_height / BAR_ROWS
+
+    xs = np.arange(BAR_COLS + 1) * cell_w
+    ys = np.arange(BAR_ROWS + 1) * cell_h
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    interior = (slice(1, BAR_ROWS), slice(1, BAR_COLS))
+    jitter_shape = grid_x[interior].shape
+    grid_x[interior] += rng.uniform(-cell_w * BAR_JITTER, cell_w * BAR_JITTER, jitter_shape)
+    grid_y[interior] += rng.uniform(-cell_h * BAR_JITTER, cell_h * BAR_JITTER, jitter_shape)
+
+    # Each cell splits into two triangles sharing the gradient colour of its top edge.
+    t = (grid_x[:-1, :-1] + grid_x[:-1, 1:]) / 2 / width
+    base = color_start * (1 - t[..., np.newaxis]) + color_end * t[..., np.newaxis]
+    base = np.repeat(base.astype(np.int64).reshape(-1, 4), 2, axis=0)
+    noise = rng.integers(-BAR_NOISE, BAR_NOISE + 1, size=len(base))
+    palette = np.zeros((len(base) + 1, 4), dtype=np.uint8)
+    palette[1:, :3] = np.clip(base[:, :3] + noise[:, np.newaxis], 0, 255)
+    palette[1:, 3] = base[:, 3]
+
+    index_map = Image.new("L", (width, bar_height), 0)
+    draw = ImageDraw.Draw(index_map)
+    index = 1
+    for r in range(BAR_ROWS):
+        for c in range(BAR_COLS):
+            p1 = (grid_x[r, c], grid_y[r, c])
+            p2 = (grid_x[r, c + 1], grid_y[r, c + 1])
+            p3 = (grid_x[r + 1, c + 1], grid_y[r + 1, c + 1])
+            p4 = (grid_x[r + 1, c], grid_y[r + 1, c])
+            draw.polygon([p1, p2, p4], fill=index)
+            draw.polygon([p2, p3, p4], fill=index + 1)
+            index += 2
+
+    return Image.fromarray(palette[np.asarray(index_map)], mode="RGBA")
 
-            color1 = get_faceted_color(red, green, blue, alpha, noise_intensity)
-            color2 = get_faceted_color(red, green, blue, alpha, noise_intensity)
 
-            draw.polygon([p1, p2, p4], fill=color1)
-            draw.polygon([p2, p3, p4], fill=color2)
+def draw_background_bar(
+    img_pil: Image.Image, style_name: str = STYLE_BLUE, seed: int = 0
+) -> Image.Image:
+    img_pil = img_pil.convert("RGBA")
+    width, height = img_pil.size
 
-    overlay = Image.new("RGBA", img_pil.size, (0, 0, 0, 0))
-    overlay.paste(poly_bar, (0, bar_top_y))
-    final_img = Image.alpha_composite(img_pil, overlay)
+    bar_height = int(height * BAR_HEIGHT_RATIO)
+    bar = render_facet_bar(width, bar_height, style_name, seed)
+    img_pil.alpha_composite(bar, dest=(0, height - bar_height))
 
-    return final_img.convert("RGB")
+    return img_pil.convert("RGB")
 
 
 def draw_matchup_text(img_pil: Image.Image, text: str, style_name: str) -> Image.Image:
@@ -128,13 +147,9 @@ def draw_matchup_text(img_pil: Image.Image, text: str, style_name: str) -> Image
     center_y = height - (bar_height / 2)
     center_x = width / 2
 
-    font_size = int(bar_height * 0.6)
+    font_size = matchup_font_size(height)
 
-    try:
-        font = ImageFont.truetype(str(FONT_PATH), font_size)
-    except OSError:
-        logger.warning(f"Could not load font at {FONT_PATH}. Using default.")
-        font = ImageFont.load_default()
+    font = get_font(font_size)
 
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
@@ -143,10 +158,7 @@ def draw_matchup_text(img_pil: Image.Image, text: str, style_name: str) -> Image
 
     while text_width > max_width and font_size > 10:
         font_size -= 2
-        try:
-            font = ImageFont.truetype(str(FONT_PATH), font_size)
-        except OSError:
-            break
+        font = get_font(font_size)
         bbox = draw.textbbox((0, 0), text, font=font)
         text_width = bbox[2] - bbox[0]
 
@@ -176,12 +188,9 @@ def draw_tournament_badge(
     text_color = style["text_color"]
 
     padding = int(width * 0.03)
-    font_size = int(width * 0.04)
+    font_size = badge_font_size(width)
 
-    try:
-        font = ImageFont.truetype(str(FONT_PATH), font_size)
-    except OSError:
-        font = ImageFont.load_default()
+    font = get_font(font_size)
 
     text = tournament_name.upper()
 
@@ -234,6 +243,34 @@ def draw_tournament_badge(
     return img_pil.convert("RGB")
 
 
+def compose_from_enhanced(
+    enhanced: Image.Image, metadata: MatchMetadata, theme: str | None = None
+) -> Image.Image:
+    team_1_names = metadata.team1_names
+    team_2_names = metadata.team2_names
+    matchup_text = format_matchup_text(team_1_names, team_2_names)
+    tournament = metadata.tournament.strip()
+    decor_style = theme or get_theme_for_tournament(tournament)
+
+    img = draw_background_bar(enhanced, decor_style, get_bar_seed(metadata))
+    img = draw_matchup_text(img, matchup_text, decor_style)
+    img = add_logo(img, LOGO_PATH)
+    img = draw_tournament_badge(img, tournament, decor_style)
+    return img
+
+
+def compose_thumbnail(selected_path: Path, metadata: MatchMetadata) -> Image.Image:
+    return compose_from_enhanced(load_enhanced_source(selected_path), metadata)
+
+
+def render_to_path(
+    selected_path: Path, metadata: MatchMetadata, output_path: Path
+) -> str:
+    return save_thumbnail(
+        compose_thumbnail(selected_path, metadata), output_path, cache_key=__name__
+    )
+
+
 def render_thumbnail(video_path: Path) -> str:
     selected_path = get_selected_candidate_path(video_path)
     output_path = get_thumbnail_path(video_path)
@@ -244,18 +281,4 @@ def render_thumbnail(video_path: Path) -> str:
             f"Missing required data for {video_path.name} either selected thumbnail or metadata"
         )
 
-    team_1_names = metadata.team1_names
-    team_2_names = metadata.team2_names
-    matchup_text = format_matchup_text(team_1_names, team_2_names)
-    tournament = metadata.tournament.strip()
-    decor_style = get_theme_for_tournament(tournament)
-
-    img = Image.open(selected_path)
-    img = enhance_image_visuals(img)
-    img = draw_background_bar(img, decor_style)
-    img = draw_matchup_text(img, matchup_text, decor_style)
-    img = add_logo(img, LOGO_PATH)
-    img = draw_tournament_badge(img, tournament, decor_style)
-
-    img.save(output_path, quality=95)
-    return str(output_path)
+    return render_to_path(selected_path, metadata, output_path)
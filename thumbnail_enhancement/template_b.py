@@ -1,19 +1,30 @@
+import functools
 import textwrap
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from asset_cache import get_resized_logo
 from thumbnail_enhancement.common import (
-    enhance_image_visuals,
     format_team_name,
     get_theme_for_tournament,
+    load_enhanced_source,
+    save_thumbnail,
 )
 from utils import get_metadata, get_selected_candidate_path, get_thumbnail_path
 from logger import get_logger
+from schemas import MatchMetadata
 from custom_exceptions import MissingThumbnailDataError
 
 logger = get_logger(__name__)
 
 # --- Configuration ---
 SIDEBAR_RATIO = 0.3  # 30% Width
+SIDEBAR_LOGO_RATIO = 0.4  # Of sidebar width
+CANVAS_SIZE = (1920, 1080)
+TOURNAMENT_FONT_RATIO = 0.16  # Of sidebar width
+PILL_HEIGHT_RATIO = 0.11  # Of canvas height
+PILL_FONT_RATIO = 0.75  # Of pill height
+VS_FONT_RATIO = 1.4  # Of pill height
 LOGO_PATH = Path("assets/logo.png")
 FONT_PATH = Path("assets/Montserrat-ExtraBold.ttf")
 
@@ -41,6 +52,7 @@ SIDEBAR_STYLES = {
 }
 
 
+@functools.lru_cache(maxsize=256)
 def get_font(size: int):
     try:
         return ImageFont.truetype(str(FONT_PATH), size)
@@ -48,6 +60,17 @@ def get_font(size: int):
         return ImageFont.load_default()
 
 
+def preload_font_sizes(width: int, height: int) -> set[int]:
+    """Starting font sizes; the layout is drawn on a fixed canvas whatever the frame size."""
+    canvas_w, canvas_h = CANVAS_SIZE
+    pill_height = int(canvas_h * PILL_HEIGHT_RATIO)
+    return {
+        int(int(canvas_w * SIDEBAR_RATIO) * TOURNAMENT_FONT_RATIO),
+        int(pill_height * PILL_FONT_RATIO),
+        int(pill_height * VS_FONT_RATIO),
+    }
+
+
 def draw_sidebar_background(
     sidebar_w: int, canvas_h: int, style_key: str
 ) -> Image.Image:
@@ -62,11 +85,8 @@ def add_logo_to_sidebar(
     if not LOGO_PATH.exists():
         return (int(sidebar_w * 0.1), 50)
 
-    logo = Image.open(LOGO_PATH).convert("RGBA")
-    logo_w = int(sidebar_w * 0.4)
-    aspect = logo.height / logo.width
-    logo_h = int(logo_w * aspect)
-    logo = logo.resize((logo_w, logo_h), Image.Resampling.LANCZOS)
+    logo = get_resized_logo(LOGO_PATH, int(sidebar_w * SIDEBAR_LOGO_RATIO))
+    logo_h = logo.height
 
     logo_x = int(sidebar_w * 0.1)
     logo_y = int(canvas_h * 0.05)
@@ -97,7 +117,7 @@ def draw_tournament_name(
     max_lines = 2
 
     # Initial Font Config
-    font_size = int(sidebar_w * 0.16)
+    font_size = int(sidebar_w * TOURNAMENT_FONT_RATIO)
     min_font_size = 20
 
     # 2. Logic to find best fit (Font Size & Line Split)
@@ -174,7 +194,7 @@ def draw_semi_pill_text(draw, x, y, width, height, text, bg_color, text_color):
 
     # 2. Draw the Text (Left Aligned)
     # UPDATE: Increased font size ratio from 0.55 to 0.75
-    font_size = int(height * 0.75)
+    font_size = int(height * PILL_FONT_RATIO)
     font = get_font(font_size)
 
     # Text Padding (Left indent)
@@ -224,7 +244,7 @@ def draw_matchup_block(
 
     # Configuration
     block_start_y = int(canvas_h * 0.6)
-    pill_height = int(canvas_h * 0.11)
+    pill_height = int(canvas_h * PILL_HEIGHT_RATIO)
     pill_x = 0
 
     text_pad_left = int(pill_height * 0.5)
@@ -232,11 +252,11 @@ def draw_matchup_block(
 
     # --- 1. Calculate Sizes & Widths ---
     # Pill Font
-    pill_font_size = int(pill_height * 0.75)
+    pill_font_size = int(pill_height * PILL_FONT_RATIO)
     pill_font = get_font(pill_font_size)
 
     # VS Font & Height Calculation
-    vs_font_size = int(pill_height * 1.4)
+    vs_font_size = int(pill_height * VS_FONT_RATIO)
     vs_font = get_font(vs_font_size)
 
     # Measure exact visual height of "VS"
@@ -301,36 +321,25 @@ def draw_matchup_block(
     )
 
 
-def prepare_image_side(selected_path: Path, image_w: int, canvas_h: int) -> Image.Image:
-    raw_img = Image.open(selected_path).convert("RGB")
-    enhanced_img = enhance_image_visuals(raw_img)
-    return ImageOps.fit(
-        enhanced_img, (image_w, canvas_h), method=Image.Resampling.LANCZOS
-    )
-
-
-def render_thumbnail(video_path: Path) -> str:
-    selected_path = get_selected_candidate_path(video_path)
-    output_path = get_thumbnail_path(video_path)
-    metadata = get_metadata(video_path)
+def prepare_image_side(enhanced: Image.Image, image_w: int, canvas_h: int) -> Image.Image:
+    return ImageOps.fit(enhanced, (image_w, canvas_h), method=Image.Resampling.LANCZOS)
 
-    if not selected_path.exists() or not metadata:
-        raise MissingThumbnailDataError(
-            f"Missing required data for {video_path.name} either selected thumbnail or metadata"
-        )
 
-    CANVAS_W, CANVAS_H = 1920, 1080
+def compose_from_enhanced(
+    enhanced: Image.Image, metadata: MatchMetadata, theme: str | None = None
+) -> Image.Image:
+    CANVAS_W, CANVAS_H = CANVAS_SIZE
     final_img = Image.new("RGB", (CANVAS_W, CANVAS_H), COLOR_BLACK)
 
     sidebar_w = int(CANVAS_W * SIDEBAR_RATIO)
     image_w = CANVAS_W - sidebar_w
 
     # 1. Prepare and Paste Right Image
-    right_img = prepare_image_side(selected_path, image_w, CANVAS_H)
+    right_img = prepare_image_side(enhanced, image_w, CANVAS_H)
     final_img.paste(right_img, (sidebar_w, 0))
 
     tournament = metadata.tournament.strip()
-    style_key = get_theme_for_tournament(tournament)
+    style_key = theme or get_theme_for_tournament(tournament)
 
     # 2. Prepare and Paste Sidebar Background & Text
     sidebar = draw_sidebar_background(sidebar_w, CANVAS_H, style_key)
@@ -349,6 +358,29 @@ def render_thumbnail(video_path: Path) -> str:
     draw_matchup_block(
         final_img, team1_text, team2_text, sidebar_w, CANVAS_W, CANVAS_H, style_key
     )
+    return final_img
+
+
+def compose_thumbnail(selected_path: Path, metadata: MatchMetadata) -> Image.Image:
+    return compose_from_enhanced(load_enhanced_source(selected_path), metadata)
+
+
+def render_to_path(
+    selected_path: Path, metadata: MatchMetadata, output_path: Path
+) -> str:
+    return save_thumbnail(
+        compose_thumbnail(selected_path, metadata), output_path, cache_key=__name__
+    )
+
+
+def render_thumbnail(video_path: Path) -> str:
+    selected_path = get_selected_candidate_path(video_path)
+    output_path = get_thumbnail_path(video_path)
+    metadata = get_metadata(video_path)
+
+    if not selected_path.exists() or not metadata:
+        raise MissingThumbnailDataError(
+            f"Missing required data for {video_path.name} either selected thumbnail or metadata"
+        )
 
-    final_img.save(output_path, quality=95)
-    return str(output_path)
+    return render_to_path(selected_path, metadata, output_path)
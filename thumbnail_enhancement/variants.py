@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+import atomic_io
+import utils
+from custom_exceptions import MissingThumbnailDataError
+from logger import get_logger
+from schemas import MatchMetadata
+from thumbnail_enhancement.common import load_enhanced_source, save_thumbnail
+from thumbnail_enhancement.renderer import get_template_module
+
+logger = get_logger(__name__)
+
+VARIANTS_DIR = "variants"
+VARIANTS_MANIFEST_FILE = "variants.json"
+
+
+@dataclass(frozen=True)
+class ThumbnailVariant:
+    template_name: str
+    theme: str | None = None
+
+    @property
+    def name(self) -> str:
+        if self.theme:
+            return f"{self.template_name}_{self.theme}"
+        return self.template_name
+
+
+@dataclass(frozen=True)
+class RenderedVariant:
+    name: str
+    template_name: str
+    theme: str | None
+    path: str
+    size_bytes: int
+
+
+def get_variants_dir(workspace_dir: Path) -> Path:
+    return workspace_dir / VARIANTS_DIR
+
+
+def get_variant_path(workspace_dir: Path, variant: ThumbnailVariant) -> Path:
+    return get_variants_dir(workspace_dir) / f"thumbnail_{variant.name}.jpg"
+
+
+def _render_variant(
+    enhanced: Image.Image,
+    metadata: MatchMetadata,
+    variant: ThumbnailVariant,
+    output_path: Path,
+) -> RenderedVariant:
+    template = get_template_module(variant.template_name)
+    img = template.compose_from_enhanced(enhanced, metadata, variant.theme)
+    save_thumbnail(img, output_path, cache_key=template.__name__)
+    return RenderedVariant(
+        name=variant.name,
+        template_name=variant.template_name,
+        theme=variant.theme,
+        path=str(output_path),
+        size_bytes=output_path.stat().st_size,
+    )
+
+
+def render_variants(
+    selected_path: Path,
+    metadata: MatchMetadata,
+    variants: list[ThumbnailVariant],
+    workspace_dir: Path,
+    max_workers: int | None = None,
+) -> list[RenderedVariant]:
+    """Decodes and enhances the selected frame once, then composes and saves every
+    variant from that shared buffer in parallel threads."""
+    if not variants:
+        return []
+
+    enhanced = load_enhanced_source(selected_path)
+    get_variants_dir(workspace_dir).mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(variants)) as executor:
+        futures = [
+            executor.submit(
+                _render_variant,
+                enhanced,
+                metadata,
+                variant,
+                get_variant_path(workspace_dir, variant),
+            )
+            for variant in variants
+        ]
+        rendered = [future.result() for future in futures]
+
+    manifest = {
+        "source": str(selected_path),
+        "rendered_at": datetime.now().isoformat(),
+        "variants": [asdict(variant) for variant in rendered],
+    }
+    atomic_io.atomic_write_json(workspace_dir / VARIANTS_MANIFEST_FILE, manifest)
+    logger.info(f"Rendered {len(rendered)} thumbnail variant(s) in {workspace_dir}")
+    return rendered
+
+
+def render_variants_for_video(
+    video_path: Path, variants: list[ThumbnailVariant]
+) -> list[RenderedVariant]:
+    selected_path = utils.get_selected_candidate_path(video_path)
+    metadata_path = utils.get_metadata_path(video_path)
+    if not selected_path.exists() or not metadata_path.exists():
+        raise MissingThumbnailDataError(
+            f"Missing required data for {video_path.name} either selected thumbnail or metadata"
+        )
+
+    return render_variants(
+        selected_path,
+        utils.read_metadata_file(metadata_path),
+        variants,
+        utils.get_workspace_dir(video_path),
+    )
@@ -1,8 +1,8 @@
-import torch
+import functools
 from PIL import Image
-import clip
 from dataclasses import dataclass
 
+from metrics import CLIP_BATCH_DURATION
 from thumbnail_ranking.quality_filter import ImageMetrics
 
 
@@ -41,15 +41,28 @@ class PromptCategories:
 
 
 def get_device() -> str:
+    # torch and clip are imported on first use so importing the package stays cheap.
+    import torch
+
     return "cuda" if torch.cuda.is_available() else "cpu"
 
 
+@functools.lru_cache(maxsize=2)
+def load_model(model_name: str, device: str):
+    import clip
+
+    return clip.load(model_name, device)
+
+
 def calculate_clip_scores(
     metrics_list: list[ImageMetrics],
     config: CLIPConfig,
     prompt_categories: PromptCategories,
 ) -> list[RankedImage]:
-    model, preprocess = clip.load(config.model_name, config.device)
+    import clip
+    import torch
+
+    model, preprocess = load_model(config.model_name, config.device)
 
     images = [
         preprocess(Image.open(metrics.path)).unsqueeze(0) for metrics in metrics_list
@@ -62,7 +75,7 @@ def calculate_clip_scores(
         config.device
     )
 
-    with torch.no_grad():
+    with torch.no_grad(), CLIP_BATCH_DURATION.time():
         image_features = model.encode_image(batched_image_tensor)
         pos_text_features = model.encode_text(batched_positive_texts_tensor)
         neg_text_features = model.encode_text(batched_negative_texts_tensor)
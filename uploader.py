@@ -3,46 +3,33 @@ from custom_exceptions import VideoAlreadyUploadedError
 from dataclasses import asdict
 from googleapiclient.http import MediaFileUpload
 from auth_service import get_client
+import atomic_io
 import config
+from metrics import UPLOAD_BYTES
+import state_store
 from pathlib import Path
 from typing import Any, Callable
 from datetime import datetime
-import json
 from utils import (
     get_metadata,
     get_thumbnail_path,
     get_upload_record_path,
-    get_uploaded_record,
-    get_metadata_path,
     get_processed_video_path,
+    get_workspace_dir,
 )
 
 CHUNK_SIZE_MB = 1024 * 1024 * 16  # 16MB
 
 
 def get_videos_ready_for_upload(video_paths: list[Path]) -> list[Path]:
-    result = []
+    """Videos with metadata and a rendered thumbnail but no upload, from one store query."""
+    # Without a workspace nothing has run yet; skipping them avoids creating one.
+    started = [path for path in video_paths if get_workspace_dir(path).is_dir()]
+    with state_store.open_store() as conn:
+        fingerprints = {path: state_store.register_video_path(conn, path) for path in started}
+        ready = state_store.filter_ready_for_upload(conn, list(fingerprints.values()))
 
-    for video_path in video_paths:
-        upload_record = get_uploaded_record(video_path)
-        if upload_record:
-            continue
-
-        metadata_path = get_metadata_path(video_path)
-        thumbnail_path = get_thumbnail_path(video_path)
-        if not metadata_path.exists() or not thumbnail_path.exists():
-            continue
-
-        try:
-            metadata = get_metadata(video_path)
-            if not metadata:
-                continue
-        except (FileNotFoundError, json.JSONDecodeError):
-            continue
-
-        result.append(video_path)
-
-    return result
+    return [path for path in started if fingerprints[path] in ready]
 
 
 def upload(
@@ -77,11 +64,14 @@ def upload(
 
     total_size = video_path.stat().st_size
     response = None
+    uploaded_bytes = 0
 
     while response is None:
         status, response = request.next_chunk()
+        current_progress = int(status.progress() * total_size) if status else total_size
+        UPLOAD_BYTES.inc(max(0, current_progress - uploaded_bytes))
+        uploaded_bytes = max(uploaded_bytes, current_progress)
         if status and progress_callback:
-            current_progress = int(status.progress() * total_size)
             progress_percent = (current_progress / total_size) * 100
             progress_callback(progress_percent)
 
@@ -108,7 +98,7 @@ def upload_video_with_idempotency(
     heartbeat_callback: Callable[[float], None] | None = None,
 ) -> UploadedRecord:
     path = Path(video_path)
-    uploaded_record = get_uploaded_record(path)
+    uploaded_record = state_store.load_upload_record(path)
     if uploaded_record and uploaded_record.video_id:
         raise VideoAlreadyUploadedError(
             f"Video {path.name} is already uploaded with video ID {uploaded_record.video_id}. "
@@ -120,13 +110,19 @@ def upload_video_with_idempotency(
         raise ValueError("Metadata not found for video upload.")
 
     processed_path = get_processed_video_path(path)
-    upload_path = processed_path if processed_path.exists() else path
+    if processed_path.exists():
+        state_store.require_verified_artifact(
+            path, state_store.STAGE_PROCESSED_VIDEO, processed_path
+        )
+        upload_path = processed_path
+    else:
+        upload_path = path
 
     youtube_client = get_client()
     video_id = upload(youtube_client, upload_path, metadata, heartbeat_callback)
     save_upload_record(path, video_id, thumbnail_set=False)
 
-    uploaded_record = get_uploaded_record(path)
+    uploaded_record = state_store.load_upload_record(path)
     if not uploaded_record:
         raise RuntimeError("Failed to retrieve upload record after saving")
     return uploaded_record
@@ -134,7 +130,7 @@ def upload_video_with_idempotency(
 
 def set_thumbnail_for_video(video_path: str) -> None:
     path = Path(video_path)
-    upload_record = get_uploaded_record(path)
+    upload_record = state_store.load_upload_record(path)
     if not upload_record or not upload_record.video_id:
         raise RuntimeError(
             f"Video not uploaded yet. Cannot set thumbnail for {path.name}"
@@ -148,6 +144,7 @@ def set_thumbnail_for_video(video_path: str) -> None:
 
     if not thumbnail_path.exists():
         raise FileNotFoundError(f"Thumbnail not found: {thumbnail_path}")
+    state_store.require_verified_artifact(path, state_store.STAGE_THUMBNAIL, thumbnail_path)
 
     set_thumbnail(youtube_client, upload_record.video_id, thumbnail_path)
     save_upload_record(path, upload_record.video_id, thumbnail_set=True)
@@ -155,7 +152,7 @@ def set_thumbnail_for_video(video_path: str) -> None:
 
 def update_video_visibility_for_video(video_path: str) -> None:
     path = Path(video_path)
-    upload_record = get_uploaded_record(path)
+    upload_record = state_store.load_upload_record(path)
     if not upload_record or not upload_record.video_id:
         raise RuntimeError(
             f"Video not uploaded yet. Cannot update visibility for {path.name}"
@@ -185,7 +182,7 @@ def update_video_visibility_for_video(video_path: str) -> None:
 def save_upload_record(video_path: Path, video_id: str, thumbnail_set: bool) -> None:
     upload_record_path = get_upload_record_path(video_path)
 
-    existing_record = get_uploaded_record(video_path)
+    existing_record = state_store.load_upload_record(video_path)
     uploaded_at = (
         existing_record.uploaded_at if existing_record else datetime.now().isoformat()
     )
@@ -197,5 +194,6 @@ def save_upload_record(video_path: Path, video_id: str, thumbnail_set: bool) ->
         youtube_link=f"https://youtu.be/{video_id}",
     )
 
-    with open(upload_record_path, "w", encoding="utf-8") as f:
-        json.dump(asdict(upload_record), f, ensure_ascii=False, indent=4)
+    atomic_io.atomic_write_json(upload_record_path, asdict(upload_record))
+
+    state_store.store_upload_record(video_path, upload_record)
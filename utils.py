@@ -11,6 +11,8 @@ SELECTED_CANDIDATE_NAME = "selected.jpg"
 RENDERED_THUMBNAIL_NAME = "thumbnail.jpg"
 PROCESSED_VIDEO_NAME = "processed.mov"
 UPLOADED_FILE = "upload.json"
+FINGERPRINT_FILE = "fingerprint.json"
+PROBE_FILE = "probe.json"
 SUPPORTED_VIDEO_EXTENSIONS = {".mov", ".MOV"}
 
 
@@ -50,22 +52,28 @@ def get_processed_video_path(video_path: Path) -> Path:
     return get_workspace_dir(video_path) / PROCESSED_VIDEO_NAME
 
 
-def get_metadata(video_path: Path) -> MatchMetadata:
-    metadata_path = get_metadata_path(video_path)
+def read_metadata_file(metadata_path: Path) -> MatchMetadata:
     with open(metadata_path, "r", encoding="utf-8") as f:
         metadata_dict = json.load(f)
 
     return MatchMetadata(**metadata_dict)
 
 
+def get_metadata(video_path: Path) -> MatchMetadata:
+    return read_metadata_file(get_metadata_path(video_path))
+
+
 def get_upload_record_path(video_path: Path) -> Path:
     return get_workspace_dir(video_path) / UPLOADED_FILE
 
 
-def get_uploaded_record(video_path: Path) -> UploadedRecord | None:
-    upload_record_path = get_upload_record_path(video_path)
+def read_upload_record_file(upload_record_path: Path) -> UploadedRecord | None:
     if not upload_record_path.exists():
         return None
     with open(upload_record_path, "r", encoding="utf-8") as f:
         upload_record_dict = json.load(f)
     return UploadedRecord(**upload_record_dict)
+
+
+def get_uploaded_record(video_path: Path) -> UploadedRecord | None:
+    return read_upload_record_file(get_upload_record_path(video_path))
@@ -2,18 +2,28 @@ import json
 import math
 import subprocess
 import tempfile
+import time
+from collections.abc import Callable
 from pathlib import Path
 
 from PIL import Image, ImageDraw, ImageFont
 
+import atomic_io
 import config
+import state_store
 import utils
+from asset_cache import write_resized_logo_png
+from ffmpeg_progress import FfmpegProgress, FfmpegStalledError, run_ffmpeg_with_progress
+from instrumentation import run_subprocess
 from logger import get_logger
+from retention import Artifact, disk_space_reservation, estimate_overlay_output_bytes
+from metrics import FFMPEG_ENCODE_DURATION, FFMPEG_ENCODE_FPS, FFMPEG_ENCODE_SPEED
 
 logger = get_logger(__name__)
 
 FONT_PATH = Path("assets/Anton-Regular.ttf")
 OVERLAY_DURATION = 12
+LOGO_WIDTH_RATIO = 0.1
 
 COLOR_YELLOW = (255, 215, 0, 255)
 COLOR_WHITE = (255, 255, 255, 255)
@@ -157,7 +167,7 @@ def render_thanks_overlay(width: int, height: int) -> Image.Image:
 
 
 def get_video_dimensions(video_path: str) -> tuple[int, int]:
-    result = subprocess.run(
+    result = run_subprocess(
         ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams",
          "-select_streams", "v:0", video_path],
         capture_output=True, check=True,
@@ -168,14 +178,14 @@ def get_video_dimensions(video_path: str) -> tuple[int, int]:
 
 
 def _get_video_duration(video_path: str) -> float:
-    result = subprocess.run(
+    result = run_subprocess(
         ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", video_path],
         capture_output=True, check=True,
     )
     return float(json.loads(result.stdout)["format"]["duration"])
 
 
-def _run_ffmpeg_overlay(
+def build_overlay_command(
     video_path: str,
     cafe_png: str,
     thanks_png: str | None,
@@ -183,8 +193,7 @@ def _run_ffmpeg_overlay(
     output_path: str,
     use_hardware: bool,
     logo_path: str | None = None,
-    logo_size: int | None = None,
-) -> subprocess.CompletedProcess:
+) -> list[str]:
     encoder_args = ["-c:v", "h264_videotoolbox"] if use_hardware else ["-c:v", "libx264", "-preset", "ultrafast"]
 
     inputs = ["-i", video_path, "-i", cafe_png]
@@ -205,16 +214,16 @@ def _run_ffmpeg_overlay(
             f"[0:v][1:v]overlay=x=(W-w)/2:y=(H-h)/2:enable='lte(t,{OVERLAY_DURATION})'[v2]"
         )
 
-    if logo_path and logo_size:
+    if logo_path:
+        # The logo PNG is pre-scaled to the video width, so it is overlaid as-is.
         filter_complex = (
             f"{text_chain};"
-            f"[{logo_idx}:v]scale={logo_size}:-1,format=rgba[logo];"
-            f"[v2][logo]overlay=x=main_w-overlay_w-20:y=20[out]"
+            f"[v2][{logo_idx}:v]overlay=x=main_w-overlay_w-20:y=20[out]"
         )
     else:
         filter_complex = text_chain.replace("[v2]", "[out]")
 
-    cmd = (
+    return (
         ["ffmpeg", "-y"]
         + inputs
         + ["-filter_complex", filter_complex, "-map", "[out]", "-map", "0:a"]
@@ -222,10 +231,46 @@ def _run_ffmpeg_overlay(
         + ["-c:a", "copy", output_path]
     )
 
-    return subprocess.run(cmd, capture_output=True)
 
+def _run_ffmpeg_overlay(
+    video_path: str,
+    cafe_png: str,
+    thanks_png: str | None,
+    thanks_start: float,
+    output_path: str,
+    duration: float,
+    use_hardware: bool,
+    logo_path: str | None = None,
+    progress_callback: Callable[[FfmpegProgress], None] | None = None,
+) -> subprocess.CompletedProcess:
+    encoder = "hardware" if use_hardware else "libx264"
+    cmd = build_overlay_command(
+        video_path, cafe_png, thanks_png, thanks_start, output_path, use_hardware, logo_path
+    )
 
-def add_video_overlays(video_path: str, output_path: str | None = None) -> str:
+    def on_progress(progress: FfmpegProgress) -> None:
+        FFMPEG_ENCODE_FPS.set(progress.fps, encoder=encoder)
+        if progress_callback:
+            progress_callback(progress)
+
+    start = time.perf_counter()
+    result = run_ffmpeg_with_progress(
+        cmd, duration, on_progress, stall_timeout=config.FFMPEG_STALL_TIMEOUT
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode == 0:
+        FFMPEG_ENCODE_DURATION.observe(elapsed, encoder=encoder)
+        if elapsed > 0:
+            FFMPEG_ENCODE_SPEED.set(duration / elapsed, encoder=encoder)
+    return result
+
+
+def add_video_overlays(
+    video_path: str,
+    output_path: str | None = None,
+    progress_callback: Callable[[FfmpegProgress], None] | None = None,
+    eviction_callback: Callable[[Artifact], None] | None = None,
+) -> str:
     if not FONT_PATH.exists():
         raise FileNotFoundError(f"Font not found: {FONT_PATH}. Download Anton-Regular.ttf from Google Fonts.")
 
@@ -233,10 +278,14 @@ def add_video_overlays(video_path: str, output_path: str | None = None) -> str:
 
     if output_path is None:
         resolved_output = utils.get_processed_video_path(path)
+        already_processed = state_store.is_stage_complete(
+            path, state_store.STAGE_PROCESSED_VIDEO, resolved_output
+        )
     else:
         resolved_output = Path(output_path)
+        already_processed = resolved_output.exists()
 
-    if resolved_output.exists():
+    if already_processed:
         logger.info(f"Processed video already exists, skipping: {resolved_output}")
         return str(resolved_output)
 
@@ -249,9 +298,8 @@ def add_video_overlays(video_path: str, output_path: str | None = None) -> str:
     thanks_img = render_thanks_overlay(width, height) if duration > 24 else None
     thanks_start = duration - OVERLAY_DURATION
 
-    logo_path = str(config.LOGO_PATH) if config.LOGO_PATH.exists() else None
-    logo_size = int(width * 0.1) if logo_path else None
-    if not logo_path:
+    has_logo = config.LOGO_PATH.exists()
+    if not has_logo:
         logger.warning(f"Logo not found at {config.LOGO_PATH}, skipping watermark")
 
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -263,16 +311,39 @@ def add_video_overlays(video_path: str, output_path: str | None = None) -> str:
             thanks_png = str(Path(tmp_dir) / "thanks_overlay.png")
             thanks_img.save(thanks_png)
 
-        result = _run_ffmpeg_overlay(video_path, cafe_png, thanks_png, thanks_start, str(resolved_output), use_hardware=True, logo_path=logo_path, logo_size=logo_size)
+        logo_path = None
+        if has_logo:
+            logo_path = str(
+                write_resized_logo_png(
+                    config.LOGO_PATH,
+                    int(width * LOGO_WIDTH_RATIO),
+                    Path(tmp_dir) / "logo.png",
+                )
+            )
+
+        # Fails fast, before ffmpeg starts, when the encode would fill the disk.
+        with disk_space_reservation(
+            resolved_output.parent, estimate_overlay_output_bytes(path), on_evict=eviction_callback
+        ), atomic_io.atomic_output(resolved_output) as tmp_output:
+            try:
+                result = _run_ffmpeg_overlay(video_path, cafe_png, thanks_png, thanks_start, str(tmp_output), duration, use_hardware=True, logo_path=logo_path, progress_callback=progress_callback)
+            except FfmpegStalledError as e:
+                logger.warning(f"Hardware encoder stalled: {e}")
+                result = None
+
+            if result is None or result.returncode != 0:
+                logger.warning("Hardware encoder failed, retrying with libx264...")
+                result = _run_ffmpeg_overlay(video_path, cafe_png, thanks_png, thanks_start, str(tmp_output), duration, use_hardware=False, logo_path=logo_path, progress_callback=progress_callback)
+
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"FFmpeg failed with code {result.returncode}:\n{result.stderr.decode()}"
+                )
 
-        if result.returncode != 0:
-            logger.warning("Hardware encoder failed, retrying with libx264...")
-            result = _run_ffmpeg_overlay(video_path, cafe_png, thanks_png, thanks_start, str(resolved_output), use_hardware=False, logo_path=logo_path, logo_size=logo_size)
+        atomic_io.write_integrity_sidecar(resolved_output)
 
-        if result.returncode != 0:
-            raise RuntimeError(
-                f"FFmpeg failed with code {result.returncode}:\n{result.stderr.decode()}"
-            )
+    if output_path is None:
+        state_store.record_stage(path, state_store.STAGE_PROCESSED_VIDEO, resolved_output)
 
     logger.info(f"Video overlays applied: {resolved_output}")
     return str(resolved_output)
@@ -4,16 +4,19 @@ from pathlib import Path
 from datetime import datetime
 from dataclasses import asdict
 
+import atomic_io
 import config
 import json
-import subprocess
 import cv2
 import numpy as np
 import constants
+import state_store
 import utils
-from logger import get_logger
+from instrumentation import run_subprocess
+from logger import get_logger, get_rate_limited_logger
 
 logger = get_logger(__name__)
+frame_logger = get_rate_limited_logger(__name__)
 
 MATCH_TYPES = {
     "ms": "Men's Singles",
@@ -27,7 +30,11 @@ FIXED_TAGS = "#sunbadminton #badminton #cafebadminton"
 
 
 def parse_filename(video_stem: str) -> tuple[str, str, list[str], list[str]]:
-    parts = video_stem.split("_")
+    parts = [
+        part
+        for part in video_stem.split("_")
+        if not part.startswith(constants.SCHEDULING_TAG_PREFIX)
+    ]
 
     if len(parts) < 2:
         raise ValueError(f"Invalid filename format: {video_stem}")
@@ -131,9 +138,9 @@ def create_metadata(video_path: Path) -> MatchMetadata:
 
 def store(video_path, metadata: MatchMetadata) -> None:
     metadata_path = utils.get_metadata_path(video_path)
+    atomic_io.atomic_write_json(metadata_path, asdict(metadata))
 
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(asdict(metadata), f, ensure_ascii=False, indent=4)
+    state_store.store_metadata(Path(video_path), metadata)
 
 
 def create_workspace(video_path: Path) -> None:
@@ -171,7 +178,7 @@ def score_frame(frame: np.ndarray, prev_frame: np.ndarray | None = None) -> dict
 
 
 def _get_video_duration_seconds(video_path: str) -> float:
-    result = subprocess.run(
+    result = run_subprocess(
         [
             "ffprobe",
             "-v", "quiet",
@@ -187,7 +194,7 @@ def _get_video_duration_seconds(video_path: str) -> float:
 
 
 def _extract_frame_at(video_path: str, timestamp: float) -> np.ndarray | None:
-    result = subprocess.run(
+    result = run_subprocess(
         [
             "ffmpeg",
             "-ss", f"{timestamp:.3f}",
@@ -211,7 +218,9 @@ def auto_select_thumbnail(video_path: str) -> None:
     path = Path(video_path)
 
     output_path = utils.get_selected_candidate_path(path)
-    if output_path.exists():
+    if state_store.is_stage_complete(
+        path, state_store.STAGE_SELECTED_THUMBNAIL, output_path
+    ):
         logger.info(f"Thumbnail already selected, skipping: {output_path}")
         return
 
@@ -229,7 +238,7 @@ def auto_select_thumbnail(video_path: str) -> None:
     for timestamp in timestamps:
         frame = _extract_frame_at(video_path, timestamp)
         if frame is None:
-            logger.warning(f"Could not extract frame at {timestamp:.2f}s from {path}")
+            frame_logger.warning(f"Could not extract frame at {timestamp:.2f}s from {path}")
             continue
         raw_scores.append(score_frame(frame, prev_frame))
         frames.append(frame)
@@ -252,6 +261,10 @@ def auto_select_thumbnail(video_path: str) -> None:
 
     best_frame = frames[int(np.argmax(composite_scores))]
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    cv2.imwrite(str(output_path), best_frame)
+    encoded, buffer = cv2.imencode(".jpg", best_frame)
+    if not encoded:
+        raise ValueError(f"Could not encode selected frame for {path}")
+    atomic_io.atomic_write_bytes(output_path, buffer.tobytes())
+    atomic_io.write_integrity_sidecar(output_path)
+    state_store.record_stage(path, state_store.STAGE_SELECTED_THUMBNAIL, output_path)
     logger.info(f"Auto-selected thumbnail saved to {output_path}")
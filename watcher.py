@@ -0,0 +1,210 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Protocol
+
+import utils
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_BUFFER_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class FileSnapshot:
+    size: int
+    mtime_ns: int
+
+
+@dataclass(frozen=True)
+class PendingFile:
+    snapshot: FileSnapshot
+    stable_since: float
+
+
+class ChangeSource(Protocol):
+    def wait(self, timeout: float) -> list[Path]: ...
+
+    def close(self) -> None: ...
+
+
+def is_video_file(path: Path) -> bool:
+    return path.suffix in utils.SUPPORTED_VIDEO_EXTENSIONS
+
+
+def take_snapshot(path: Path) -> FileSnapshot | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return FileSnapshot(size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+
+def update_pending(
+    pending: dict[Path, PendingFile],
+    path: Path,
+    snapshot: FileSnapshot | None,
+    now: float,
+) -> dict[Path, PendingFile]:
+    updated = dict(pending)
+    previous = pending.get(path)
+
+    if snapshot is None:
+        updated.pop(path, None)
+    elif previous is None or previous.snapshot != snapshot:
+        updated[path] = PendingFile(snapshot=snapshot, stable_since=now)
+
+    return updated
+
+
+def split_settled(
+    pending: dict[Path, PendingFile], now: float, settle_seconds: float
+) -> tuple[list[Path], dict[Path, PendingFile]]:
+    settled = [
+        path
+        for path, pending_file in pending.items()
+        if pending_file.snapshot.size > 0
+        and now - pending_file.stable_since >= settle_seconds
+    ]
+    remaining = {path: f for path, f in pending.items() if path not in settled}
+    return settled, remaining
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+def parse_inotify_events(buffer: bytes) -> list[str]:
+    names = []
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(buffer):
+        _, _, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+        offset += _EVENT_HEADER.size
+        name = buffer[offset : offset + name_len].rstrip(b"\0")
+        offset += name_len
+        if name:
+            names.append(os.fsdecode(name))
+    return names
+
+
+class InotifyChangeSource:
+    def __init__(self, directory: Path, libc: ctypes.CDLL):
+        self.directory = directory
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> list[Path]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self.fd, _READ_BUFFER_SIZE)
+        except BlockingIOError:
+            return []
+        return [self.directory / name for name in parse_inotify_events(buffer)]
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingChangeSource:
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def wait(self, timeout: float) -> list[Path]:
+        time.sleep(timeout)
+        with os.scandir(self.directory) as entries:
+            return [Path(entry.path) for entry in entries if entry.is_file()]
+
+    def close(self) -> None:
+        pass
+
+
+def open_change_source(directory: Path) -> ChangeSource:
+    libc = _load_libc()
+    if libc is not None:
+        try:
+            return InotifyChangeSource(directory, libc)
+        except OSError as e:
+            logger.warning(f"inotify unavailable ({e}), falling back to polling")
+    return PollingChangeSource(directory)
+
+
+def watch_videos(
+    input_dir: Path,
+    on_ready: Callable[[Path], bool],
+    stop_event: threading.Event,
+    settle_seconds: float,
+    poll_interval: float,
+) -> None:
+    """Calls `on_ready` once per settled video; paths it reports as failed are retried."""
+    source = open_change_source(input_dir)
+    logger.info(f"Watching {input_dir} using {type(source).__name__}")
+
+    pending: dict[Path, PendingFile] = {}
+    dispatched: dict[Path, FileSnapshot] = {}
+    candidates = set(utils.scan_videos(input_dir))
+
+    try:
+        while not stop_event.is_set():
+            now = time.monotonic()
+            for path in candidates | set(pending):
+                if not is_video_file(path):
+                    continue
+                snapshot = take_snapshot(path)
+                if snapshot is not None and dispatched.get(path) == snapshot:
+                    continue
+                pending = update_pending(pending, path, snapshot, now)
+
+            settled, pending = split_settled(pending, now, settle_seconds)
+            for path in settled:
+                snapshot = take_snapshot(path)
+                if snapshot is None:
+                    continue
+                try:
+                    handled = on_ready(path)
+                except Exception as e:
+                    logger.error(f"Failed to handle new video {path.name}: {e}")
+                    handled = False
+                if handled:
+                    dispatched[path] = snapshot
+                else:
+                    # Settles again after another window, so the start is retried.
+                    pending[path] = PendingFile(snapshot=snapshot, stable_since=now)
+
+            candidates = set(source.wait(poll_interval))
+    finally:
+        source.close()
@@ -0,0 +1,66 @@
+import functools
+import json
+from pathlib import Path
+
+from instrumentation import run_subprocess
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_CACHE_SIZE = 32
+FRAME_JPEG_QUALITY = 2
+
+
+class FrameExtractionError(RuntimeError):
+    pass
+
+
+def probe_duration(video_path: Path) -> float:
+    result = run_subprocess(
+        ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", str(video_path)],
+        capture_output=True,
+        check=True,
+    )
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
+def extract_frame_jpeg(
+    video_path: Path, timestamp: float, max_width: int | None = None
+) -> bytes:
+    """Decodes the frame at `timestamp` at native resolution unless `max_width` is set.
+
+    `-ss` before `-i` seeks to the preceding keyframe and decodes forward to the exact
+    timestamp, so only a few frames are decoded regardless of position.
+    """
+    cmd = [
+        "ffmpeg",
+        "-ss", f"{timestamp:.3f}",
+        "-i", str(video_path),
+        "-frames:v", "1",
+    ]
+    if max_width:
+        cmd += ["-vf", f"scale='min({max_width},iw)':-2"]
+    cmd += [
+        "-f", "image2",
+        "-vcodec", "mjpeg",
+        "-q:v", str(FRAME_JPEG_QUALITY),
+        "-loglevel", "error",
+        "pipe:1",
+    ]
+    result = run_subprocess(cmd, capture_output=True)
+    if result.returncode != 0 or not result.stdout:
+        raise FrameExtractionError(
+            f"Could not extract frame at {timestamp:.3f}s from {video_path.name}: "
+            f"{result.stderr.decode(errors='replace').strip()}"
+        )
+    return result.stdout
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _get_cached_frame(video_path: Path, timestamp_ms: int, max_width: int | None) -> bytes:
+    return extract_frame_jpeg(video_path, timestamp_ms / 1000, max_width)
+
+
+def get_frame(video_path: Path, timestamp: float, max_width: int | None = None) -> bytes:
+    """Returns the JPEG frame at `timestamp`, cached per millisecond and width."""
+    return _get_cached_frame(video_path, round(timestamp * 1000), max_width)
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import webbrowser
+from dataclasses import dataclass
+from pathlib import Path
+
+from flask import Flask, abort, jsonify, redirect, render_template_string
+from temporalio.client import Client
+from werkzeug.serving import make_server
+
+from constants import SELECT_THUMBNAIL_SIGNAL, WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION
+from logger import get_logger
+from temporal.client import list_running_workflows
+from web_selector.routes import VideoSession, register_video_routes
+
+logger = get_logger(__name__)
+
+SIGNAL_TIMEOUT_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class SelectionTask:
+    workflow_id: str
+    video_path: str
+
+
+async def list_awaiting_selection(client: Client) -> list[SelectionTask]:
+    handles = await list_running_workflows(client)
+
+    async def inspect(handle) -> SelectionTask | None:
+        try:
+            stage = await handle.query("get_stage")
+            if stage != WORKFLOW_STAGE_AWAITING_THUMBNAIL_SELECTION:
+                return None
+            return SelectionTask(handle.id, await handle.query("get_video_path"))
+        except Exception as e:
+            logger.warning(f"Could not query workflow {handle.id}: {e}")
+            return None
+
+    results = await asyncio.gather(*(inspect(handle) for handle in handles))
+    return sorted(
+        (task for task in results if task), key=lambda task: Path(task.video_path).name
+    )
+
+
+class SelectionQueueService:
+    """Long-lived selector serving every workflow that awaits a thumbnail selection."""
+
+    def __init__(
+        self,
+        client: Client,
+        loop: asyncio.AbstractEventLoop,
+        port: int = 8765,
+        preload_count: int = 1,
+    ):
+        self.client = client
+        self.loop = loop
+        self.port = port
+        self.preload_count = preload_count
+        self.app = Flask(__name__)
+        self.sessions: dict[str, VideoSession] = {}
+        self.completed: set[str] = set()
+        self._lock = threading.Lock()
+        self.server = None
+        self.server_thread: threading.Thread | None = None
+
+        self._setup_routes()
+        register_video_routes(
+            self.app, "/videos/<workflow_id>", self._get_session, self._on_select
+        )
+
+    def pending_ids(self) -> list[str]:
+        with self._lock:
+            return [wid for wid in self.sessions if wid not in self.completed]
+
+    def update_tasks(self, tasks: list[SelectionTask]) -> None:
+        awaiting = {task.workflow_id for task in tasks}
+        with self._lock:
+            for task in tasks:
+                if task.workflow_id not in self.sessions:
+                    self.sessions[task.workflow_id] = VideoSession(Path(task.video_path))
+                    logger.info(f"Queued {Path(task.video_path).name} for thumbnail selection")
+            for workflow_id in list(self.sessions):
+                if workflow_id not in awaiting:
+                    # Selected elsewhere, timed out, or signalled and already moved on.
+                    del self.sessions[workflow_id]
+                    self.completed.discard(workflow_id)
+        self._preload_upcoming()
+
+    def _preload_upcoming(self, after: str | None = None) -> None:
+        pending = self.pending_ids()
+        if after in pending:
+            pending = pending[pending.index(after) + 1 :]
+        for workflow_id in pending[: self.preload_count + (0 if after else 1)]:
+            with self._lock:
+                session = self.sessions.get(workflow_id)
+            if session:
+                session.preload()
+
+    def _get_session(self, workflow_id: str) -> VideoSession:
+        with self._lock:
+            session = self.sessions.get(workflow_id)
+        if session is None:
+            abort(404)
+        return session
+
+    def _on_select(self, session: VideoSession, timestamp: float, workflow_id: str) -> dict:
+        handle = self.client.get_workflow_handle(workflow_id)
+        future = asyncio.run_coroutine_threadsafe(
+            handle.signal(SELECT_THUMBNAIL_SIGNAL, timestamp), self.loop
+        )
+        future.result(timeout=SIGNAL_TIMEOUT_SECONDS)
+        logger.info(f"Signalled {workflow_id}: thumbnail at {timestamp:.3f}s")
+
+        with self._lock:
+            self.completed.add(workflow_id)
+        self._preload_upcoming(after=workflow_id)
+
+        pending = self.pending_ids()
+        return {"next": f"/videos/{pending[0]}/" if pending else None}
+
+    def _setup_routes(self) -> None:
+        @self.app.route("/")
+        def queue_index():
+            pending = self.pending_ids()
+            if pending:
+                return redirect(f"/videos/{pending[0]}/")
+            return render_template_string(QUEUE_EMPTY_HTML)
+
+        @self.app.route("/queue")
+        def queue_status():
+            with self._lock:
+                items = [
+                    {"workflow_id": wid, "video": session.video_path.name}
+                    for wid, session in self.sessions.items()
+                    if wid not in self.completed
+                ]
+            return jsonify({"pending": items})
+
+    def start(self) -> None:
+        self.server = make_server(host="127.0.0.1", port=self.port, app=self.app, threaded=True)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        url = f"http://127.0.0.1:{self.port}/"
+        logger.info(f"Thumbnail selection queue running at {url}")
+        webbrowser.open(url)
+
+    def shutdown(self) -> None:
+        if self.server:
+            self.server.shutdown()
+        if self.server_thread:
+            self.server_thread.join(timeout=5)
+
+
+async def run_selection_service(
+    client: Client, port: int, refresh_interval: float
+) -> None:
+    service = SelectionQueueService(client, asyncio.get_running_loop(), port=port)
+    service.update_tasks(await list_awaiting_selection(client))
+    service.start()
+    try:
+        while True:
+            await asyncio.sleep(refresh_interval)
+            service.update_tasks(await list_awaiting_selection(client))
+    finally:
+        service.shutdown()
+
+
+QUEUE_EMPTY_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="refresh" content="10">
+    <title>Select Thumbnail</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+            background: #1a1a1a;
+            color: #aaa;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            min-height: 100vh;
+        }
+    </style>
+</head>
+<body>
+    <p>No videos are waiting for a thumbnail selection. This page refreshes automatically.</p>
+</body>
+</html>
+"""
@@ -0,0 +1,174 @@
+import math
+import subprocess
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template_string,
+    request,
+    send_from_directory,
+)
+
+import config
+from logger import get_logger
+from utils import get_workspace_dir
+from web_selector.frames import FrameExtractionError, get_frame, probe_duration
+from web_selector.sprites import SpriteGenerator, get_sprites_dir
+from web_selector.streaming import ProxyGenerator, range_response
+
+logger = get_logger(__name__)
+
+PREVIEW_FRAME_WIDTH = 1280
+
+PROBE_ERRORS = (OSError, subprocess.CalledProcessError, KeyError, ValueError)
+
+
+class VideoSession:
+    """Per-video state shared by the selector routes: paths, duration and generators."""
+
+    def __init__(self, video_path: Path, workspace_dir: Optional[Path] = None):
+        self.video_path = video_path.resolve()
+        self.workspace_dir = workspace_dir or get_workspace_dir(video_path)
+        self.sprites = SpriteGenerator(self.video_path, self.workspace_dir)
+        self.proxy = ProxyGenerator(self.video_path, self.workspace_dir)
+        self._duration: Optional[float] = None
+        self._preloaded = False
+
+    def get_duration(self) -> float:
+        if self._duration is None:
+            self._duration = probe_duration(self.video_path)
+        return self._duration
+
+    def start_background_work(self) -> None:
+        self.sprites.start()
+        if config.SELECTOR_PROXY_ENABLED:
+            self.proxy.start()
+
+    def preload(self) -> None:
+        """Warms sprites, duration and the first preview frame before the page is opened."""
+        if self._preloaded:
+            return
+        self._preloaded = True
+        self.start_background_work()
+
+        def warm() -> None:
+            try:
+                self.get_duration()
+                get_frame(self.video_path, 0.0, PREVIEW_FRAME_WIDTH)
+            except Exception as e:
+                logger.warning(f"Could not preload {self.video_path.name}: {e}")
+
+        threading.Thread(target=warm, daemon=True).start()
+
+
+def parse_timestamp(value: str | None) -> float | None:
+    try:
+        timestamp = float(value) if value is not None else None
+    except ValueError:
+        return None
+    if timestamp is None or not math.isfinite(timestamp) or timestamp < 0:
+        return None
+    return timestamp
+
+
+def register_video_routes(
+    app: Flask,
+    url_prefix: str,
+    get_session: Callable[..., VideoSession],
+    on_select: Callable[..., dict[str, Any]],
+) -> None:
+    """Registers the selector page and its API under `url_prefix`.
+
+    URL variables in the prefix (e.g. `<workflow_id>`) are passed through to
+    `get_session` and `on_select` as keyword arguments. The page uses relative
+    URLs, so it works under any prefix.
+    """
+
+    def route(rule: str, **options):
+        return app.route(f"{url_prefix}{rule}", **options)
+
+    @route("/")
+    def index(**view_args):
+        from web_selector.templates import SELECT_HTML
+
+        get_session(**view_args)
+        return render_template_string(SELECT_HTML)
+
+    @route("/video")
+    def video(**view_args):
+        session = get_session(**view_args)
+        return range_response(session.video_path, request.headers.get("Range"))
+
+    @route("/proxy")
+    def proxy(**view_args):
+        session = get_session(**view_args)
+        if not session.proxy.ready:
+            session.proxy.start()
+            return jsonify(session.proxy.status()), 202
+        return range_response(session.proxy.path, request.headers.get("Range"))
+
+    @route("/proxy/status")
+    def proxy_status(**view_args):
+        return jsonify(get_session(**view_args).proxy.status())
+
+    @route("/info")
+    def info(**view_args):
+        session = get_session(**view_args)
+        try:
+            duration = session.get_duration()
+        except PROBE_ERRORS as e:
+            logger.warning(f"Could not probe {session.video_path.name}: {e}")
+            return jsonify({"error": "Could not read video duration"}), 502
+        return jsonify({"name": session.video_path.name, "duration": duration})
+
+    @route("/sprites/status")
+    def sprites_status(**view_args):
+        return jsonify(get_session(**view_args).sprites.status())
+
+    @route("/sprites/<path:filename>")
+    def sprite_file(filename: str, **view_args):
+        session = get_session(**view_args)
+        # send_from_directory rejects paths that escape the sprites directory.
+        return send_from_directory(
+            get_sprites_dir(session.workspace_dir), filename, max_age=3600
+        )
+
+    @route("/frame")
+    def frame(**view_args):
+        session = get_session(**view_args)
+        timestamp = parse_timestamp(request.args.get("t"))
+        if timestamp is None:
+            return jsonify({"error": "Missing or invalid timestamp"}), 400
+        max_width = request.args.get("w", type=int)
+
+        try:
+            image_bytes = get_frame(session.video_path, timestamp, max_width)
+        except FrameExtractionError as e:
+            logger.error(str(e))
+            return jsonify({"error": "Could not extract frame"}), 404
+
+        response = Response(image_bytes, mimetype="image/jpeg")
+        response.headers["Cache-Control"] = "private, max-age=3600"
+        return response
+
+    @route("/select", methods=["POST"])
+    def select(**view_args):
+        session = get_session(**view_args)
+        timestamp = parse_timestamp(request.args.get("t"))
+        if timestamp is None:
+            return jsonify({"error": "Missing or invalid timestamp"}), 400
+        try:
+            duration = session.get_duration()
+        except PROBE_ERRORS as e:
+            logger.warning(f"Could not probe {session.video_path.name}: {e}")
+            return jsonify({"error": "Could not read video duration"}), 502
+        if timestamp > duration:
+            return jsonify({"error": "Timestamp is past the end of the video"}), 400
+
+        extra = on_select(session, timestamp, **view_args)
+        return jsonify({"status": "success", "t": timestamp, **extra})
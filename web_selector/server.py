@@ -1,86 +1,49 @@
-import base64
 import threading
 import webbrowser
 from pathlib import Path
 from typing import Optional
 
-from flask import Flask, jsonify, request, send_file, render_template_string
+from flask import Flask
 from temporalio.exceptions import ApplicationError
 from werkzeug.serving import make_server
 
+import atomic_io
+import state_store
 from logger import get_logger
 from utils import get_selected_candidate_path
+from web_selector.frames import get_frame
+from web_selector.routes import VideoSession, register_video_routes
 
 logger = get_logger(__name__)
 
 
 class ThumbnailSelectorServer:
-    def __init__(self, video_path: Path, port: int = 8765):
-        self.video_path = video_path.resolve()
+    def __init__(
+        self, video_path: Path, port: int = 8765, workspace_dir: Optional[Path] = None
+    ):
+        self.session = VideoSession(video_path, workspace_dir)
+        self.video_path = self.session.video_path
+        self.workspace_dir = self.session.workspace_dir
+        self.sprites = self.session.sprites
+        self.proxy = self.session.proxy
         self.port = port
         self.app = Flask(__name__, template_folder="templates")
         self.selection_event = threading.Event()
-        self.selected_image_data: Optional[bytes] = None
+        self.selected_timestamp: Optional[float] = None
         self.server_thread: Optional[threading.Thread] = None
         self.server = None
         self.shutdown_event = threading.Event()
 
-        self._setup_routes()
-
-    def _setup_routes(self) -> None:
-        @self.app.route("/")
-        def index():
-            from web_selector.templates import SELECT_HTML
-
-            return render_template_string(SELECT_HTML)
-
-        @self.app.route("/video")
-        def video():
-            suffix = self.video_path.suffix.lower()
-            mime_types = {
-                ".mov": "video/quicktime",
-                ".mp4": "video/mp4",
-                ".avi": "video/x-msvideo",
-                ".webm": "video/webm",
-            }
-            mime_type = mime_types.get(suffix, "video/quicktime")
-            return send_file(str(self.video_path), mimetype=mime_type)
-
-        @self.app.route("/select", methods=["POST"])
-        def select():
-            try:
-                data = request.get_json()
-                if not data or "image" not in data:
-                    return jsonify({"error": "Missing image data"}), 400
-
-                image_data_str = data["image"]
-                if not isinstance(image_data_str, str):
-                    return jsonify({"error": "Invalid image data format"}), 400
-
-                if image_data_str.startswith("data:image"):
-                    base64_data = image_data_str.split(",")[1]
-                else:
-                    base64_data = image_data_str
+        register_video_routes(self.app, "", lambda: self.session, self._on_select)
 
-                try:
-                    image_bytes = base64.b64decode(base64_data)
-                except Exception as e:
-                    logger.error(f"Failed to decode base64 image: {e}")
-                    return jsonify({"error": "Invalid base64 data"}), 400
-
-                if len(image_bytes) > 10 * 1024 * 1024:
-                    return jsonify({"error": "Image too large (max 10MB)"}), 400
-
-                self.selected_image_data = image_bytes
-                self.selection_event.set()
-
-                return jsonify({"status": "success"})
-            except Exception as e:
-                logger.error(f"Error processing selection: {e}")
-                return jsonify({"error": str(e)}), 500
+    def _on_select(self, session: VideoSession, timestamp: float) -> dict:
+        self.selected_timestamp = timestamp
+        self.selection_event.set()
+        return {}
 
     def start(self) -> None:
         """Start the Flask server in a separate thread."""
+        self.session.start_background_work()
         self.server_thread = threading.Thread(target=self._run_server, daemon=False)
         self.server_thread.start()
 
@@ -113,7 +76,7 @@ class ThumbnailSelectorServer:
             logger.error(f"Flask server error: {e}")
             raise
 
-    def wait_for_selection(self, timeout: float = 3600.0) -> bytes:
+    def wait_for_selection(self, timeout: float = 3600.0) -> float:
         if not self.selection_event.wait(timeout=timeout):
             raise ApplicationError(
                 "Thumbnail selection cancelled or timed out",
@@ -121,14 +84,14 @@ class ThumbnailSelectorServer:
                 non_retryable=False,
             )
 
-        if self.selected_image_data is None:
+        if self.selected_timestamp is None:
             raise ApplicationError(
-                "No image data received",
+                "No frame timestamp received",
                 type="ThumbnailSelectionError",
                 non_retryable=False,
             )
 
-        return self.selected_image_data
+        return self.selected_timestamp
 
     def shutdown(self) -> None:
         self.shutdown_event.set()
@@ -147,23 +110,26 @@ class ThumbnailSelectorServer:
 
 def save_selected_image(image_data: bytes, video_path: Path) -> None:
     output_path = get_selected_candidate_path(video_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, "wb") as f:
-        f.write(image_data)
+    atomic_io.atomic_write_bytes(output_path, image_data)
+    atomic_io.write_integrity_sidecar(output_path)
+    state_store.record_stage(video_path, state_store.STAGE_SELECTED_THUMBNAIL, output_path)
 
     logger.info(f"Saved selected thumbnail to {output_path}")
 
 
+def save_frame_as_selected(video_path: Path, timestamp: float) -> None:
+    # Extracted server-side at native resolution, not captured from the browser canvas.
+    save_selected_image(get_frame(video_path.resolve(), timestamp), video_path)
+
+
 def select_thumbnail_web(video_path: Path, port: int = 8765) -> None:
     server = None
     try:
         server = ThumbnailSelectorServer(video_path, port=port)
         server.start()
 
-        image_data = server.wait_for_selection(timeout=3600.0)
-
-        save_selected_image(image_data, video_path)
+        timestamp = server.wait_for_selection(timeout=3600.0)
+        save_frame_as_selected(video_path, timestamp)
         logger.info(f"Selected thumbnail saved for {video_path.name}")
     except Exception as e:
         logger.error(f"Error in thumbnail selection: {e}")
@@ -0,0 +1,166 @@
+import math
+import shutil
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import atomic_io
+from instrumentation import run_subprocess
+from logger import get_logger
+from web_selector.frames import probe_duration
+
+logger = get_logger(__name__)
+
+SPRITES_DIR = "sprites"
+SPRITES_VTT_FILE = "sprites.vtt"
+SPRITE_SHEET_PATTERN = "sprite_%03d.jpg"
+
+
+@dataclass(frozen=True)
+class SpriteLayout:
+    interval: float = 2.0
+    tile_width: int = 160
+    tile_height: int = 90
+    columns: int = 10
+    rows: int = 10
+
+    @property
+    def tiles_per_sheet(self) -> int:
+        return self.columns * self.rows
+
+
+def get_sprites_dir(workspace_dir: Path) -> Path:
+    return workspace_dir / SPRITES_DIR
+
+
+def get_vtt_path(workspace_dir: Path) -> Path:
+    return get_sprites_dir(workspace_dir) / SPRITES_VTT_FILE
+
+
+def sheet_name(index: int) -> str:
+    return SPRITE_SHEET_PATTERN % (index + 1)
+
+
+def _format_vtt_time(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def build_vtt(duration: float, layout: SpriteLayout, url_prefix: str = "") -> str:
+    lines = ["WEBVTT", ""]
+    tile_count = max(1, math.ceil(duration / layout.interval))
+    for tile in range(tile_count):
+        start = tile * layout.interval
+        end = min(duration, start + layout.interval)
+        sheet, position = divmod(tile, layout.tiles_per_sheet)
+        row, column = divmod(position, layout.columns)
+        x = column * layout.tile_width
+        y = row * layout.tile_height
+        lines += [
+            f"{_format_vtt_time(start)} --> {_format_vtt_time(end)}",
+            f"{url_prefix}{sheet_name(sheet)}#xywh={x},{y},{layout.tile_width},{layout.tile_height}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def build_sprite_command(
+    video_path: Path, output_dir: Path, layout: SpriteLayout
+) -> list[str]:
+    video_filter = (
+        f"fps=1/{layout.interval},"
+        f"scale={layout.tile_width}:{layout.tile_height}:force_original_aspect_ratio=decrease,"
+        f"pad={layout.tile_width}:{layout.tile_height}:(ow-iw)/2:(oh-ih)/2,"
+        f"tile={layout.columns}x{layout.rows}"
+    )
+    return [
+        "ffmpeg", "-y",
+        # Decoding only keyframes keeps one pass cheap even for 4K HEVC sources.
+        "-skip_frame", "nokey",
+        "-i", str(video_path),
+        "-an",
+        "-vf", video_filter,
+        "-vsync", "vfr",
+        "-q:v", "5",
+        "-loglevel", "error",
+        str(output_dir / SPRITE_SHEET_PATTERN),
+    ]
+
+
+def generate_sprites(
+    video_path: Path, workspace_dir: Path, duration: float, layout: SpriteLayout
+) -> Path:
+    """Renders every sprite sheet in one ffmpeg pass; the VTT file marks completion."""
+    sprites_dir = get_sprites_dir(workspace_dir)
+    vtt_path = get_vtt_path(workspace_dir)
+    if vtt_path.exists():
+        return vtt_path
+
+    workspace_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=workspace_dir, prefix=".sprites-"))
+    try:
+        result = run_subprocess(
+            build_sprite_command(video_path, tmp_dir, layout), capture_output=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Sprite generation failed with code {result.returncode}:\n"
+                f"{result.stderr.decode(errors='replace')}"
+            )
+        shutil.rmtree(sprites_dir, ignore_errors=True)
+        tmp_dir.rename(sprites_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    atomic_io.atomic_write_bytes(vtt_path, build_vtt(duration, layout).encode("utf-8"))
+    logger.info(f"Generated scrubbing sprites for {video_path.name} in {sprites_dir}")
+    return vtt_path
+
+
+class SpriteGenerator:
+    """Generates sprites for one video in a background thread."""
+
+    def __init__(
+        self,
+        video_path: Path,
+        workspace_dir: Path,
+        layout: SpriteLayout = SpriteLayout(),
+    ):
+        self.video_path = video_path
+        self.workspace_dir = workspace_dir
+        self.layout = layout
+        self.error: str | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return get_vtt_path(self.workspace_dir).exists()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.ready or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            **asdict(self.layout),
+        }
+
+    def _run(self) -> None:
+        try:
+            duration = probe_duration(self.video_path)
+            generate_sprites(self.video_path, self.workspace_dir, duration, self.layout)
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Could not generate scrubbing sprites for {self.video_path.name}: {e}")
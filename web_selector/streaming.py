@@ -0,0 +1,205 @@
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from flask import Response
+
+import atomic_io
+from instrumentation import run_subprocess
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+PROXY_VIDEO_NAME = "proxy.mp4"
+PROXY_HEIGHT = 540
+
+VIDEO_MIME_TYPES = {
+    ".mov": "video/quicktime",
+    ".mp4": "video/mp4",
+    ".avi": "video/x-msvideo",
+    ".webm": "video/webm",
+}
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    start: int
+    end: int  # Inclusive, as in Content-Range.
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+def get_mime_type(path: Path) -> str:
+    return VIDEO_MIME_TYPES.get(path.suffix.lower(), "video/quicktime")
+
+
+def parse_range_header(header: str | None, file_size: int) -> ByteRange | None:
+    """Returns None when the whole file should be served (no or multi-part range)."""
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+    if file_size == 0:
+        # No byte of an empty file can be addressed; the whole (empty) file is a 200.
+        raise RangeNotSatisfiableError(header)
+    if not start_str:
+        suffix_length = int(end_str)
+        if suffix_length == 0:
+            raise RangeNotSatisfiableError(header)
+        return ByteRange(max(0, file_size - suffix_length), file_size - 1)
+
+    start = int(start_str)
+    end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+    if start >= file_size or start > end:
+        raise RangeNotSatisfiableError(header)
+    return ByteRange(start, end)
+
+
+def iter_file_range(
+    path: Path, start: int, length: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_response(path: Path, range_header: str | None) -> Response:
+    file_size = path.stat().st_size
+    try:
+        byte_range = parse_range_header(range_header, file_size)
+    except RangeNotSatisfiableError:
+        response = Response(status=416)
+        response.headers["Content-Range"] = f"bytes */{file_size}"
+        return response
+
+    if byte_range is None:
+        byte_range = ByteRange(0, file_size - 1)
+        status = 200
+    else:
+        status = 206
+
+    response = Response(
+        iter_file_range(path, byte_range.start, byte_range.length),
+        status=status,
+        mimetype=get_mime_type(path),
+        direct_passthrough=True,
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["Content-Length"] = str(byte_range.length)
+    if status == 206:
+        response.headers["Content-Range"] = (
+            f"bytes {byte_range.start}-{byte_range.end}/{file_size}"
+        )
+    return response
+
+
+def get_proxy_path(workspace_dir: Path) -> Path:
+    return workspace_dir / PROXY_VIDEO_NAME
+
+
+def build_proxy_command(video_path: Path, output_path: Path) -> list[str]:
+    return [
+        "ffmpeg", "-y",
+        "-i", str(video_path),
+        "-vf", f"scale=-2:{PROXY_HEIGHT}",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-crf", "28",
+        "-maxrate", "1500k",
+        "-bufsize", "3000k",
+        # Short GOPs keep browser seeks close to a keyframe.
+        "-g", "30",
+        "-c:a", "aac",
+        "-b:a", "96k",
+        "-movflags", "+faststart",
+        "-loglevel", "error",
+        str(output_path),
+    ]
+
+
+def generate_proxy(video_path: Path, workspace_dir: Path) -> Path:
+    proxy_path = get_proxy_path(workspace_dir)
+    if proxy_path.exists():
+        return proxy_path
+
+    with atomic_io.atomic_output(proxy_path) as tmp_path:
+        result = run_subprocess(
+            build_proxy_command(video_path, tmp_path), capture_output=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Proxy generation failed with code {result.returncode}:\n"
+                f"{result.stderr.decode(errors='replace')}"
+            )
+    logger.info(f"Generated streaming proxy for {video_path.name}: {proxy_path}")
+    return proxy_path
+
+
+class ProxyGenerator:
+    """Generates the low-bitrate proxy for one video in a background thread.
+
+    A failed generation is retried on the next `start()`.
+    """
+
+    def __init__(self, video_path: Path, workspace_dir: Path):
+        self.video_path = video_path
+        self.workspace_dir = workspace_dir
+        self.error: str | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def path(self) -> Path:
+        return get_proxy_path(self.workspace_dir)
+
+    @property
+    def ready(self) -> bool:
+        return self.path.exists()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.ready or (self._thread is not None and self._thread.is_alive()):
+                return
+            self.error = None
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "generating": bool(self._thread and self._thread.is_alive()),
+            "error": self.error,
+        }
+
+    def _run(self) -> None:
+        try:
+            generate_proxy(self.video_path, self.workspace_dir)
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Could not generate streaming proxy for {self.video_path.name}: {e}")
@@ -174,7 +174,7 @@ SELECT_HTML = """<!DOCTYPE html>
             </div>
             
             <div class="info">
-                <span>Drag the slider to navigate through the video</span>
+                <span>Drag the slider to scrub previews; release to load the exact frame</span>
             </div>
             
             <button id="selectButton" class="select-button">Select This Frame</button>
@@ -197,8 +197,11 @@ SELECT_HTML = """<!DOCTYPE html>
         const errorDiv = document.getElementById('error');
         
         let videoDuration = 0;
-        let isDragging = false;
         let updateThrottle = null;
+        let frameRequest = 0;
+        let sprites = null;
+        let proxyReady = false;
+        const spriteSheets = {};
         
         function formatTime(seconds) {
             const mins = Math.floor(seconds / 60);
@@ -206,80 +209,108 @@ SELECT_HTML = """<!DOCTYPE html>
             return `${mins}:${secs.toString().padStart(2, '0')}`;
         }
         
-        function updateFrame() {
-            if (video.readyState >= 2) {
-                ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
-            }
+        function sliderTime() {
+            return (parseFloat(slider.value) / 100) * videoDuration;
         }
         
-        function updatePreview() {
-            if (updateThrottle) {
-                clearTimeout(updateThrottle);
+        function getSpriteSheet(index) {
+            if (!spriteSheets[index]) {
+                const img = new Image();
+                img.src = `sprites/sprite_${String(index + 1).padStart(3, '0')}.jpg`;
+                spriteSheets[index] = img;
             }
-            
-            updateThrottle = setTimeout(() => {
-                updateFrame();
-            }, 50);
+            return spriteSheets[index];
         }
         
-        function updateSliderFromVideo() {
-            if (!isDragging && videoDuration > 0) {
-                const percent = (video.currentTime / videoDuration) * 100;
-                slider.value = percent;
-                currentTimeSpan.textContent = formatTime(video.currentTime);
+        function drawSprite(time) {
+            const tile = Math.min(
+                Math.floor(time / sprites.interval),
+                Math.max(0, Math.ceil(videoDuration / sprites.interval) - 1)
+            );
+            const perSheet = sprites.columns * sprites.rows;
+            const sheet = getSpriteSheet(Math.floor(tile / perSheet));
+            const position = tile % perSheet;
+            const sx = (position % sprites.columns) * sprites.tile_width;
+            const sy = Math.floor(position / sprites.columns) * sprites.tile_height;
+            const draw = () => ctx.drawImage(
+                sheet, sx, sy, sprites.tile_width, sprites.tile_height,
+                0, 0, canvas.width, canvas.height
+            );
+            if (sheet.complete) {
+                draw();
+            } else {
+                sheet.onload = draw;
             }
         }
         
-        function handleSliderChange() {
-            if (videoDuration > 0) {
-                const percent = parseFloat(slider.value);
-                video.currentTime = (percent / 100) * videoDuration;
-                currentTimeSpan.textContent = formatTime(video.currentTime);
-                updatePreview();
+        function drawVideoFrame() {
+            if (video.readyState >= 2) {
+                ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
             }
         }
         
-        slider.addEventListener('input', () => {
-            isDragging = true;
-            handleSliderChange();
-        });
+        function loadExactFrame(time) {
+            // Full-quality frame decoded by the server.
+            const requestId = ++frameRequest;
+            const img = new Image();
+            img.onload = () => {
+                if (requestId === frameRequest) {
+                    ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
+                }
+            };
+            img.src = `frame?t=${time.toFixed(3)}&w=${canvas.width}`;
+        }
         
-        slider.addEventListener('mousemove', (e) => {
-            if (e.buttons === 1) {
-                isDragging = true;
-                handleSliderChange();
+        function handleScrub() {
+            if (videoDuration <= 0) {
+                return;
             }
-        });
-        
-        slider.addEventListener('mousedown', () => {
-            isDragging = true;
-        });
-        
-        slider.addEventListener('mouseup', () => {
-            isDragging = false;
-        });
+            const time = sliderTime();
+            currentTimeSpan.textContent = formatTime(time);
+            if (sprites) {
+                frameRequest++;
+                drawSprite(time);
+                return;
+            }
+            // Sprites not generated yet: fall back to seeking the (proxy) video stream.
+            const source = proxyReady ? 'proxy' : 'video';
+            if (!video.src.endsWith(source)) {
+                video.src = source;
+            }
+            video.currentTime = time;
+            if (updateThrottle) {
+                clearTimeout(updateThrottle);
+            }
+            updateThrottle = setTimeout(drawVideoFrame, 50);
+        }
         
-        slider.addEventListener('touchmove', () => {
-            isDragging = true;
-            handleSliderChange();
-        });
+        async function pollSprites() {
+            try {
+                const response = await fetch('sprites/status');
+                const status = await response.json();
+                if (status.ready) {
+                    sprites = status;
+                    getSpriteSheet(0);
+                    return;
+                }
+                if (status.error) {
+                    return;
+                }
+            } catch (error) {
+                return;
+            }
+            setTimeout(pollSprites, 2000);
+        }
         
-        slider.addEventListener('touchend', () => {
-            isDragging = false;
-        });
+        slider.addEventListener('input', handleScrub);
         
-        video.addEventListener('loadedmetadata', () => {
-            videoDuration = video.duration;
-            slider.max = 100;
-            totalTimeSpan.textContent = formatTime(videoDuration);
-            updateFrame();
+        slider.addEventListener('change', () => {
+            if (videoDuration > 0) {
+                loadExactFrame(sliderTime());
+            }
         });
         
-        video.addEventListener('timeupdate', updateSliderFromVideo);
-        
-        video.addEventListener('seeked', () => {
-            updateFrame();
-        });
+        video.addEventListener('seeked', drawVideoFrame);
         
         selectButton.addEventListener('click', async () => {
             selectButton.disabled = true;
@@ -287,14 +318,8 @@ SELECT_HTML = """<!DOCTYPE html>
             errorDiv.style.display = 'none';
             
             try {
-                const imageData = canvas.toDataURL('image/jpeg', 0.9);
-                
-                const response = await fetch('/select', {
+                const response = await fetch(`select?t=${sliderTime().toFixed(3)}`, {
                     method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ image: imageData }),
                 });
                 
                 if (!response.ok) {
@@ -302,6 +327,12 @@ SELECT_HTML = """<!DOCTYPE html>
                     throw new Error(error.error || 'Failed to save selection');
                 }
                 
+                const result = await response.json();
+                if (result.next) {
+                    loadingDiv.textContent = 'Selection saved! Loading next video...';
+                    window.location.href = result.next;
+                    return;
+                }
                 loadingDiv.textContent = 'Selection saved! Closing...';
                 setTimeout(() => {
                     window.close();
@@ -314,8 +345,24 @@ SELECT_HTML = """<!DOCTYPE html>
             }
         });
         
-        video.src = '/video';
-        video.load();
+        fetch('info')
+            .then((response) => response.json())
+            .then((info) => {
+                if (info.error) {
+                    errorDiv.textContent = info.error;
+                    errorDiv.style.display = 'block';
+                    return;
+                }
+                videoDuration = info.duration;
+                totalTimeSpan.textContent = formatTime(videoDuration);
+                loadExactFrame(0);
+            });
+        pollSprites();
+        fetch('proxy/status')
+            .then((response) => response.json())
+            .then((status) => {
+                proxyReady = status.ready;
+            });
     </script>
 </body>
 </html>